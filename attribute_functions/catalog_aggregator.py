@@ -0,0 +1,112 @@
+import re
+
+from records import CatalogRecord, ModelRecord, as_record
+
+# Columns that hold lists; variant rows are merged by taking the union of their values
+MULTI_VALUE_COLUMNS = {
+    "Model ID",
+    "Regions supported",
+    "Input modalities",
+    "Output modalities",
+    "Inference types supported",
+    "Endpoint types",
+    "Catalog source",
+}
+
+# The catalog renders regions as separate <p> tags, which get_text(strip=True) runs together
+# ("us-east-1us-west-2"), so regions are matched by pattern rather than split on a separator
+REGION_PATTERN = re.compile(r"[a-z]{2}(?:-gov)?-[a-z]+-\d")
+
+SEPARATOR = ", "
+
+# CatalogRecord attributes in column order, split by how variants are merged
+SCHEMA_FIELDS = list(CatalogRecord.FIELDS.values())
+MULTI_FIELDS = {column: field for column, field in CatalogRecord.FIELDS.items() if column in MULTI_VALUE_COLUMNS}
+FIRST_FIELDS = [field for column, field in CatalogRecord.FIELDS.items() if column not in MULTI_VALUE_COLUMNS]
+
+
+def split_values(column: str, value: str) -> list[str]:
+    """
+    Splits a multi-value cell into its items.
+    Args:
+        column (str): Column header.
+        value (str): Cell text.
+    Returns:
+        list[str]: Individual values, in order of appearance.
+    """
+    if not value:
+        return []
+    if column == "Regions supported":
+        regions = REGION_PATTERN.findall(value)
+        if regions:
+            return regions
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+
+class _Variants:
+    """Running merge of one model's variant rows"""
+    __slots__ = ("count", "first", "multi", "extra")
+
+    def __init__(self):
+        self.count = 0
+        # schema attribute -> first non-empty value
+        self.first = {}
+        # schema attribute -> dict used as an ordered set
+        self.multi = {field: {} for field in MULTI_FIELDS.values()}
+        # extra column -> value or ordered set, in first-seen order
+        self.extra = {}
+
+
+def aggregate_models(rows, key: str = "Model name") -> list[ModelRecord]:
+    """
+    Groups catalog rows by model in a single pass over any iterable of rows.
+    Variant rows (per region, per version, per provider catalog) are merged into one
+    record: list columns (MULTI_VALUE_COLUMNS) become the ordered union of all
+    variants' values, other columns keep the first non-empty value.
+    Args:
+        rows (iterable[CatalogRecord | dict]): Catalog rows, e.g. from fetch_all_catalog_models().
+        key (str, optional): Column identifying a model. Defaults to 'Model name'.
+    Returns:
+        list[ModelRecord]: One record per model, in first-seen order, with a variant count.
+    """
+    merged = {}
+    for row in rows:
+        # Plain header -> cell dicts are accepted too
+        row = as_record(row)
+        name = row.get(key, "Unknown")
+        variants = merged.get(name)
+        if variants is None:
+            variants = merged[name] = _Variants()
+        variants.count += 1
+        first = variants.first
+        for field in FIRST_FIELDS:
+            value = getattr(row, field)
+            if field not in first or (value and not first[field]):
+                first[field] = value
+        for column, field in MULTI_FIELDS.items():
+            values = variants.multi[field]
+            for item in split_values(column, getattr(row, field)):
+                values[item] = None
+        for column, value in zip(row.extra_columns, row.extra_values):
+            if column in MULTI_VALUE_COLUMNS:
+                values = variants.extra.setdefault(column, {})
+                for item in split_values(column, value):
+                    values[item] = None
+            elif value and not variants.extra.get(column):
+                variants.extra[column] = value
+            else:
+                variants.extra.setdefault(column, value)
+
+    results = []
+    for name, variants in merged.items():
+        fields = dict(variants.first)
+        fields.update((field, SEPARATOR.join(values)) for field, values in variants.multi.items())
+        if key == "Model name":
+            fields["model_name"] = name
+        extra_values = tuple(SEPARATOR.join(value) if isinstance(value, dict) else value
+                             for value in variants.extra.values())
+        results.append(ModelRecord(
+            *(fields[field] for field in SCHEMA_FIELDS),
+            tuple(variants.extra), extra_values, variant_count=variants.count,
+        ))
+    return results
@@ -0,0 +1,169 @@
+import os
+import re
+
+import parse_cache
+import profiling
+
+# Tables in the catalog pages aren't nested, so a non-greedy match finds each one
+TABLE_PATTERN = re.compile(rb"<table\b.*?</table\s*>", re.IGNORECASE | re.DOTALL)
+
+# Below this much table HTML, starting worker processes costs more than it saves
+PARALLEL_MIN_BYTES = 512 * 1024
+
+# Override the worker count with LLM_DB_PARSE_WORKERS (1 disables the pool)
+WORKERS_ENV = "LLM_DB_PARSE_WORKERS"
+
+
+def require_beautifulsoup():
+    """
+    Imports BeautifulSoup on first use so that importing a module stays cheap.
+    Returns:
+        type: The BeautifulSoup class.
+    """
+    try:
+        from bs4 import BeautifulSoup
+    except ImportError:
+        raise ImportError("BeautifulSoup (bs4) is required. Install it with 'pip install beautifulsoup4'.")
+    return BeautifulSoup
+
+
+def to_bytes(document) -> bytes:
+    return document.encode("utf-8") if isinstance(document, str) else document
+
+
+def split_table_fragments(document) -> list[bytes]:
+    """
+    Splits an HTML page into its <table> elements without building a parse tree.
+    Args:
+        document (str | bytes): HTML content.
+    Returns:
+        list[bytes]: Raw bytes of each table, in page order.
+    """
+    return [match.group(0) for match in TABLE_PATTERN.finditer(to_bytes(document))]
+
+
+def parse_table_fragment(fragment: bytes) -> tuple[list[str], list[list[str]]]:
+    """
+    Parses one table. Runs in worker processes, so it takes and returns plain data.
+    Rows are lists of cell texts aligned with the headers; consumers resolve the
+    headers they need to column indexes once per table (see records.TableColumns).
+    Args:
+        fragment (bytes): Raw HTML of a single <table>.
+    Returns:
+        tuple[list[str], list[list[str]]]: Header texts and the cells of each row.
+    """
+    BeautifulSoup = require_beautifulsoup()
+    table = BeautifulSoup(fragment.decode("utf-8"), "html.parser").find("table")
+    if table is None:
+        return [], []
+    headers = [th.get_text(strip=True) for th in table.find_all("th")]
+    rows = []
+    for row in table.find_all("tr")[1:]:
+        cells = row.find_all("td")
+        if len(cells) != len(headers):
+            continue
+        rows.append([cell.get_text(strip=True) for cell in cells])
+    return headers, rows
+
+
+def get_worker_count(max_workers: int = None) -> int:
+    if max_workers:
+        return max_workers
+    return int(os.environ.get(WORKERS_ENV, 0)) or os.cpu_count() or 1
+
+
+def parse_documents(documents: list, max_workers: int = None) -> list[list[tuple]]:
+    """
+    Parses the tables of several pages, fanning the fragments out to a process pool.
+    Pages parsed before are loaded from the parse cache (keyed by content hash), so
+    an unchanged page costs a hash and a load. A changed page is split into its
+    <table> fragments and each fragment is looked up by its own hash, so only the
+    tables that changed are reparsed. Only raw byte slices cross the process
+    boundary, and results are merged back in source order (page order, then table
+    order) regardless of completion order.
+    Args:
+        documents (list[str | bytes]): HTML pages.
+        max_workers (int, optional): Pool size. Defaults to LLM_DB_PARSE_WORKERS or the CPU count.
+    Returns:
+        list[list[tuple]]: For each page, a (headers, rows) tuple per table.
+    """
+    documents = [to_bytes(document) for document in documents]
+    keys = [parse_cache.document_key(document) for document in documents]
+    results = [parse_cache.load(key) for key in keys]
+    missing = [i for i, result in enumerate(results) if result is None]
+    if not missing:
+        return results
+
+    fragments_per_doc = [split_table_fragments(documents[i]) for i in missing]
+    fragment_keys = [[parse_cache.document_key(fragment, "table") for fragment in doc_fragments]
+                     for doc_fragments in fragments_per_doc]
+    # Unchanged tables come from the cache; identical tables are parsed once
+    tables = {}
+    changed = {}
+    for doc_fragments, doc_keys in zip(fragments_per_doc, fragment_keys):
+        for fragment, key in zip(doc_fragments, doc_keys):
+            if key in tables or key in changed:
+                continue
+            cached = parse_cache.load(key)
+            if cached is None:
+                changed[key] = fragment
+            else:
+                tables[key] = cached
+
+    fragments = list(changed.values())
+    workers = min(get_worker_count(max_workers), len(fragments))
+    if workers <= 1 or sum(len(f) for f in fragments) < PARALLEL_MIN_BYTES:
+        parsed = [parse_table_fragment(fragment) for fragment in fragments]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        # With --profile, workers are profiled as part of the stage that started them
+        with ProcessPoolExecutor(max_workers=workers, **profiling.pool_kwargs()) as executor:
+            # map() yields in submission order, which keeps the merge deterministic
+            chunksize = max(1, len(fragments) // (workers * 4))
+            parsed = list(executor.map(parse_table_fragment, fragments, chunksize=chunksize))
+    tables.update(zip(changed, parsed))
+
+    new_entries = list(zip(changed, parsed))
+    for i, doc_keys in zip(missing, fragment_keys):
+        results[i] = [tables[key] for key in doc_keys]
+        new_entries.append((keys[i], results[i]))
+    parse_cache.store_many(new_entries)
+    return results
+
+
+def parse_document_tables(document, max_workers: int = None) -> list[tuple]:
+    """
+    Parses every table of one page.
+    Returns:
+        list[tuple]: (headers, rows) per table, in page order.
+    """
+    return parse_documents([document], max_workers)[0]
+
+
+def parse_catalog_records(document, max_workers: int = None) -> list:
+    """
+    Parses every table row of a page into records.CatalogRecord, resolving each
+    table's headers once (see CatalogRecord.from_table).
+    Args:
+        document (str | bytes): HTML content.
+    Returns:
+        list[CatalogRecord]: One record per table row, in page order.
+    """
+    from records import CatalogRecord
+    records = []
+    for headers, rows in parse_document_tables(document, max_workers):
+        records.extend(CatalogRecord.from_table(headers, rows))
+    return records
+
+
+def parse_catalog_rows(document, max_workers: int = None) -> list[dict]:
+    """
+    Parses every table row of a page into header -> cell text dictionaries.
+    A convenience for small pages and ad-hoc scripts; the modules work from
+    parse_document_tables() and resolve headers once per table.
+    Args:
+        document (str | bytes): HTML content.
+    Returns:
+        list[dict]: One dictionary per table row, in page order.
+    """
+    return [dict(zip(headers, row)) for headers, rows in parse_document_tables(document, max_workers) for row in rows]
@@ -1,10 +1,9 @@
-import urllib.request
-import csv
-
-try:
-    from bs4 import BeautifulSoup
-except ImportError:
-    raise ImportError("BeautifulSoup (bs4) is required. Install it with 'pip install beautifulsoup4'.")
+from catalog_aggregator import aggregate_models
+from catalog_parser import parse_catalog_records
+from model_card_crawler import crawl_model_cards
+from profiling import stage
+from providers import fetch_all_catalog_models
+from records import Record, write_records
 
 # mapping of known model names to their context window sizes and sources
 CONTEXT_WINDOW_INFO = {
@@ -88,83 +87,92 @@ CONTEXT_WINDOW_INFO = {
 SMALL_THRESHOLD = 8000
 LARGE_THRESHOLD = 100000
 
+
+class ContextWindowRecord(Record):
+    __slots__ = ("model_name", "tokens", "category", "source", "notes", "max_output", "max_output_source")
+    COLUMNS = ("Model name", "Context window tokens", "Category", "Source", "Notes",
+               "Max output tokens", "Max output source")
+
+    def __init__(self, model_name, tokens, category, source, notes, max_output, max_output_source):
+        self.model_name = model_name
+        self.tokens = tokens
+        self.category = category
+        self.source = source
+        self.notes = notes
+        self.max_output = max_output
+        self.max_output_source = max_output_source
+
 def fetch_bedrock_catalog() -> str:
     url = "https://docs.aws.amazon.com/bedrock/latest/userguide/models-supported.html"
+    import urllib.request
     with urllib.request.urlopen(url) as response:
         html = response.read().decode("utf-8")
     return html
 
-def parse_bedrock_models(html: str) -> list[dict]:
-    soup = BeautifulSoup(html, "html.parser")
-    models = []
-    tables = soup.find_all("table")
-    for table in tables:
-        headers = [th.get_text(strip=True) for th in table.find_all("th")]
-        for row in table.find_all("tr")[1:]:
-            cells = row.find_all("td")
-            if len(cells) != len(headers):
-                continue
-            model_info = {headers[i]: cells[i].get_text(strip=True) for i in range(len(headers))}
-            models.append(model_info)
-    return models
+def parse_bedrock_models(html: str) -> list:
+    # Tables are split out and parsed in a process pool when the page is large
+    return parse_catalog_records(html)
+
+def categorize_tokens(tokens) -> str:
+    # Only categorize if tokens is an int
+    if isinstance(tokens, int):
+        if tokens >= LARGE_THRESHOLD:
+            return "large"
+        elif tokens <= SMALL_THRESHOLD:
+            return "small"
+    return "unknown"
 
-def get_context_window_info(model_name: str) -> tuple:
+def get_context_window_info(model_name: str, card: dict = None) -> tuple:
+    """
+    Context window of a model: the hand-maintained CONTEXT_WINDOW_INFO entry, or
+    the value crawled from its model card when the entry is missing or unknown.
+    """
     info = CONTEXT_WINDOW_INFO.get(model_name)
-    if info:
+    if info and info["tokens"] != "unknown":
         tokens = info["tokens"]
-        source = info["source"]
-        notes = info.get("notes", "")
-        # Only categorize if tokens is an int
-        if isinstance(tokens, int):
-            if tokens >= LARGE_THRESHOLD:
-                category = "large"
-            elif tokens <= SMALL_THRESHOLD:
-                category = "small"
-            else:
-                category = "unknown"
-        else:
-            category = "unknown"
-        return tokens, category, source, notes
-    else:
-        return "unknown", "unknown", "unknown", "No public info as of 2024-06; checked provider docs and web."
+        return tokens, categorize_tokens(tokens), info["source"], info.get("notes", "")
+    if card and card.get("context"):
+        tokens = card["context"]
+        return tokens, categorize_tokens(tokens), card["url"], f"Extracted from model card, {card['fetched']}"
+    if info:
+        return info["tokens"], "unknown", info["source"], info.get("notes", "")
+    return "unknown", "unknown", "unknown", "No public info as of 2024-06; checked provider docs and web."
+
+def needs_card(model_name: str) -> bool:
+    """Whether CONTEXT_WINDOW_INFO lacks a context window for the model (missing or 'unknown')."""
+    info = CONTEXT_WINDOW_INFO.get(model_name)
+    return not info or info["tokens"] == "unknown"
 
-def build_context_window_table(models: list[dict]) -> list[dict]:
+def build_context_window_table(models: list, crawl: bool = True) -> list[ContextWindowRecord]:
     results = []
-    seen_models = set()  # Track seen model names to avoid duplicates
-    
-    for m in models:
-        name = m.get("Model name", "Unknown")
-        
-        # Skip if we've already processed this model
-        if name in seen_models:
-            continue
-            
-        seen_models.add(name)
-        tokens, category, source, notes = get_context_window_info(name)
-        results.append({
-            "Model name": name,
-            "Context window tokens": tokens,
-            "Category": category,
-            "Source": source,
-            "Notes": notes
-        })
+    # One merged record per model
+    aggregated = aggregate_models(models)
+    # Token limits from the card pages of models the hand-maintained table doesn't cover
+    # (see model_card_crawler.py)
+    with stage("crawl"):
+        cards = crawl_model_cards([m for m in aggregated if needs_card(m.model_name)]) if crawl else {}
+    for m in aggregated:
+        name = m.model_name
+        card = cards.get(name)
+        tokens, category, source, notes = get_context_window_info(name, card)
+        if card and card.get("max_output"):
+            max_output, max_output_source = card["max_output"], card["url"]
+        else:
+            max_output, max_output_source = "unknown", "unknown"
+        results.append(ContextWindowRecord(name, tokens, category, source, notes, max_output, max_output_source))
     return results
 
-def write_context_window_to_csv(results: list[dict], filename: str = "context_window_output.csv") -> None:
-    if not results:
-        return
-    with open(filename, mode="w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=results[0].keys())
-        writer.writeheader()
-        writer.writerows(results)
+def write_context_window_to_csv(results: list[ContextWindowRecord], filename: str = "context_window_output.csv") -> None:
+    write_records(results, filename)
 
 if __name__ == "__main__":
-    html = fetch_bedrock_catalog()
-    models = parse_bedrock_models(html)
-    print("Model names from AWS Bedrock catalog:")
+    # Bedrock plus the Azure, Vertex and Hugging Face catalogs, normalized to Bedrock's columns
+    models = fetch_all_catalog_models()
+    print("Model names from provider catalogs:")
     for m in models:
-        print(repr(m.get("Model name", "Unknown")))
+        print(repr(m.model_name))
     print(f"Total models found: {len(models)}")
-    context_window_results = build_context_window_table(models)
+    with stage("classify"):
+        context_window_results = build_context_window_table(models)
     write_context_window_to_csv(context_window_results)
     print(f"Wrote context window info for {len(context_window_results)} models to context_window_output.csv")
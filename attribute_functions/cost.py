@@ -1,5 +1,11 @@
-import csv
-from typing import List, Dict
+from typing import List
+
+from profiling import stage
+from records import Record, write_records
+from sharding import in_shard
+from vendor_database import MODEL_VENDOR_MAPPING
+from pricing import (BATCH, ON_DEMAND, PRICING_TABLE_FILE, REFERENCE_REGION_ENV, DEFAULT_REFERENCE_REGION,
+                     format_price, load_price_table)
 
 # Simple cost categories
 COST_CATEGORIES = {
@@ -18,7 +24,8 @@ COST_CATEGORIES = {
     }
 }
 
-# Core models with their pricing (simplified)
+# Built-in prices (USD per 1K tokens), used for models the pricing pages don't list
+# or when they can't be loaded
 MODEL_PRICING = {
     "Claude 3.7 Sonnet": {
         "input": 0.003, 
@@ -43,6 +50,27 @@ MODEL_PRICING = {
 }
 
 
+class CostRecord(Record):
+    __slots__ = ("model", "input_cost", "output_cost", "total_cost", "input_category", "total_category",
+                 "description", "batch_input_cost", "batch_output_cost", "price_region", "price_source")
+    COLUMNS = ("Model", "Input Cost", "Output Cost", "Total Cost", "Input Category", "Total Category",
+               "Description", "Batch Input Cost", "Batch Output Cost", "Price Region", "Price Source")
+
+    def __init__(self, model, input_cost, output_cost, total_cost, input_category, total_category,
+                 description, batch_input_cost, batch_output_cost, price_region, price_source):
+        self.model = model
+        self.input_cost = input_cost
+        self.output_cost = output_cost
+        self.total_cost = total_cost
+        self.input_category = input_category
+        self.total_category = total_category
+        self.description = description
+        self.batch_input_cost = batch_input_cost
+        self.batch_output_cost = batch_output_cost
+        self.price_region = price_region
+        self.price_source = price_source
+
+
 def categorize_cost(input_rate: float) -> str:
     """Simple cost categorization based on input rate"""
     if input_rate <= COST_CATEGORIES["Low Cost"]["max_rate"]:
@@ -63,41 +91,61 @@ def categorize_total_cost(total_rate: float) -> str:
         return "High Cost"
 
 
-def analyze_costs() -> List[Dict[str, str]]:
-    """Analyze costs for all models"""
+def analyze_costs(price_table=None, region: str = None) -> List[CostRecord]:
+    """
+    Analyze costs for every model in the vendor database.
+    On-demand prices come from the parsed pricing pages (see pricing.py), from
+    `region` when the model is priced there, falling back to MODEL_PRICING.
+    Args:
+        price_table (PriceTable, optional): Parsed prices. Without one, only MODEL_PRICING is used.
+        region (str, optional): Reference region. Defaults to LLM_DB_PRICING_REGION or us-east-1.
+    Returns:
+        List[CostRecord]: One record per priced model.
+    """
+    import os
+    region = region or os.environ.get(REFERENCE_REGION_ENV, DEFAULT_REFERENCE_REGION)
     results = []
     
-    for model_name, pricing in MODEL_PRICING.items():
+    for model_name in MODEL_VENDOR_MAPPING:
+        if not in_shard(model_name):
+            continue
+        pricing, price_region, source = price_table.lookup(model_name, ON_DEMAND, region) if price_table else (None, None, None)
+        if pricing is None:
+            if model_name not in MODEL_PRICING:
+                continue
+            pricing, price_region, source = MODEL_PRICING[model_name], "", "built-in"
+        batch = price_table.lookup(model_name, BATCH, price_region or region)[0] if price_table else None
         input_rate = pricing["input"]
         output_rate = pricing["output"]
         total_cost = input_rate + output_rate
         input_category = categorize_cost(input_rate)
         total_category = categorize_total_cost(total_cost)
         
-        results.append({
-            "Model": model_name,
-            "Input Cost": f"${input_rate:.6f}",
-            "Output Cost": f"${output_rate:.6f}",
-            "Total Cost": f"${total_cost:.6f}",
-            "Input Category": input_category,
-            "Total Category": total_category,
-            "Description": COST_CATEGORIES[input_category]["description"]
-        })
+        results.append(CostRecord(
+            model_name,
+            f"${input_rate:.6f}",
+            f"${output_rate:.6f}",
+            f"${total_cost:.6f}",
+            input_category,
+            total_category,
+            COST_CATEGORIES[input_category]["description"],
+            format_price(batch["input"]) if batch else "",
+            format_price(batch["output"]) if batch else "",
+            price_region,
+            source
+        ))
     
     return results
 
 
-def save_to_csv(results: List[Dict[str, str]], filename: str = "cost_analysis.csv"):
+def save_to_csv(results: List[CostRecord], filename: str = "cost_analysis.csv"):
     """Save results to CSV"""
     if not results:
         print("No results to save.")
         return
         
     try:
-        with open(filename, "w", newline="", encoding="utf-8") as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=results[0].keys())
-            writer.writeheader()
-            writer.writerows(results)
+        write_records(results, filename, encoding="utf-8")
         print(f"Results saved to {filename}")
     except Exception as e:
         print(f"Error saving to CSV: {e}")
@@ -107,31 +155,38 @@ def main():
     print("LLM Cost Analysis")
     print("=" * 40)
     
+    # Stream-parse the pricing pages (cached on disk) into a per-region, per-mode table
+    with stage("pricing"):
+        price_table = load_price_table()
+        priced = price_table.save(PRICING_TABLE_FILE, keep=lambda model: model in MODEL_VENDOR_MAPPING and in_shard(model))
+    print(f"Pricing table: {priced} model/region/mode prices saved to {PRICING_TABLE_FILE}")
+    
     # Analyze costs
-    results = analyze_costs()
+    with stage("classify"):
+        results = analyze_costs(price_table)
     
     # Display results
     for result in results:
-        print(f"\n{result['Model']}")
-        print(f"  Input: {result['Input Cost']} per 1K tokens")
-        print(f"  Output: {result['Output Cost']} per 1K tokens")
-        print(f"  Total: {result['Total Cost']} per 2K tokens")
-        print(f"  Input Category: {result['Input Category']}")
-        print(f"  Total Category: {result['Total Category']}")
+        print(f"\n{result.model}")
+        print(f"  Input: {result.input_cost} per 1K tokens")
+        print(f"  Output: {result.output_cost} per 1K tokens")
+        print(f"  Total: {result.total_cost} per 2K tokens")
+        print(f"  Input Category: {result.input_category}")
+        print(f"  Total Category: {result.total_category}")
     
     # Save to CSV
     save_to_csv(results)
     
     # Summary
     print(f"\nSummary (by Input Cost):")
-    input_categories = [r["Input Category"] for r in results]
+    input_categories = [r.input_category for r in results]
     for category in COST_CATEGORIES:
         count = input_categories.count(category)
         if count > 0:
             print(f"  {category}: {count} model(s)")
     
     print(f"\nSummary (by Total Cost):")
-    total_categories = [r["Total Category"] for r in results]
+    total_categories = [r.total_category for r in results]
     for category in COST_CATEGORIES:
         count = total_categories.count(category)
         if count > 0:
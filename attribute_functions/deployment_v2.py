@@ -1,10 +1,23 @@
-import urllib.request
-import csv
+from catalog_aggregator import aggregate_models
+from catalog_parser import parse_catalog_records
+from profiling import stage
+from providers import fetch_all_catalog_models
+from records import Record, as_record, write_records
+from region_index import MASK_COLUMN, format_mask, region_mask
 
-try:
-    from bs4 import BeautifulSoup
-except ImportError:
-    raise ImportError("BeautifulSoup (bs4) is required. Install it with 'pip install beautifulsoup4'.")
+# Catalogs whose models are only offered as managed endpoints
+HOSTED_CATALOGS = {"bedrock", "azure", "vertex"}
+
+
+class DeploymentRecord(Record):
+    __slots__ = ("model_name", "deployment_type", "region_mask", "region_count")
+    COLUMNS = ("Model name", "Deployment type", MASK_COLUMN, "Region count")
+
+    def __init__(self, model_name, deployment_type, region_mask, region_count):
+        self.model_name = model_name
+        self.deployment_type = deployment_type
+        self.region_mask = region_mask
+        self.region_count = region_count
 
 
 def fetch_bedrock_catalog() -> str:
@@ -14,31 +27,22 @@ def fetch_bedrock_catalog() -> str:
         str: HTML content of the catalog.
     """
     url = "https://docs.aws.amazon.com/bedrock/latest/userguide/models-supported.html"
+    import urllib.request
     with urllib.request.urlopen(url) as response:
         html = response.read().decode("utf-8")
     return html
 
 
-def parse_bedrock_models(html: str) -> list[dict]:
-    soup = BeautifulSoup(html, "html.parser")
-    models = []
-    tables = soup.find_all("table")
-    for table in tables:
-        headers = [th.get_text(strip=True) for th in table.find_all("th")]
-        for row in table.find_all("tr")[1:]:  
-            cells = row.find_all("td")
-            if len(cells) != len(headers):
-                continue
-            model_info = {headers[i]: cells[i].get_text(strip=True) for i in range(len(headers))}
-            models.append(model_info)
-    return models
+def parse_bedrock_models(html: str) -> list:
+    # Tables are split out and parsed in a process pool when the page is large
+    return parse_catalog_records(html)
 
 
-def check_hybrid_capability(model: dict) -> bool:
+def check_hybrid_capability(model) -> bool:
     """
     checks if the model supports hybrid deployment based on its information.
     args:
-        model (dict): Model information dictionary.
+        model (CatalogRecord): Model record, including the catalog's extra columns.
     returns:
         bool: True if hybrid deployment is supported, False otherwise.
     """
@@ -55,79 +59,77 @@ def check_hybrid_capability(model: dict) -> bool:
     return False
 
 
-def get_deployment_type(model: dict) -> str:
+def get_deployment_type(model) -> str:
     """
     infers deployment type (Cloud, On-premises, Hybrid, Unknown) for a model.
     args:
-        model (dict): Model information dictionary.
+        model (CatalogRecord | dict): Model record.
     returns:
         str: Deployment type.
     """
+    model = as_record(model)
     if check_hybrid_capability(model):
         return "Hybrid"
-    regions = model.get("Regions supported", "")
-    if regions:
-        # If there are AWS regions listed, it's Cloud
+    if model.regions or model.catalog_source in HOSTED_CATALOGS:
+        # If there are regions listed, or the model comes from a hosted catalog, it's Cloud
         return "Cloud"
     # If no regions and no hybrid clues, assume On-premises
     return "On-premises"
 
 
-def get_model_deployment_info(model_names: list[str], catalog_models: list[dict]) -> list[dict]:
+def get_model_deployment_info(model_names: list[str], catalog_models: list) -> list[DeploymentRecord]:
     """
     gets deployment info for input models.
     args:
         model_names (list[str]): List of model names to check.
-        catalog_models (list[dict]): List of all catalog model dictionaries.
+        catalog_models (list[CatalogRecord | dict]): Catalog (or aggregated) model records.
     returns:
-        list[dict]: List of dicts with model name and deployment type.
+        list[DeploymentRecord]: Model name, deployment type and region mask
+        (see region_index.py) per name.
     """
     results = []
+    # Index the catalog once; the first model with a matching name wins
+    catalog_by_name = {}
+    for m in map(as_record, catalog_models):
+        catalog_by_name.setdefault(m.model_name, m)
     for name in model_names:
-        # Find the first model in the catalog with a matching name
-        model = next((m for m in catalog_models if m.get("Model name", "") == name), None)
+        model = catalog_by_name.get(name)
         if model:
             deployment_type = get_deployment_type(model)
+            mask, unknown = region_mask(model.regions)
+            if unknown:
+                print(f"Warning: regions not in region_index.REGIONS for {name}: {', '.join(unknown)}")
         else:
             deployment_type = "Unknown"
-        results.append({"Model name": name, "Deployment type": deployment_type})
+            mask = 0
+        results.append(DeploymentRecord(name, deployment_type, format_mask(mask), bin(mask).count("1")))
     return results
 
 
-def write_results_to_csv(results: list[dict], filename: str = "deployment.csv") -> None:
+def write_results_to_csv(results: list[DeploymentRecord], filename: str = "deployment.csv") -> None:
     """
     Writes the results to a CSV file.
     Args:
-        results (list[dict]): List of model deployment info dicts.
+        results (list[DeploymentRecord]): Model deployment records.
         filename (str, optional): Output CSV filename. Defaults to 'deployment.csv'.
     Returns:
         None
     """
-    if not results:
-        return
-    with open(filename, mode="w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=results[0].keys())
-        writer.writeheader()
-        writer.writerows(results)
+    write_records(results, filename)
 
 
 if __name__ == "__main__":
-    html = fetch_bedrock_catalog()
-    models = parse_bedrock_models(html)
+    # Bedrock plus the Azure, Vertex and Hugging Face catalogs, normalized to Bedrock's columns
+    models = fetch_all_catalog_models()
     print(f"Total models found: {len(models)}")
     for m in models[:3]:
-        name = m.get("Model name", "Unknown")
-        print(f"Model: {name}")
+        print(f"Model: {m.model_name}")
         print(f"  Hybrid capable: {check_hybrid_capability(m)}")
         print(f"  Deployment type: {get_deployment_type(m)}")
-    # Write all models' deployment info to CSV (deduplicated)
-    seen_models = set()
-    model_names = []
-    for m in models:
-        name = m.get("Model name", "Unknown")
-        if name not in seen_models:
-            seen_models.add(name)
-            model_names.append(name)
-    results = get_model_deployment_info(model_names, models)
+    # Write all models' deployment info to CSV (one merged record per model)
+    with stage("classify"):
+        aggregated = aggregate_models(models)
+        model_names = [m.model_name for m in aggregated]
+        results = get_model_deployment_info(model_names, aggregated)
     write_results_to_csv(results)
     print(f"Wrote deployment info for {len(results)} models to deployment.csv")
@@ -1,73 +1,113 @@
-import urllib.request
-import csv
-import difflib
+import os
+
+from catalog_parser import parse_documents, parse_document_tables
+from profiling import stage
+from records import Record, TableColumns, write_records
+from sharding import filter_models
+
+
+class MasterModel(Record):
+    """A master catalog entry, reduced to what batch matching and shard filtering read."""
+    __slots__ = ("model_id", "provider", "model_name", "match_name")
+    COLUMNS = ("model-id", "Provider", "Model name")
+    INTERNAL = ("match_name",)
+
+    def __init__(self, model_id, provider, model_name, match_name):
+        self.model_id = model_id
+        self.provider = provider
+        self.model_name = model_name
+        # 'Model name', or 'Model' on tables without one
+        self.match_name = match_name
+
+
+class BatchModel(Record):
+    __slots__ = ("provider", "model")
+    COLUMNS = ("Provider", "Model")
+
+    def __init__(self, provider, model):
+        self.provider = provider
+        self.model = model
+
+
+class LatencyLabel(Record):
+    __slots__ = ("model_id", "support_type")
+    COLUMNS = ("model-id", "support_type")
+
+    def __init__(self, model_id, support_type):
+        self.model_id = model_id
+        self.support_type = support_type
 
-try:
-    from bs4 import BeautifulSoup
-except ImportError:
-    raise ImportError("BeautifulSoup (bs4) is required. Install it with 'pip install beautifulsoup4'.")
 
 def fetch_html(url: str) -> str:
+    import urllib.request
     with urllib.request.urlopen(url) as response:
         html = response.read().decode("utf-8")
     return html
 
-def parse_master_model_ids(html: str) -> list[dict]:
-    soup = BeautifulSoup(html, "html.parser")
+def first_column(columns: TableColumns, candidates: tuple) -> int | None:
+    """Index of the first candidate header present in the table (exact match), if any."""
+    for header in candidates:
+        if header in columns.index:
+            return columns.index[header]
+    return None
+
+def master_models_from_tables(tables: list[tuple]) -> list[MasterModel]:
     models = []
-    tables = soup.find_all("table")
-    for table in tables:
-        headers = [th.get_text(strip=True) for th in table.find_all("th")]
-        for row in table.find_all("tr")[1:]:
-            cells = row.find_all("td")
-            if len(cells) != len(headers):
-                continue
-            model_info = {headers[i]: cells[i].get_text(strip=True) for i in range(len(headers))}
-            # Add Model ID for matching
-            if "Model ID" in model_info:
-                model_info["model-id"] = model_info["Model ID"]
-            elif "Model Id" in model_info:
-                model_info["model-id"] = model_info["Model Id"]
-            elif "Model" in model_info:
-                model_info["model-id"] = model_info["Model"]
-            else:
-                model_info["model-id"] = cells[0].get_text(strip=True)
-            models.append(model_info)
+    for headers, rows in tables:
+        if not headers:
+            continue
+        # Columns are resolved once per table
+        columns = TableColumns(headers)
+        # Model ID for matching, falling back to the table's first column
+        id_index = first_column(columns, ("Model ID", "Model Id", "Model"))
+        if id_index is None:
+            id_index = columns.index[columns.headers[0]]
+        provider_index = first_column(columns, ("Provider", "Model provider"))
+        name_index = columns.index.get("Model name")
+        match_index = first_column(columns, ("Model name", "Model"))
+        for cells in rows:
+            models.append(MasterModel(
+                cells[id_index],
+                cells[provider_index] if provider_index is not None else "",
+                cells[name_index] if name_index is not None else "",
+                cells[match_index] if match_index is not None else "",
+            ))
     return models
 
-def parse_batch_enabled_models_table(html: str) -> list[dict]:
-    soup = BeautifulSoup(html, "html.parser")
+def batch_models_from_tables(tables: list[tuple]) -> list[BatchModel]:
     models = []
-    for table in soup.find_all("table"):
-        headers = [th.get_text(strip=True) for th in table.find_all("th")]
+    for headers, rows in tables:
         if not ("Provider" in headers and "Model" in headers):
             continue
-        for row in table.find_all("tr")[1:]:
-            cells = row.find_all("td")
-            if len(cells) != len(headers):
-                continue
-            model_info = {headers[i]: cells[i].get_text(strip=True) for i in range(len(headers))}
-            models.append(model_info)
+        columns = TableColumns(headers)
+        provider_index, model_index = columns.index["Provider"], columns.index["Model"]
+        models.extend(BatchModel(cells[provider_index], cells[model_index]) for cells in rows)
     return models
 
-def match_batch_models_to_master(batch_models: list[dict], master_models: list[dict]) -> set[str]:
+def parse_master_model_ids(html: str) -> list[MasterModel]:
+    return master_models_from_tables(parse_document_tables(html))
+
+def parse_batch_enabled_models_table(html: str) -> list[BatchModel]:
+    return batch_models_from_tables(parse_document_tables(html))
+
+def match_batch_models_to_master(batch_models: list[BatchModel], master_models: list[MasterModel]) -> set[str]:
     batch_model_ids = set()
+    # Lowercase the master fields once rather than per batch row
+    master = [(m.provider.lower(), m.match_name.lower(), m.model_id.lower(), m.model_id) for m in master_models]
     for batch in batch_models:
-        batch_provider = batch.get("Provider", "").lower()
-        batch_model = batch.get("Model", "").lower()
+        batch_provider = batch.provider.lower()
+        batch_model = batch.model.lower()
         # Try to find the best match in master_models
         candidates = []
-        for m in master_models:
-            provider = m.get("Provider", m.get("Model provider", "")).lower()
-            model_name = m.get("Model name", m.get("Model", "")).lower()
-            model_id = m.get("model-id", "").lower()
+        for provider, model_name, model_id, original_id in master:
             # Heuristic: match if provider and model name are both in the master model info
             if batch_provider in provider and batch_model in model_name:
-                candidates.append(m["model-id"])
+                candidates.append(original_id)
             elif batch_provider in provider and batch_model in model_id:
-                candidates.append(m["model-id"])
+                candidates.append(original_id)
         # If multiple candidates, use difflib to get the closest
         if candidates:
+            import difflib
             best = difflib.get_close_matches(batch_model, candidates, n=1)
             if best:
                 batch_model_ids.add(best[0])
@@ -75,39 +115,42 @@ def match_batch_models_to_master(batch_models: list[dict], master_models: list[d
                 batch_model_ids.add(candidates[0])
     return batch_model_ids
 
-def cross_reference_batch_support(master_models: list[dict], batch_model_ids: set[str]) -> list[dict]:
+def cross_reference_batch_support(master_models: list[MasterModel], batch_model_ids: set[str]) -> list[LatencyLabel]:
     labeled = []
     for m in master_models:
-        model_id = m["model-id"]
-        support_type = "batch-supported" if model_id in batch_model_ids else "real-time only"
-        labeled.append({"model-id": model_id, "support_type": support_type})
+        support_type = "batch-supported" if m.model_id in batch_model_ids else "real-time only"
+        labeled.append(LatencyLabel(m.model_id, support_type))
     return labeled
 
-def write_labeled_models_to_csv(labeled_list: list[dict], filename: str = "latency_label.csv") -> None:
-    if not labeled_list:
-        return
-    with open(filename, mode="w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=labeled_list[0].keys())
-        writer.writeheader()
-        writer.writerows(labeled_list)
+def write_labeled_models_to_csv(labeled_list: list[LatencyLabel], filename: str = "latency_label.csv") -> None:
+    write_records(labeled_list, filename)
 
 if __name__ == "__main__":
-    master_url = "https://docs.aws.amazon.com/bedrock/latest/userguide/models-supported.html"
-    batch_url = "https://docs.aws.amazon.com/bedrock/latest/userguide/batch-inference-supported.html"
-    print("Fetching master model catalog...")
-    master_html = fetch_html(master_url)
-    master_models = parse_master_model_ids(master_html)
+    # Same LLM_DB_*_URL overrides as providers.py, for running against fixture pages
+    master_url = os.environ.get("LLM_DB_BEDROCK_URL", "https://docs.aws.amazon.com/bedrock/latest/userguide/models-supported.html")
+    batch_url = os.environ.get("LLM_DB_BEDROCK_BATCH_URL", "https://docs.aws.amazon.com/bedrock/latest/userguide/batch-inference-supported.html")
+    with stage("fetch"):
+        print("Fetching master model catalog...")
+        master_html = fetch_html(master_url)
+        print("Fetching batch-enabled model list...")
+        batch_html = fetch_html(batch_url)
+    with stage("parse"):
+        # Parse both pages' tables in one process pool
+        master_tables, batch_tables = parse_documents([master_html, batch_html])
+        all_master_models = master_models_from_tables(master_tables)
+        master_models = filter_models(all_master_models)
+        batch_models = batch_models_from_tables(batch_tables)
     print(f"Total models in master catalog: {len(master_models)}")
-    print("Fetching batch-enabled model list...")
-    batch_html = fetch_html(batch_url)
-    batch_models = parse_batch_enabled_models_table(batch_html)
     print(f"Total batch-enabled models (table rows): {len(batch_models)}")
-    batch_model_ids = match_batch_models_to_master(batch_models, master_models)
+    with stage("classify"):
+        # Batch matching sees every catalog entry, so a shard picks the same IDs as an
+        # unsharded build; only this shard's models are labeled
+        batch_model_ids = match_batch_models_to_master(batch_models, all_master_models)
+        labeled_list = cross_reference_batch_support(master_models, batch_model_ids)
     print(f"Matched batch-enabled model IDs: {len(batch_model_ids)}")
-    labeled_list = cross_reference_batch_support(master_models, batch_model_ids)
     print("Sample labeled models:")
     for m in labeled_list[:3]:
-        print(f"  {m['model-id']}: {m['support_type']}")
+        print(f"  {m.model_id}: {m.support_type}")
     write_labeled_models_to_csv(labeled_list)
     print(f"Wrote batch support info for {len(labeled_list)} models to latency_label.csv")
 
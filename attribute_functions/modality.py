@@ -1,10 +1,18 @@
-import urllib.request
-import csv
+from catalog_aggregator import aggregate_models
+from catalog_parser import parse_catalog_records
+from profiling import stage
+from providers import fetch_all_catalog_models
+from records import Record, write_records
 
-try:
-    from bs4 import BeautifulSoup
-except ImportError:
-    raise ImportError("BeautifulSoup (bs4) is required. Install it with 'pip install beautifulsoup4'.")
+
+class ModalityRecord(Record):
+    __slots__ = ("model_name", "input_modalities", "output_modalities")
+    COLUMNS = ("Model name", "Input modalities", "Output modalities")
+
+    def __init__(self, model_name, input_modalities, output_modalities):
+        self.model_name = model_name
+        self.input_modalities = input_modalities
+        self.output_modalities = output_modalities
 
 
 def fetch_bedrock_catalog() -> str:
@@ -14,89 +22,60 @@ def fetch_bedrock_catalog() -> str:
         str: HTML content of the catalog.
     """
     url = "https://docs.aws.amazon.com/bedrock/latest/userguide/models-supported.html"
+    import urllib.request
     with urllib.request.urlopen(url) as response:
         html = response.read().decode("utf-8")
     return html
 
 
-def parse_bedrock_models(html: str) -> list[dict]:
+def parse_bedrock_models(html: str) -> list:
     """
     Parses the AWS Bedrock catalog HTML to extract model information.
     Args:
         html (str): HTML content of the catalog.
     Returns:
-        list[dict]: List of model info dictionaries.
+        list[CatalogRecord]: One record per catalog row.
     """
-    soup = BeautifulSoup(html, "html.parser")
-    models = []
-    tables = soup.find_all("table")
-    for table in tables:
-        headers = [th.get_text(strip=True) for th in table.find_all("th")]
-        for row in table.find_all("tr")[1:]:  
-            cells = row.find_all("td")
-            if len(cells) != len(headers):
-                continue
-            model_info = {headers[i]: cells[i].get_text(strip=True) for i in range(len(headers))}
-            models.append(model_info)
-    return models
+    # Tables are split out and parsed in a process pool when the page is large
+    return parse_catalog_records(html)
 
 
-def get_modality_info(models: list[dict]) -> list[dict]:
+def get_modality_info(models: list) -> list[ModalityRecord]:
     """
     For each model, extract only model name, input modalities, and output modalities.
+    Variant rows of the same model are merged, so modalities are the union across variants.
     Args:
-        models (list[dict]): List of model dictionaries from the catalog.
+        models (list[CatalogRecord]): Catalog rows (providers.fetch_all_catalog_models).
     Returns:
-        list[dict]: List of dicts with model name, input modalities, and output modalities.
+        list[ModalityRecord]: Model name, input modalities, and output modalities per model.
     """
-    results = []
-    seen_models = set()  # Track seen model names to avoid duplicates
-    
-    for m in models:
-        name = m.get("Model name", "Unknown")
-        
-        # Skip if we've already processed this model
-        if name in seen_models:
-            continue
-            
-        seen_models.add(name)
-        input_mod = m.get("Input modalities", "").strip()
-        output_mod = m.get("Output modalities", "").strip()
-        results.append({
-            "Model name": name,
-            "Input modalities": input_mod,
-            "Output modalities": output_mod
-        })
-    return results
+    return [ModalityRecord(m.model_name, m.input_modalities.strip(), m.output_modalities.strip())
+            for m in aggregate_models(models)]
 
 
-def write_modality_results_to_csv(results: list[dict], filename: str = "modality_output.csv") -> None:
+def write_modality_results_to_csv(results: list[ModalityRecord], filename: str = "modality_output.csv") -> None:
     """
     Writes the modality results to a CSV file.
     Args:
-        results (list[dict]): List of model modality info dicts.
+        results (list[ModalityRecord]): Model modality records.
         filename (str, optional): Output CSV filename. Defaults to 'modality_output.csv'.
     Returns:
         None
     """
-    if not results:
-        return
-    with open(filename, mode="w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=results[0].keys())
-        writer.writeheader()
-        writer.writerows(results)
+    write_records(results, filename)
 
 
 if __name__ == "__main__":
-    html = fetch_bedrock_catalog()
-    models = parse_bedrock_models(html)
+    # Bedrock plus the Azure, Vertex and Hugging Face catalogs, normalized to Bedrock's columns
+    models = fetch_all_catalog_models()
     print(f"Total models found: {len(models)}")
     # Print a few sample modality results
-    modality_results = get_modality_info(models)
+    with stage("classify"):
+        modality_results = get_modality_info(models)
     for m in modality_results[:3]:
-        print(f"Model: {m['Model name']}")
-        print(f"  Input modalities: {m['Input modalities']}")
-        print(f"  Output modalities: {m['Output modalities']}")
+        print(f"Model: {m.model_name}")
+        print(f"  Input modalities: {m.input_modalities}")
+        print(f"  Output modalities: {m.output_modalities}")
     # Write all models' modality info to CSV
     write_modality_results_to_csv(modality_results)
     print(f"Wrote modality info for {len(modality_results)} models to modality_output.csv")
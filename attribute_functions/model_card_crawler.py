@@ -0,0 +1,268 @@
+import os
+import re
+import html
+import time
+import hashlib
+import threading
+import urllib.parse
+
+from catalog_aggregator import split_values
+from profiling import profiled
+
+# Model card URL per catalog source. {model_id} is the catalog's model ID (URL-quoted),
+# {slug} the ID without its version suffix and with dots as dashes
+# ('amazon.nova-lite-v1:0' -> 'amazon-nova-lite'). Override with e.g.
+# LLM_DB_BEDROCK_CARD_URL=http://localhost:8000/cards/{slug}.html
+CARD_URL_TEMPLATES = {
+    "bedrock": "https://docs.aws.amazon.com/bedrock/latest/userguide/model-card-{slug}.html",
+    "huggingface": "https://huggingface.co/{model_id}/raw/main/config.json",
+}
+CARD_URL_ENV = "LLM_DB_{source}_CARD_URL"
+
+CONCURRENCY_ENV = "LLM_DB_CRAWL_CONCURRENCY"  # 0 disables crawling
+DELAY_ENV = "LLM_DB_CRAWL_DELAY"  # seconds between requests to one host
+CACHE_DIR_ENV = "LLM_DB_CRAWL_CACHE_DIR"
+MAX_AGE_ENV = "LLM_DB_CRAWL_MAX_AGE_HOURS"
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_DELAY = 1.0
+DEFAULT_MAX_AGE_HOURS = 7 * 24
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".crawl_cache")
+TIMEOUT = 15
+USER_AGENT = "llm-vendor-database/1.0 (model card crawler)"
+
+# A number such as '128K', '1M', '32,768' or '1.5 million'
+NUMBER = r"(\d[\d,]*(?:\.\d+)?)\s*(k|m|thousand|million)?\b"
+# Label, up to a few words of filler ('of', 'is up to', ':'), then the number
+CONTEXT_EXTRACTORS = [
+    re.compile(r"(?:context window|context length|context size|max(?:imum)? context"
+               r"|max(?:imum)? input tokens?|max(?:imum)? sequence length)"
+               r"[^0-9.]{0,30}?" + NUMBER, re.IGNORECASE),
+    re.compile(r'"(?:max_position_embeddings|max_seq_len|n_positions|model_max_length)"\s*:\s*' + NUMBER),
+]
+OUTPUT_EXTRACTORS = [
+    re.compile(r"(?:max(?:imum)? output(?: tokens?| length)?|output token limit"
+               r"|max(?:imum)? (?:new |completion |generated )?tokens)"
+               r"[^0-9.]{0,30}?" + NUMBER, re.IGNORECASE),
+]
+MULTIPLIERS = {"k": 1_000, "thousand": 1_000, "m": 1_000_000, "million": 1_000_000}
+# Values outside this range are version numbers, prices or dimensions, not token limits
+MIN_TOKENS, MAX_TOKENS = 256, 50_000_000
+
+SCRIPT_PATTERN = re.compile(r"<(script|style)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+TAG_PATTERN = re.compile(r"<[^>]+>")
+SPACE_PATTERN = re.compile(r"\s+")
+VERSION_SUFFIX = re.compile(r"-v\d+(?::\d+)?$")
+
+
+def page_text(document: str) -> str:
+    """Visible text of an HTML page (JSON passes through unchanged)."""
+    text = SCRIPT_PATTERN.sub(" ", document)
+    text = TAG_PATTERN.sub(" ", text)
+    return SPACE_PATTERN.sub(" ", html.unescape(text))
+
+
+def to_tokens(number: str, unit: str) -> int | None:
+    value = float(number.replace(",", "")) * MULTIPLIERS.get((unit or "").lower(), 1)
+    value = int(round(value))
+    return value if MIN_TOKENS <= value <= MAX_TOKENS else None
+
+
+def extract(text: str, extractors: list) -> int | None:
+    """First plausible token count matched by the extractors, in extractor order."""
+    for extractor in extractors:
+        for match in extractor.finditer(text):
+            value = to_tokens(match.group(1), match.group(2))
+            if value:
+                return value
+    return None
+
+
+def extract_limits(document: str) -> dict:
+    """
+    Extracts token limits from a model card.
+    Returns:
+        dict: 'context' and 'max_output' token counts (None when not found).
+    """
+    text = page_text(document)
+    return {"context": extract(text, CONTEXT_EXTRACTORS), "max_output": extract(text, OUTPUT_EXTRACTORS)}
+
+
+def card_url(model) -> str | None:
+    """Model card URL for an aggregated catalog record, from its first source with a template."""
+    model_ids = split_values("Model ID", model.model_id)
+    if not model_ids:
+        return None
+    model_id = model_ids[0]
+    for source in split_values("Catalog source", model.catalog_source):
+        template = os.environ.get(CARD_URL_ENV.format(source=source.upper()), CARD_URL_TEMPLATES.get(source))
+        if template:
+            slug = VERSION_SUFFIX.sub("", model_id).replace(".", "-")
+            return template.format(model_id=urllib.parse.quote(model_id, safe="/"),
+                                   slug=urllib.parse.quote(slug, safe="/"))
+    return None
+
+
+class HostThrottle:
+    """Spaces the start of requests to the same host by at least `delay` seconds."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.next_start = {}
+
+    def wait(self, host: str) -> None:
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_start.get(host, now))
+            self.next_start[host] = start + self.delay
+        if start > now:
+            time.sleep(start - now)
+
+
+class PageCache:
+    """
+    On-disk cache of fetched pages, keyed by URL hash. Pages that don't exist (404)
+    are cached too, so they aren't requested again until the entry expires.
+    """
+
+    def __init__(self, directory: str, max_age_hours: float):
+        self.directory = directory
+        self.max_age = max_age_hours * 3600
+
+    def path(self, url: str, missing: bool = False) -> str:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, key + (".missing" if missing else ".html"))
+
+    def load(self, url: str):
+        """Returns (found, text, fetched timestamp); found is None on a cache miss."""
+        for missing in (False, True):
+            path = self.path(url, missing)
+            try:
+                fetched = os.path.getmtime(path)
+                if time.time() - fetched > self.max_age:
+                    continue
+                with open(path, encoding="utf-8") as f:
+                    return not missing, f.read(), fetched
+            except OSError:
+                continue
+        return None, None, None
+
+    def store(self, url: str, text: str | None) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(url, missing=text is None)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(text or "")
+        os.replace(temp_path, path)
+        # A page that exists now replaces an earlier 'missing' entry and vice versa
+        try:
+            os.remove(self.path(url, missing=text is not None))
+        except FileNotFoundError:
+            pass
+
+
+class ModelCardCrawler:
+    """
+    Fetches model cards with bounded concurrency, a per-host politeness delay and
+    an on-disk cache. After a connection failure to a host, the remaining pages on
+    that host are skipped for this run.
+    """
+
+    def __init__(self, concurrency: int = None, delay: float = None, cache_dir: str = None,
+                 max_age_hours: float = None):
+        self.concurrency = int(os.environ.get(CONCURRENCY_ENV, DEFAULT_CONCURRENCY)) if concurrency is None else concurrency
+        self.throttle = HostThrottle(float(os.environ.get(DELAY_ENV, DEFAULT_DELAY)) if delay is None else delay)
+        self.cache = PageCache(
+            cache_dir or os.environ.get(CACHE_DIR_ENV) or DEFAULT_CACHE_DIR,
+            float(os.environ.get(MAX_AGE_ENV, DEFAULT_MAX_AGE_HOURS)) if max_age_hours is None else max_age_hours,
+        )
+        self.unreachable = set()
+        self.stats = {"cached": 0, "fetched": 0, "missing": 0, "failed": 0}
+        self.lock = threading.Lock()
+
+    def count(self, outcome: str) -> None:
+        with self.lock:
+            self.stats[outcome] += 1
+
+    def fetch(self, url: str):
+        """Returns (text or None, fetched timestamp)."""
+        import urllib.error
+        import urllib.request
+
+        found, text, fetched = self.cache.load(url)
+        if found is not None:
+            self.count("cached")
+            return (text if found else None), fetched
+        host = urllib.parse.urlsplit(url).netloc
+        if host in self.unreachable:
+            self.count("failed")
+            return None, None
+        self.throttle.wait(host)
+        if host in self.unreachable:
+            # Another request to this host failed while this one waited its turn
+            self.count("failed")
+            return None, None
+        request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+        try:
+            with urllib.request.urlopen(request, timeout=TIMEOUT) as response:
+                text = response.read().decode("utf-8", errors="replace")
+        except urllib.error.HTTPError as e:
+            if e.code in (404, 410):
+                self.cache.store(url, None)
+                self.count("missing")
+            else:
+                self.count("failed")
+            return None, None
+        except (urllib.error.URLError, OSError) as e:
+            with self.lock:
+                if host not in self.unreachable:
+                    print(f"Warning: model cards on {host} unreachable ({e}); skipping them this run")
+                    self.unreachable.add(host)
+            self.count("failed")
+            return None, None
+        self.cache.store(url, text)
+        self.count("fetched")
+        return text, time.time()
+
+    def crawl(self, models: list) -> dict:
+        """
+        Fetches and extracts the model card of every model that has a card URL.
+        Args:
+            models (list[ModelRecord]): Aggregated catalog records (catalog_aggregator.aggregate_models).
+        Returns:
+            dict: Model name -> {'context', 'max_output', 'url', 'fetched' (YYYY-MM-DD)}
+            for models whose card yielded at least one value.
+        """
+        urls = {}
+        for model in models:
+            url = card_url(model)
+            if url:
+                urls[model.model_name] = url
+        if not urls or self.concurrency <= 0:
+            return {}
+
+        def visit(item):
+            name, url = item
+            text, fetched = self.fetch(url)
+            if text is None:
+                return name, None
+            limits = extract_limits(text)
+            if not limits["context"] and not limits["max_output"]:
+                return name, None
+            return name, dict(limits, url=url, fetched=time.strftime("%Y-%m-%d", time.gmtime(fetched)))
+
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(urls))) as executor:
+            results = {name: card for name, card in executor.map(profiled(visit), urls.items()) if card}
+        return results
+
+
+def crawl_model_cards(models: list) -> dict:
+    """Crawls with the settings from the environment and reports what happened."""
+    crawler = ModelCardCrawler()
+    results = crawler.crawl(models)
+    stats = crawler.stats
+    print(f"Model cards: {len(results)} with token limits "
+          f"({stats['cached']} cached, {stats['fetched']} fetched, {stats['missing']} missing, {stats['failed']} failed)")
+    return results
@@ -1,10 +1,8 @@
-import urllib.request
-import csv
-
-try:
-    from bs4 import BeautifulSoup
-except ImportError:
-    raise ImportError("BeautifulSoup (bs4) is required. Install it with 'pip install beautifulsoup4'.")
+from catalog_aggregator import aggregate_models
+from catalog_parser import parse_catalog_records
+from profiling import stage
+from providers import fetch_all_catalog_models
+from records import Record, as_record, write_records
 
 # Define task-specific keywords for classification
 # Decision tree keyword lists
@@ -22,29 +20,31 @@ DOMAIN_KEYWORDS = [
     "medical", "health", "biomedical", "legal", "finance", "financial", "biology", "chemistry", "science", "robotics", "education", "tutor", "customer support"
 ]
 
+class SpecificityRecord(Record):
+    __slots__ = ("model_name", "llm", "classification", "matched_keywords")
+    COLUMNS = ("Model name", "LLM", "Classification", "Matched Keywords")
+
+    def __init__(self, model_name, llm, classification, matched_keywords):
+        self.model_name = model_name
+        self.llm = llm
+        self.classification = classification
+        self.matched_keywords = matched_keywords
+
+
 def fetch_bedrock_catalog() -> str:
     url = "https://docs.aws.amazon.com/bedrock/latest/userguide/models-supported.html"
+    import urllib.request
     with urllib.request.urlopen(url) as response:
         html = response.read().decode("utf-8")
     return html
 
 
-def parse_bedrock_models(html: str) -> list[dict]:
-    soup = BeautifulSoup(html, "html.parser")
-    models = []
-    tables = soup.find_all("table")
-    for table in tables:
-        headers = [th.get_text(strip=True) for th in table.find_all("th")]
-        for row in table.find_all("tr")[1:]:
-            cells = row.find_all("td")
-            if len(cells) != len(headers):
-                continue
-            model_info = {headers[i]: cells[i].get_text(strip=True) for i in range(len(headers))}
-            models.append(model_info)
-    return models
+def parse_bedrock_models(html: str) -> list:
+    # Tables are split out and parsed in a process pool when the page is large
+    return parse_catalog_records(html)
 
 
-def classify_model_specificity(model: dict) -> tuple[str, str]:
+def classify_model_specificity(model) -> tuple[str, str]:
     """
     - If model_name contains task_keywords: return "Task-Specific"
     - Elif input_modalities == ["Text"] AND output_modalities == ["Text"]:
@@ -55,9 +55,10 @@ def classify_model_specificity(model: dict) -> tuple[str, str]:
         - Else: return "Domain-Specific"
     Returns (classification, matched_keywords)
     """
-    name = model.get("Model name", "").lower()
-    input_mod = model.get("Input modalities", "").lower()
-    output_mod = model.get("Output modalities", "").lower()
+    model = as_record(model)
+    name = model.model_name.lower()
+    input_mod = model.input_modalities.lower()
+    output_mod = model.output_modalities.lower()
     input_modalities = [m.strip() for m in input_mod.split(",") if m.strip()]
     output_modalities = [m.strip() for m in output_mod.split(",") if m.strip()]
     # 1. Task-specific by name
@@ -82,47 +83,29 @@ def classify_model_specificity(model: dict) -> tuple[str, str]:
     return "Domain-Specific", ""
 
 
-def get_llm_info(models: list[dict]) -> list[dict]:
+def get_llm_info(models: list) -> list[SpecificityRecord]:
     results = []
-    seen_models = set()  # Track seen model names to avoid duplicates
-    
-    for m in models:
-        name = m.get("Model name", "Unknown")
-        
-        # Skip if we've already processed this model
-        if name in seen_models:
-            continue
-            
-        seen_models.add(name)
-        llm = m.get("Provider", m.get("Model provider", "Unknown"))
+    # One merged record per model (modalities are the union across variants)
+    for m in aggregate_models(models):
         classification, matched_keywords = classify_model_specificity(m)
-        results.append({
-            "Model name": name,
-            "LLM": llm,
-            "Classification": classification,
-            "Matched Keywords": matched_keywords
-        })
+        results.append(SpecificityRecord(m.model_name, m.provider or "Unknown", classification, matched_keywords))
     return results
 
 
-def write_llm_results_to_csv(results: list[dict], filename: str = "llm_specificity_output.csv") -> None:
-    if not results:
-        return
-    with open(filename, mode="w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=results[0].keys())
-        writer.writeheader()
-        writer.writerows(results)
+def write_llm_results_to_csv(results: list[SpecificityRecord], filename: str = "llm_specificity_output.csv") -> None:
+    write_records(results, filename)
 
 
 if __name__ == "__main__":
-    html = fetch_bedrock_catalog()
-    models = parse_bedrock_models(html)
+    # Bedrock plus the Azure, Vertex and Hugging Face catalogs, normalized to Bedrock's columns
+    models = fetch_all_catalog_models()
     print(f"Total models found: {len(models)}")
-    llm_results = get_llm_info(models)
+    with stage("classify"):
+        llm_results = get_llm_info(models)
     for m in llm_results[:3]:
-        print(f"Model: {m['Model name']}")
-        print(f"  LLM: {m['LLM']}")
-        print(f"  Classification: {m['Classification']}")
-        print(f"  Matched Keywords: {m['Matched Keywords']}")
+        print(f"Model: {m.model_name}")
+        print(f"  LLM: {m.llm}")
+        print(f"  Classification: {m.classification}")
+        print(f"  Matched Keywords: {m.matched_keywords}")
     write_llm_results_to_csv(llm_results)
     print(f"Wrote LLM specificity info for {len(llm_results)} models to llm_specificity_output.csv")
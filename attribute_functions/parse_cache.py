@@ -0,0 +1,114 @@
+import os
+import sys
+import marshal
+import hashlib
+
+# Bump when parse_table_fragment() output changes, so old entries stop matching
+PARSER_VERSION = 2
+
+CACHE_DIR_ENV = "LLM_DB_PARSE_CACHE_DIR"
+CACHE_SIZE_ENV = "LLM_DB_PARSE_CACHE_MB"  # 0 disables the cache
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".parse_cache")
+DEFAULT_CACHE_MB = 64
+
+SUFFIX = ".marshal"
+
+
+def cache_dir() -> str:
+    return os.environ.get(CACHE_DIR_ENV) or DEFAULT_CACHE_DIR
+
+
+def cache_limit() -> int:
+    """Cache size limit in bytes (0 means disabled)."""
+    return int(float(os.environ.get(CACHE_SIZE_ENV, DEFAULT_CACHE_MB)) * 1024 * 1024)
+
+
+def document_key(document: bytes, kind: str = "document") -> str:
+    """
+    SHA-256 of the document, what it is ('document' for a page, 'table' for one
+    <table> fragment, whose results have a different shape), the parser version
+    and the marshal format (which is specific to the Python version).
+    """
+    digest = hashlib.sha256(document)
+    digest.update(f"|{kind}|parser={PARSER_VERSION}|marshal={marshal.version}|py={sys.version_info[:2]}".encode())
+    return digest.hexdigest()
+
+
+def entry_path(key: str) -> str:
+    return os.path.join(cache_dir(), key + SUFFIX)
+
+
+def load(key: str):
+    """
+    Returns the cached parse result for a key, or None on a miss.
+    A hit refreshes the entry's mtime, which is what LRU eviction goes by.
+    """
+    if not cache_limit():
+        return None
+    path = entry_path(key)
+    try:
+        with open(path, "rb") as f:
+            value = marshal.load(f)
+        os.utime(path)
+    except (OSError, EOFError, ValueError, TypeError):
+        # Missing, evicted by another process meanwhile, or unreadable: parse again
+        return None
+    return value
+
+
+def store(key: str, value) -> None:
+    """
+    Writes an entry atomically (temp file + rename), so concurrent readers and
+    writers only ever see complete entries, then evicts down to the size limit.
+    """
+    store_many([(key, value)])
+
+
+def store_many(items) -> None:
+    """Like store() for several (key, value) pairs, evicting once at the end."""
+    limit = cache_limit()
+    if not limit:
+        return
+    os.makedirs(cache_dir(), exist_ok=True)
+    for key, value in items:
+        write_entry(key, value)
+    evict(limit)
+
+
+def write_entry(key: str, value) -> None:
+    path = entry_path(key)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "wb") as f:
+            marshal.dump(value, f)
+        os.replace(temp_path, path)
+    except OSError:
+        # A cache that can't be written is only a slower run
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
+def evict(limit: int) -> None:
+    """Removes least recently used entries until the cache fits in `limit` bytes."""
+    directory = cache_dir()
+    entries = []
+    for name in os.listdir(directory):
+        if not name.endswith(SUFFIX):
+            continue
+        try:
+            stat = os.stat(os.path.join(directory, name))
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, name))
+    total = sum(size for _, size, _ in entries)
+    for _, size, name in sorted(entries):
+        if total <= limit:
+            break
+        try:
+            os.remove(os.path.join(directory, name))
+        except FileNotFoundError:
+            pass  # another process evicted it first
+        total -= size
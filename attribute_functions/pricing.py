@@ -0,0 +1,389 @@
+import os
+import re
+import csv
+import time
+import bisect
+import codecs
+import hashlib
+from html.parser import HTMLParser
+
+# Bedrock pricing page(s). A template with {region} is fetched once per region in
+# LLM_DB_PRICING_REGIONS; without it, one page is fetched and regions are read from
+# the page itself. Override with e.g.
+# LLM_DB_PRICING_URL=http://localhost:8000/pricing/{region}.html
+PRICING_URL = "https://aws.amazon.com/bedrock/pricing/"
+PRICING_URL_ENV = "LLM_DB_PRICING_URL"
+PRICING_REGIONS_ENV = "LLM_DB_PRICING_REGIONS"
+DEFAULT_PRICING_REGIONS = "us-east-1,us-west-2,eu-central-1"
+
+# Region whose prices fill the cost columns; other regions are a fallback
+REFERENCE_REGION_ENV = "LLM_DB_PRICING_REGION"
+DEFAULT_REFERENCE_REGION = "us-east-1"
+
+CACHE_DIR_ENV = "LLM_DB_PRICING_CACHE_DIR"
+MAX_AGE_ENV = "LLM_DB_PRICING_MAX_AGE_HOURS"
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".pricing_cache")
+DEFAULT_MAX_AGE_HOURS = 24
+TIMEOUT = 30
+
+# Pages are read and parsed this many bytes at a time
+CHUNK_SIZE = 64 * 1024
+
+ON_DEMAND, BATCH, PROVISIONED = "on-demand", "batch", "provisioned"
+MODES = (ON_DEMAND, BATCH, PROVISIONED)
+# Prices kept per model, region and mode: USD per 1K tokens, or per hour for provisioned throughput
+PRICE_FIELDS = ("input", "output", "hourly")
+
+# Written next to cost_analysis.csv; one row per model, region and mode
+PRICING_TABLE_FILE = "pricing_table.csv"
+PRICING_TABLE_COLUMNS = ["Model", "Region", "Mode", "Input Cost", "Output Cost", "Hourly Cost", "Source"]
+
+REGION_PATTERN = re.compile(r"\b(?:[a-z]{2}-gov|[a-z]{2})-[a-z]+-\d\b")
+PRICE_PATTERN = re.compile(r"\$\s*(\d[\d,]*(?:\.\d+)?)")
+HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6", "caption"}
+
+
+def modes_named(text: str) -> list[str]:
+    """Pricing modes named in a heading or column header."""
+    text = text.lower()
+    named = []
+    if "provisioned" in text:
+        named.append(PROVISIONED)
+    if "batch" in text:
+        named.append(BATCH)
+    if "on-demand" in text or "on demand" in text:
+        named.append(ON_DEMAND)
+    return named
+
+
+def mode_of(text: str) -> str | None:
+    """
+    The mode a heading or header names. A text naming several ('On-Demand and
+    Batch pricing') introduces a table whose column headers mark the non-default
+    modes, so unmarked columns are on-demand.
+    """
+    named = modes_named(text)
+    if not named:
+        return None
+    return named[0] if len(named) == 1 else ON_DEMAND
+
+
+def column_plan(headers: list[str], table_mode: str) -> tuple[int, list[tuple]]:
+    """
+    Works out once per table what each column holds.
+    Returns:
+        tuple: (model column index, [(column index, mode, field, multiplier to per-1K)])
+    """
+    model_column = next((i for i, header in enumerate(headers) if "model" in header.lower()), 0)
+    prices = []
+    for i, header in enumerate(headers):
+        if i == model_column:
+            continue
+        text = header.lower()
+        if "hour" in text:
+            field = "hourly"
+        elif "input" in text:
+            field = "input"
+        elif "output" in text:
+            field = "output"
+        else:
+            continue
+        mode = mode_of(text) or (PROVISIONED if field == "hourly" else table_mode)
+        # The first column wins, e.g. no-commitment before 1-month provisioned throughput
+        if any(m == mode and f == field for _, m, f, _ in prices):
+            continue
+        if field == "hourly":
+            multiplier = 1.0
+        elif "1m" in text.replace(" ", "") or "million" in text or "1,000,000" in text:
+            multiplier = 1 / 1000
+        else:
+            multiplier = 1.0
+        prices.append((i, mode, field, multiplier))
+    return model_column, prices
+
+
+def parse_price(cell: str) -> float | None:
+    match = PRICE_PATTERN.search(cell)
+    return float(match.group(1).replace(",", "")) if match else None
+
+
+class PricingPageParser(HTMLParser):
+    """
+    Incremental parser for pricing pages: feed() it chunks as they arrive and it
+    emits one (model, region, mode, field, price) tuple per priced cell through
+    `emit` as each table row closes. Only the current row is held in memory.
+
+    Tables are read as: a header row naming the model column and price columns
+    ('Price per 1,000 input tokens', '... (batch)', 'Price per hour per model
+    unit'), then one row per model. The region comes from the page (`region`), a
+    data-region attribute or the most recent heading naming a region code; the
+    mode from the column header or else the most recent heading ('Batch', 'On-Demand').
+    """
+
+    def __init__(self, emit, region: str = None):
+        super().__init__(convert_charrefs=True)
+        self.emit = emit
+        self.region = region
+        self.mode = ON_DEMAND
+        self.heading = None
+        self.in_table = False
+        self.plan = None
+        self.row = None
+        self.row_has_header = False
+        self.cell = None
+
+    def handle_starttag(self, tag, attrs):
+        region = dict(attrs).get("data-region")
+        if region:
+            self.region = region
+        if tag in HEADING_TAGS:
+            self.heading = []
+        elif tag == "table":
+            self.in_table, self.plan = True, None
+        elif tag == "tr" and self.in_table:
+            self.row, self.row_has_header = [], False
+        elif tag in ("td", "th") and self.row is not None:
+            self.cell = []
+            self.row_has_header |= tag == "th"
+
+    def handle_endtag(self, tag):
+        if tag in HEADING_TAGS and self.heading is not None:
+            self.heading_closed(" ".join("".join(self.heading).split()))
+            self.heading = None
+        elif tag in ("td", "th") and self.cell is not None:
+            self.row.append(" ".join("".join(self.cell).split()))
+            self.cell = None
+        elif tag == "tr" and self.row is not None:
+            self.row_closed(self.row)
+            self.row = None
+        elif tag == "table":
+            self.in_table, self.plan, self.row = False, None, None
+
+    def handle_data(self, data):
+        if self.cell is not None:
+            self.cell.append(data)
+        elif self.heading is not None:
+            self.heading.append(data)
+
+    def heading_closed(self, text: str) -> None:
+        match = REGION_PATTERN.search(text)
+        if match:
+            self.region = match.group(0)
+        mode = mode_of(text)
+        if mode:
+            self.mode = mode
+
+    def row_closed(self, cells: list[str]) -> None:
+        # Some pages mark the model cell of data rows with <th> too; header rows have no prices
+        if self.plan is None or (self.row_has_header and not any(parse_price(cell) is not None for cell in cells)):
+            if any(mode_of(cell) or "input" in cell.lower() or "hour" in cell.lower() for cell in cells):
+                self.plan = column_plan(cells, self.mode)
+            return
+        model_column, prices = self.plan
+        if model_column >= len(cells) or not cells[model_column] or not self.region:
+            return
+        for i, mode, field, multiplier in prices:
+            if i < len(cells):
+                price = parse_price(cells[i])
+                if price is not None:
+                    self.emit(cells[model_column], self.region, mode, field, price * multiplier)
+
+
+class PriceTable:
+    """
+    Prices by (model, region, mode) -> {'input', 'output', 'hourly'}, with their source URL.
+    The regions of each (model, mode) are indexed as prices are added, so a lookup
+    only visits that model's regions.
+    """
+
+    def __init__(self):
+        self.prices = {}
+        self.sources = {}
+        self.regions = {}  # (model, mode) -> regions, sorted
+
+    def add(self, model: str, region: str, mode: str, field: str, price: float, source: str = "") -> None:
+        key = (model, region, mode)
+        if key not in self.prices:
+            self.prices[key] = {}
+            bisect.insort(self.regions.setdefault((model, mode), []), region)
+        self.prices[key][field] = price
+        self.sources[key] = source
+
+    def lookup(self, model: str, mode: str = ON_DEMAND, region: str = None):
+        """
+        Token prices of a model in a mode, from `region` if it's priced there, else
+        from the first region that is (in alphabetical order).
+        Returns:
+            tuple: (price dict, region, source), or (None, None, None).
+        """
+        regions = self.regions.get((model, mode), ())
+        candidates = [region] if region in regions else []
+        candidates += [r for r in regions if r != region]
+        for candidate in candidates:
+            price = self.prices.get((model, candidate, mode))
+            if price and "input" in price and "output" in price:
+                return price, candidate, self.sources.get((model, candidate, mode), "")
+        return None, None, None
+
+    def models(self) -> set:
+        return {model for model, _, _ in self.prices}
+
+    def rows(self, keep=None) -> list[dict]:
+        """PRICING_TABLE_COLUMNS rows, sorted; `keep(model)` filters models."""
+        rows = []
+        for (model, region, mode), price in sorted(self.prices.items()):
+            if keep and not keep(model):
+                continue
+            rows.append({
+                "Model": model,
+                "Region": region,
+                "Mode": mode,
+                "Input Cost": format_price(price.get("input")),
+                "Output Cost": format_price(price.get("output")),
+                "Hourly Cost": format_price(price.get("hourly")),
+                "Source": self.sources.get((model, region, mode), ""),
+            })
+        return rows
+
+    def save(self, path: str, keep=None) -> int:
+        rows = self.rows(keep)
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=PRICING_TABLE_COLUMNS)
+            writer.writeheader()
+            writer.writerows(rows)
+        return len(rows)
+
+    @classmethod
+    def load(cls, path: str) -> "PriceTable":
+        """Reads a pricing_table.csv written by save()."""
+        table = cls()
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                for field, column in zip(PRICE_FIELDS, ("Input Cost", "Output Cost", "Hourly Cost")):
+                    price = parse_price(row[column])
+                    if price is not None:
+                        table.add(row["Model"], row["Region"], row["Mode"], field, price, row["Source"])
+        return table
+
+
+def format_price(price: float | None) -> str:
+    return "" if price is None else f"${price:.6f}"
+
+
+def cache_path(url: str) -> str:
+    directory = os.environ.get(CACHE_DIR_ENV) or DEFAULT_CACHE_DIR
+    return os.path.join(directory, hashlib.sha256(url.encode("utf-8")).hexdigest() + ".html")
+
+
+def read_chunks(url: str):
+    """
+    Yields a page's bytes CHUNK_SIZE at a time. A fresh cached copy is read from
+    disk; otherwise the response is streamed and written to the cache as it's
+    read, so the whole page is never in memory.
+    """
+    import urllib.request
+
+    path = cache_path(url)
+    max_age = float(os.environ.get(MAX_AGE_ENV, DEFAULT_MAX_AGE_HOURS)) * 3600
+    try:
+        fresh = time.time() - os.path.getmtime(path) <= max_age
+    except OSError:
+        fresh = False
+    if fresh:
+        with open(path, "rb") as f:
+            while chunk := f.read(CHUNK_SIZE):
+                yield chunk
+        return
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    request = urllib.request.Request(url, headers={"User-Agent": "llm-vendor-database/1.0"})
+    try:
+        with urllib.request.urlopen(request, timeout=TIMEOUT) as response, open(temp_path, "wb") as f:
+            while chunk := response.read(CHUNK_SIZE):
+                f.write(chunk)
+                yield chunk
+        # Only a completely read page is cached
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def parse_pricing_stream(chunks, region: str = None, source: str = "", table: PriceTable = None,
+                         resolve=None) -> PriceTable:
+    """
+    Parses a pricing page from an iterable of byte (or text) chunks.
+    Args:
+        chunks: Page content, e.g. read_chunks(url) or an open fixture file.
+        region (str, optional): Region of a per-region page.
+        source (str): Provenance recorded with each price (usually the URL).
+        table (PriceTable, optional): Table to add to. Defaults to a new one.
+        resolve (callable, optional): Maps a page's model name to a canonical name.
+    Returns:
+        PriceTable: The table with this page's prices added.
+    """
+    table = table if table is not None else PriceTable()
+    resolved = {}
+
+    def emit(model, page_region, mode, field, price):
+        if model not in resolved:
+            resolved[model] = resolve(model) if resolve else model
+        table.add(resolved[model], page_region, mode, field, price, source)
+
+    parser = PricingPageParser(emit, region)
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    for chunk in chunks:
+        parser.feed(decoder.decode(chunk) if isinstance(chunk, bytes) else chunk)
+    parser.feed(decoder.decode(b"", final=True))
+    parser.close()
+    return table
+
+
+def pricing_pages() -> list[tuple[str, str | None]]:
+    """(url, region) for every configured pricing page; region is None for a single all-region page."""
+    template = os.environ.get(PRICING_URL_ENV, PRICING_URL)
+    if "{region}" not in template:
+        return [(template, None)]
+    regions = os.environ.get(PRICING_REGIONS_ENV, DEFAULT_PRICING_REGIONS)
+    return [(template.format(region=region.strip()), region.strip()) for region in regions.split(",") if region.strip()]
+
+
+def canonical_resolver():
+    """Resolves pricing-page spellings to the vendor database's model names."""
+    from providers import resolve_model_name
+    from vendor_database import MODEL_VENDOR_MAPPING
+    names = list(MODEL_VENDOR_MAPPING)
+    return lambda raw_name: resolve_model_name(raw_name, names)
+
+
+def load_price_table(pages: list = None) -> PriceTable:
+    """
+    Fetches (or loads from cache) and stream-parses every pricing page.
+    A page that can't be loaded is reported and skipped.
+    Returns:
+        PriceTable: Prices from all pages that loaded.
+    """
+    table = PriceTable()
+    resolve = canonical_resolver()
+    for url, region in pages or pricing_pages():
+        try:
+            parse_pricing_stream(read_chunks(url), region, url, table, resolve)
+        except OSError as e:
+            print(f"Warning: could not load pricing page {url}: {e}")
+    return table
+
+
+if __name__ == "__main__":
+    import sys
+    # python pricing.py [page.html ...]: parse saved pages (or the configured URLs)
+    if sys.argv[1:]:
+        table = PriceTable()
+        for path in sys.argv[1:]:
+            with open(path, "rb") as f:
+                parse_pricing_stream(iter(lambda: f.read(CHUNK_SIZE), b""), None, path, table, canonical_resolver())
+    else:
+        table = load_price_table()
+    for row in table.rows():
+        print(f"{row['Model']}\t{row['Region']}\t{row['Mode']}\tin={row['Input Cost']}\tout={row['Output Cost']}\thour={row['Hourly Cost']}")
+    print(f"{len(table.models())} models priced")
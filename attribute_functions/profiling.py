@@ -0,0 +1,142 @@
+import os
+import sys
+import threading
+from contextlib import contextmanager
+
+# Set by `orchestrator_database.py --profile`; stages are no-ops when it is unset
+PROFILE_DIR_ENV = "LLM_DB_PROFILE_DIR"
+
+# Profilers of the stages currently open in this process, innermost last
+_active = []
+
+# Worker threads and the stage itself accumulate into the same stats file
+_dump_lock = threading.Lock()
+
+
+def profile_dir() -> str:
+    return os.environ.get(PROFILE_DIR_ENV, "")
+
+
+def script_name() -> str:
+    """Name of the running script (e.g. 'modality'), used to prefix its stages."""
+    return os.path.splitext(os.path.basename(sys.argv[0] or "python"))[0] or "python"
+
+
+def current_stage() -> str:
+    return _active[-1][0] if _active else ""
+
+
+def stats_path(directory: str, stage: str) -> str:
+    """
+    Raw stats file for one stage in one process: <stage>.<pid>.pstats.
+    The orchestrator merges the files of each stage afterwards (profile_report.py).
+    """
+    return os.path.join(directory, f"{stage}.{os.getpid()}.pstats")
+
+
+def dump(profiler, directory: str, stage: str) -> None:
+    import pstats
+    path = stats_path(directory, stage)
+    # A stage can be entered several times in one process; accumulate into one file
+    with _dump_lock:
+        if os.path.exists(path):
+            stats = pstats.Stats(path)
+            stats.add(profiler)
+        else:
+            stats = pstats.Stats(profiler)
+        stats.dump_stats(path)
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Profiles the enclosed block as '<script>.<name>' when profiling is enabled.
+    Stages may nest: the enclosing stage is paused, so time is counted once, in the
+    innermost stage. cProfile only sees the thread that enables it, so work handed
+    to a thread pool shows up as a wait on the pool unless the task is wrapped with
+    profiled().
+    Args:
+        name (str): Stage name, e.g. 'fetch', 'parse' or 'classify'.
+    """
+    directory = profile_dir()
+    if not directory:
+        yield
+        return
+
+    import cProfile
+    full_name = f"{script_name()}.{name}"
+    profiler = cProfile.Profile()
+    if _active:
+        _active[-1][1].disable()
+    _active.append((full_name, profiler))
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        _active.pop()
+        dump(profiler, directory, full_name)
+        if _active:
+            _active[-1][1].enable()
+
+
+def _start_worker_profile(directory: str, stage_name: str) -> None:
+    """Process pool initializer: profile everything the worker runs until it exits."""
+    import cProfile
+    from multiprocessing.util import Finalize
+
+    profiler = cProfile.Profile()
+
+    def finish():
+        profiler.disable()
+        dump(profiler, directory, stage_name)
+
+    # Pool workers leave through os._exit(), which skips atexit but runs these finalizers
+    Finalize(None, finish, exitpriority=10)
+    profiler.enable()
+
+
+def pool_kwargs() -> dict:
+    """
+    Extra ProcessPoolExecutor arguments that profile the workers as part of the
+    current stage. Empty when profiling is off.
+    """
+    directory = profile_dir()
+    if not directory:
+        return {}
+    return {
+        "initializer": _start_worker_profile,
+        "initargs": (directory, current_stage() or f"{script_name()}.workers"),
+    }
+
+
+def profiled(function):
+    """
+    Wraps a thread pool task so each call is profiled in its worker thread and
+    counted in the current stage. Returns the function unchanged when profiling is off.
+    Args:
+        function (callable): Task to submit to a ThreadPoolExecutor.
+    Returns:
+        callable: The profiled task.
+    """
+    directory = profile_dir()
+    if not directory:
+        return function
+    stage_name = current_stage() or f"{script_name()}.workers"
+
+    def run(*args, **kwargs):
+        import cProfile
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Python 3.12+ profiles every thread from the stage's own profiler and
+            # allows only one profiler at a time
+            return function(*args, **kwargs)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            profiler.disable()
+            dump(profiler, directory, stage_name)
+
+    return run
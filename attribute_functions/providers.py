@@ -0,0 +1,301 @@
+import os
+import re
+
+from catalog_parser import parse_documents, parse_document_tables, parse_catalog_rows
+from profiling import profiled, stage
+from records import CatalogRecord, TableColumns, first_value, intern
+from sharding import filter_models
+
+# Every adapter returns CatalogRecords with (at least) these columns, matching the Bedrock catalog headers
+ROW_SCHEMA = list(CatalogRecord.COLUMNS)
+
+# Set e.g. LLM_DB_AZURE_URL=http://localhost:8000/azure.html to point an adapter at a fixture server
+URL_ENV_PREFIX = "LLM_DB_"
+
+# Hugging Face hub accounts and the vendor used when a model can't be resolved by name
+HUB_AUTHORS = {
+    "microsoft": "Microsoft",
+    "nvidia": "Nvidia",
+    "bigcode": "Hugging Face",
+    "codellama": "Hugging Face",
+}
+
+# Provider spellings that don't reduce to a canonical name by prefix
+NAME_ALIASES = {
+    "gpt35turbo": "GPT-3.5 Turbo",
+    "gpt4turbo": "GPT-4 Turbo",
+    "gemini10pro": "Gemini Pro",
+    "gemini15pro": "Gemini Pro",
+    "gemini15flash": "Gemini Flash",
+    "textbison": "PaLM 2",
+    "chatbison": "PaLM 2",
+}
+
+
+def normalize_key(name: str) -> str:
+    """Lowercase and strip everything except letters and digits."""
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+def load_model_vendor_mapping() -> dict:
+    """
+    Gets the canonical model name -> vendor mapping from the vendor database.
+    Returns:
+        dict: Mapping of model names to vendor names.
+    """
+    from vendor_database import MODEL_VENDOR_MAPPING
+    return dict(MODEL_VENDOR_MAPPING)
+
+
+def resolve_model_name(raw_name: str, canonical_names: list[str]) -> str:
+    """
+    Maps a provider's spelling (e.g. 'gpt-35-turbo', 'Phi-3-mini-4k-instruct') to the
+    canonical name used in the vendor database. The raw name is split into tokens and
+    the longest token prefix that equals a canonical name (or alias) wins, so
+    'Phi-3-mini' resolves to 'Phi-3' but 'gpt-4o' does not resolve to 'GPT-4'.
+    Unresolved names are returned as-is.
+    Args:
+        raw_name (str): Model name or ID as listed by the provider.
+        canonical_names (list[str]): Names from the vendor database.
+    Returns:
+        str: Canonical model name, or raw_name if nothing matched.
+    """
+    by_key = {normalize_key(name): name for name in canonical_names}
+    by_key.update(NAME_ALIASES)
+    tokens = [t for t in re.split(r"[\s._/-]+", raw_name.split("/")[-1]) if t]
+    prefix = ""
+    best = None
+    for token in tokens:
+        prefix += normalize_key(token)
+        if prefix in by_key:
+            best = by_key[prefix]
+    return best or raw_name
+
+
+def fetch_url(url: str) -> str:
+    import urllib.request
+    with urllib.request.urlopen(url) as response:
+        return response.read().decode("utf-8")
+
+
+def parse_html_tables(html: str) -> list[dict]:
+    """
+    Parses every <table> in an HTML page into header -> cell text dictionaries.
+    Args:
+        html (str): HTML content.
+    Returns:
+        list[dict]: One dictionary per table row.
+    """
+    return parse_catalog_rows(html)
+
+
+class ProviderAdapter:
+    """
+    Base class for a model catalog source.
+    Subclasses set `name` and `default_url`. HTML sources implement
+    records_from_table(), which resolves the headers it needs once per table and
+    builds a CatalogRecord per row; other formats set `is_html = False` and
+    implement parse() and normalize_row().
+    """
+    name = ""
+    default_url = ""
+    is_html = True
+
+    def __init__(self, url: str = None):
+        self.url = url or os.environ.get(f"{URL_ENV_PREFIX}{self.name.upper()}_URL", self.default_url)
+
+    def fetch(self) -> str:
+        return fetch_url(self.url)
+
+    def normalize(self, provider: str, raw_name: str, model_id: str, regions: str,
+                  input_mod: str, output_mod: str, vendor_mapping: dict,
+                  resolved: dict = None) -> CatalogRecord:
+        """
+        Builds a record in ROW_SCHEMA, resolving the model name against the vendor database.
+        `resolved` caches name resolutions across the rows of one catalog.
+        """
+        if resolved is None or raw_name not in resolved:
+            name = resolve_model_name(raw_name, list(vendor_mapping))
+            if resolved is not None:
+                resolved[raw_name] = name
+        else:
+            name = resolved[raw_name]
+        return CatalogRecord(intern(vendor_mapping.get(name, provider)), name, model_id, regions,
+                             intern(input_mod), intern(output_mod), self.name)
+
+    def get_models(self, vendor_mapping: dict) -> list[CatalogRecord]:
+        if self.is_html:
+            return self.rows_from_tables(parse_document_tables(self.fetch()), vendor_mapping)
+        return [self.normalize_row(row, vendor_mapping) for row in self.parse(self.fetch())]
+
+    def rows_from_tables(self, tables: list[tuple], vendor_mapping: dict) -> list[CatalogRecord]:
+        """Normalizes already-parsed (headers, rows) tables of this adapter's page."""
+        records = []
+        for headers, rows in tables:
+            records.extend(self.records_from_table(TableColumns(headers), rows, vendor_mapping))
+        return records
+
+    def records_from_table(self, columns: TableColumns, rows: list, vendor_mapping: dict) -> list[CatalogRecord]:
+        raise NotImplementedError
+
+    def parse(self, document: str) -> list[dict]:
+        raise NotImplementedError
+
+    def normalize_row(self, row: dict, vendor_mapping: dict) -> CatalogRecord:
+        raise NotImplementedError
+
+
+class BedrockAdapter(ProviderAdapter):
+    """AWS Bedrock supported-models page. Rows keep every catalog column."""
+    name = "bedrock"
+    default_url = "https://docs.aws.amazon.com/bedrock/latest/userguide/models-supported.html"
+
+    def records_from_table(self, columns: TableColumns, rows: list, vendor_mapping: dict) -> list[CatalogRecord]:
+        # Bedrock names are already canonical; keep extra columns for the hybrid checks
+        return CatalogRecord.from_table(columns, rows, self.name)
+
+
+class AzureAdapter(ProviderAdapter):
+    """Azure OpenAI models page: tables keyed by 'Model ID'."""
+    name = "azure"
+    default_url = "https://learn.microsoft.com/en-us/azure/ai-services/openai/concepts/models"
+
+    def records_from_table(self, columns: TableColumns, rows: list, vendor_mapping: dict) -> list[CatalogRecord]:
+        model_id = columns.find(["Model ID", "Model"])
+        regions = columns.find(["Regions", "Region availability", "Regions supported"])
+        input_mod = columns.find(["Input modalities", "Input"])
+        output_mod = columns.find(["Output modalities", "Output"])
+        resolved = {}
+        records = []
+        for cells in rows:
+            row_id = first_value(cells, model_id)
+            if not row_id:
+                continue
+            records.append(self.normalize(
+                "OpenAI", row_id, row_id, first_value(cells, regions),
+                first_value(cells, input_mod, "Text"), first_value(cells, output_mod, "Text"),
+                vendor_mapping, resolved,
+            ))
+        return records
+
+
+class VertexAdapter(ProviderAdapter):
+    """Google Vertex AI model list: tables with a model name and model ID column."""
+    name = "vertex"
+    default_url = "https://cloud.google.com/vertex-ai/generative-ai/docs/learn/models"
+
+    def records_from_table(self, columns: TableColumns, rows: list, vendor_mapping: dict) -> list[CatalogRecord]:
+        model_name = columns.find(["Model name", "Model", "Model ID"])
+        model_id = columns.find(["Model ID", "Model code", "Model"])
+        regions = columns.find(["Regions", "Available regions", "Regions supported"])
+        input_mod = columns.find(["Input modalities", "Inputs", "Input"])
+        output_mod = columns.find(["Output modalities", "Outputs", "Output"])
+        resolved = {}
+        records = []
+        for cells in rows:
+            name = first_value(cells, model_name)
+            if not name:
+                continue
+            records.append(self.normalize(
+                "Google", name, first_value(cells, model_id), first_value(cells, regions),
+                first_value(cells, input_mod, "Text"), first_value(cells, output_mod, "Text"),
+                vendor_mapping, resolved,
+            ))
+        return records
+
+
+class HuggingFaceAdapter(ProviderAdapter):
+    """Hugging Face hub model listing (JSON), one request for all tracked authors."""
+    name = "huggingface"
+    is_html = False
+    default_url = "https://huggingface.co/api/models?" + "&".join(f"author={a}" for a in HUB_AUTHORS)
+
+    # pipeline_tag -> (input modalities, output modalities)
+    PIPELINE_MODALITIES = {
+        "text-generation": ("Text", "Text"),
+        "text2text-generation": ("Text", "Text"),
+        "image-text-to-text": ("Text, Image", "Text"),
+        "feature-extraction": ("Text", "Embedding"),
+        "sentence-similarity": ("Text", "Embedding"),
+        "text-to-image": ("Text", "Image"),
+    }
+
+    def parse(self, document: str) -> list[dict]:
+        import json
+        return [item for item in json.loads(document) if item.get("id")]
+
+    def normalize_row(self, row: dict, vendor_mapping: dict, resolved: dict = None) -> CatalogRecord:
+        model_id = row["id"]
+        author = model_id.split("/")[0]
+        input_mod, output_mod = self.PIPELINE_MODALITIES.get(row.get("pipeline_tag", ""), ("Text", "Text"))
+        # Hub weights are downloadable, so there are no hosting regions
+        return self.normalize(HUB_AUTHORS.get(author, author), model_id, model_id, "",
+                              input_mod, output_mod, vendor_mapping, resolved)
+
+
+DEFAULT_ADAPTERS = [BedrockAdapter, AzureAdapter, VertexAdapter, HuggingFaceAdapter]
+
+
+def fetch_all_catalog_models(adapters: list = None, max_workers: int = None, parse_workers: int = None) -> list[CatalogRecord]:
+    """
+    Fetches every provider catalog concurrently, then parses all HTML pages in one
+    process pool (see catalog_parser.parse_documents).
+    Rows are returned in adapter order so downstream first-match logic is stable.
+    A provider that can't be reached is reported and skipped; the others still load.
+    In a sharded build only the shard's models are returned (see sharding.py).
+    Args:
+        adapters (list, optional): Adapter instances. Defaults to one of each DEFAULT_ADAPTERS.
+        max_workers (int, optional): Fetch thread pool size. Defaults to one per adapter.
+        parse_workers (int, optional): Parse process pool size. Defaults to the CPU count.
+    Returns:
+        list[CatalogRecord]: Normalized catalog rows from all providers.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    if adapters is None:
+        adapters = [adapter() for adapter in DEFAULT_ADAPTERS]
+    vendor_mapping = load_model_vendor_mapping()
+
+    documents = {}
+    with stage("fetch"), ThreadPoolExecutor(max_workers=max_workers or len(adapters)) as executor:
+        # Profiled in the worker threads, so downloads count toward the fetch stage
+        futures = [executor.submit(profiled(adapter.fetch)) for adapter in adapters]
+        for adapter, future in zip(adapters, futures):
+            try:
+                documents[adapter.name] = future.result()
+            except Exception as e:
+                if isinstance(adapter, BedrockAdapter):
+                    raise
+                print(f"Warning: could not load {adapter.name} catalog: {e}")
+
+    with stage("parse"):
+        html_adapters = [a for a in adapters if a.is_html and a.name in documents]
+        parsed = parse_documents([documents[a.name] for a in html_adapters], parse_workers)
+        tables_by_adapter = dict(zip((a.name for a in html_adapters), parsed))
+
+        models = []
+        for adapter in adapters:
+            if adapter.name not in documents:
+                continue
+            if adapter.is_html:
+                models.extend(adapter.rows_from_tables(tables_by_adapter[adapter.name], vendor_mapping))
+            else:
+                try:
+                    rows = adapter.parse(documents[adapter.name])
+                except ValueError as e:
+                    print(f"Warning: could not parse {adapter.name} catalog: {e}")
+                    continue
+                resolved = {}
+                models.extend(adapter.normalize_row(row, vendor_mapping, resolved) for row in rows)
+    # A sharded build only processes its own vendors' models from here on
+    return filter_models(models)
+
+
+if __name__ == "__main__":
+    models = fetch_all_catalog_models()
+    counts = {}
+    for m in models:
+        counts[m.catalog_source] = counts.get(m.catalog_source, 0) + 1
+    for source, count in counts.items():
+        print(f"{source}: {count} models")
+    print(f"Total models found: {len(models)}")
@@ -0,0 +1,206 @@
+import csv
+import sys
+from operator import attrgetter
+
+
+class Record:
+    """
+    Base of the slotted record types used for catalog rows and module results.
+    Subclasses list their attributes in __slots__ and the matching CSV headers in
+    COLUMNS (same order). Records have no per-instance dict and are read by
+    attribute in the hot paths; record["Model name"] and record.get(...) still
+    work, so code and scripts written against row dicts keep running.
+    """
+    __slots__ = ()
+    COLUMNS = ()
+    # Slots that aren't columns
+    INTERNAL = ()
+    # Column header -> attribute, derived from __slots__ and COLUMNS
+    FIELDS = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        slots = [slot for klass in reversed(cls.__mro__) for slot in klass.__dict__.get("__slots__", ())
+                 if slot not in cls.INTERNAL]
+        cls.FIELDS = dict(zip(cls.COLUMNS, slots))
+
+    def get(self, column: str, default=None):
+        field = self.FIELDS.get(column)
+        return default if field is None else getattr(self, field)
+
+    def __getitem__(self, column: str):
+        field = self.FIELDS.get(column)
+        if field is None:
+            raise KeyError(column)
+        return getattr(self, field)
+
+    def __contains__(self, column: str) -> bool:
+        return column in self.FIELDS
+
+    def keys(self):
+        return self.COLUMNS
+
+    def values(self) -> list:
+        return [getattr(self, field) for field in self.FIELDS.values()]
+
+    def items(self):
+        return zip(self.keys(), self.values())
+
+    def __eq__(self, other):
+        return type(self) is type(other) and list(self.items()) == list(other.items())
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{k}={v!r}' for k, v in self.items())})"
+
+
+class CatalogRecord(Record):
+    """
+    One catalog listing in the providers.ROW_SCHEMA layout. Columns of the source
+    table outside the schema (Bedrock's 'Streaming supported', ...) are kept as
+    a header tuple shared by every row of the table plus a tuple of values.
+    """
+    __slots__ = ("provider", "model_name", "model_id", "regions", "input_modalities",
+                 "output_modalities", "catalog_source", "extra_columns", "extra_values")
+    COLUMNS = ("Provider", "Model name", "Model ID", "Regions supported", "Input modalities",
+               "Output modalities", "Catalog source")
+    INTERNAL = ("extra_columns", "extra_values")
+
+    def __init__(self, provider, model_name, model_id, regions, input_modalities, output_modalities,
+                 catalog_source, extra_columns=(), extra_values=()):
+        self.provider = provider
+        self.model_name = model_name
+        self.model_id = model_id
+        self.regions = regions
+        self.input_modalities = input_modalities
+        self.output_modalities = output_modalities
+        self.catalog_source = catalog_source
+        self.extra_columns = extra_columns
+        self.extra_values = extra_values
+
+    @classmethod
+    def from_table(cls, columns, rows: list, catalog_source: str = "") -> list:
+        """
+        Records for the rows (lists of cells) of one parsed table. Schema columns are
+        matched by header once for the whole table, 'Model provider' stands in for a
+        missing 'Provider', and other columns are kept as extras.
+        Args:
+            columns (TableColumns | list[str]): The table's headers.
+            rows (list[list[str]]): Cells of each row.
+            catalog_source (str, optional): Catalog the table comes from; defaults to
+                the table's own 'Catalog source' column, if any.
+        """
+        if not isinstance(columns, TableColumns):
+            columns = TableColumns(columns)
+        index = columns.index
+        provider = index.get("Provider", index.get("Model provider"))
+        fields = [index.get(column) for column in CatalogRecord.COLUMNS[1:6]]
+        source = None if catalog_source else index.get("Catalog source")
+        extra_columns = tuple(h for h in index if h not in CatalogRecord.FIELDS)
+        extra_indexes = [index[h] for h in extra_columns]
+        records = []
+        for cells in rows:
+            name, model_id, regions, input_mod, output_mod = (cells[i] if i is not None else "" for i in fields)
+            records.append(CatalogRecord(
+                intern(cells[provider]) if provider is not None else "", name, model_id, regions,
+                intern(input_mod), intern(output_mod), cells[source] if source is not None else catalog_source,
+                extra_columns, tuple(intern(cells[i]) for i in extra_indexes),
+            ))
+        return records
+
+    @classmethod
+    def from_row(cls, row) -> "CatalogRecord":
+        """A record from a header -> cell mapping (parse_catalog_rows, scripts written against dicts)."""
+        return cls.from_table(list(row), [list(row.values())])[0]
+
+    def get(self, column: str, default=None):
+        field = self.FIELDS.get(column)
+        if field is not None:
+            return getattr(self, field)
+        if column in self.extra_columns:
+            return self.extra_values[self.extra_columns.index(column)]
+        return default
+
+    def __getitem__(self, column: str):
+        value = self.get(column, KeyError)
+        if value is KeyError:
+            raise KeyError(column)
+        return value
+
+    def __contains__(self, column: str) -> bool:
+        return column in self.FIELDS or column in self.extra_columns
+
+    def keys(self):
+        # Extra columns follow the schema columns, before any a subclass adds
+        return self.COLUMNS[:7] + self.extra_columns + self.COLUMNS[7:]
+
+    def values(self) -> list:
+        fields = list(self.FIELDS.values())
+        return ([getattr(self, field) for field in fields[:7]] + list(self.extra_values)
+                + [getattr(self, field) for field in fields[7:]])
+
+
+class ModelRecord(CatalogRecord):
+    """A model's catalog variants merged into one record (catalog_aggregator.aggregate_models)."""
+    __slots__ = ("variant_count",)
+    COLUMNS = CatalogRecord.COLUMNS + ("Variant count",)
+
+    def __init__(self, *values, variant_count=1):
+        super().__init__(*values)
+        self.variant_count = variant_count
+
+
+class TableColumns:
+    """
+    Header -> column index for one parsed table, resolved once and then used for
+    every row of the table. A repeated header maps to its last column, as it did
+    when rows were dicts.
+    """
+
+    def __init__(self, headers):
+        self.headers = tuple(headers)
+        self.index = {header: i for i, header in enumerate(self.headers)}
+        self.lowered = {header.lower(): i for i, header in enumerate(self.headers)}
+
+    def __contains__(self, header: str) -> bool:
+        return header in self.index
+
+    def find(self, candidates) -> list[int]:
+        """Indexes of the candidate headers present in the table (case-insensitive), in candidate order."""
+        return [self.lowered[c.lower()] for c in candidates if c.lower() in self.lowered]
+
+
+def as_record(row):
+    """Records pass through; header -> cell mappings become CatalogRecords."""
+    return row if isinstance(row, Record) else CatalogRecord.from_row(row)
+
+
+def first_value(cells: list, indexes: list[int], default: str = "") -> str:
+    """First non-empty cell among the given columns (see TableColumns.find)."""
+    for i in indexes:
+        if cells[i]:
+            return cells[i]
+    return default
+
+
+def intern(value: str) -> str:
+    """Shares one copy of repetitive cell values (providers, modalities, Yes/No)."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def write_records(records: list, filename: str, record_type: type = None, encoding: str = None) -> None:
+    """
+    Writes records as CSV with their COLUMNS as the header. Nothing is written for
+    an empty list unless `record_type` gives the header.
+    """
+    record_type = record_type or (type(records[0]) if records else None)
+    if record_type is None:
+        return
+    fields = list(record_type.FIELDS.values())
+    values = attrgetter(*fields)
+    with open(filename, mode="w", newline="", encoding=encoding) as f:
+        writer = csv.writer(f)
+        writer.writerow(record_type.COLUMNS)
+        if len(fields) == 1:
+            writer.writerows((values(record),) for record in records)
+        else:
+            writer.writerows(values(record) for record in records)
@@ -0,0 +1,91 @@
+from catalog_aggregator import split_values
+
+# Fixed region dictionary: bit i of a mask is REGIONS[i]. Append new regions at the
+# end only, so masks in earlier builds keep their meaning. At most 63 entries, so a
+# mask fits a signed 64-bit integer.
+REGIONS = (
+    "us-east-1", "us-east-2", "us-west-1", "us-west-2",
+    "us-gov-east-1", "us-gov-west-1", "ca-central-1", "ca-west-1",
+    "mx-central-1", "sa-east-1",
+    "eu-central-1", "eu-central-2", "eu-west-1", "eu-west-2",
+    "eu-west-3", "eu-south-1", "eu-south-2", "eu-north-1",
+    "il-central-1", "me-south-1", "me-central-1", "af-south-1",
+    "ap-east-1", "ap-south-1", "ap-south-2", "ap-northeast-1",
+    "ap-northeast-2", "ap-northeast-3", "ap-southeast-1", "ap-southeast-2",
+    "ap-southeast-3", "ap-southeast-4", "ap-southeast-5", "ap-southeast-7",
+)
+REGION_BITS = {region: 1 << i for i, region in enumerate(REGIONS)}
+
+MASK_COLUMN = "Region mask"
+
+
+def region_mask(regions: str) -> tuple[int, list[str]]:
+    """
+    Parses a "Regions supported" cell into a bitset over REGIONS.
+    Args:
+        regions (str): Cell text, e.g. 'us-east-1us-west-2' or 'us-east-1, eu-west-3'.
+    Returns:
+        tuple: (mask, regions that aren't in REGIONS)
+    """
+    mask = 0
+    unknown = []
+    for region in split_values("Regions supported", regions):
+        bit = REGION_BITS.get(region)
+        if bit is None:
+            unknown.append(region)
+        else:
+            mask |= bit
+    return mask, unknown
+
+
+def format_mask(mask: int) -> str:
+    """
+    Mask as fixed-width hex text. Kept as text so it survives the CSV join
+    unchanged (an integer column with gaps would be read back as float).
+    """
+    return f"{mask:#018x}"
+
+
+def parse_mask(text: str) -> int:
+    """Inverse of format_mask(); empty or missing cells (no deployment data) are 0"""
+    return int(text, 16) if isinstance(text, str) and text else 0
+
+
+def mask_regions(mask: int) -> list[str]:
+    return [region for region, bit in REGION_BITS.items() if mask & bit]
+
+
+def query_mask(regions) -> int:
+    """
+    Mask for the regions of a query.
+    Raises:
+        ValueError: For a region that isn't in REGIONS.
+    """
+    mask = 0
+    for region in regions:
+        if region not in REGION_BITS:
+            raise ValueError(f"Unknown region '{region}'")
+        mask |= REGION_BITS[region]
+    return mask
+
+
+def mask_array(texts):
+    """Mask column (format_mask() text) -> int64 numpy array, parsed once per load"""
+    import numpy as np
+    return np.fromiter((parse_mask(text) for text in texts), dtype=np.int64)
+
+
+def available_in_all(masks, regions):
+    """
+    Boolean array: rows available in every one of the regions.
+    Args:
+        masks (numpy.ndarray): From mask_array().
+        regions (iterable[str]): Region codes.
+    """
+    query = query_mask(regions)
+    return (masks & query) == query
+
+
+def available_in_any(masks, regions):
+    """Boolean array: rows available in at least one of the regions"""
+    return (masks & query_mask(regions)) != 0
@@ -0,0 +1,39 @@
+import os
+
+# Comma-separated vendor names; when set, modules only produce rows for these vendors
+SHARD_ENV = "LLM_DB_SHARD_VENDORS"
+
+
+def shard_vendors() -> set[str] | None:
+    """
+    Vendors of the shard this process builds (see orchestrator_database.py --shard).
+    Returns:
+        set[str] | None: Vendor names, or None for an unsharded build.
+    """
+    value = os.environ.get(SHARD_ENV)
+    if not value:
+        return None
+    return {vendor.strip() for vendor in value.split(",") if vendor.strip()}
+
+
+def model_vendor(model_name: str) -> str | None:
+    from vendor_database import MODEL_VENDOR_MAPPING
+    return MODEL_VENDOR_MAPPING.get(model_name)
+
+
+def in_shard(model_name: str, vendors: set[str] = None) -> bool:
+    """
+    True if the model belongs to this shard. Models missing from MODEL_VENDOR_MAPPING
+    belong to no shard: the join is based on the vendor database, so they never
+    reach the final database anyway.
+    """
+    vendors = shard_vendors() if vendors is None else vendors
+    return vendors is None or model_vendor(model_name) in vendors
+
+
+def filter_models(rows: list[dict], key: str = "Model name") -> list[dict]:
+    """Keeps the rows of this shard's models (all rows in an unsharded build)."""
+    vendors = shard_vendors()
+    if vendors is None:
+        return rows
+    return [row for row in rows if in_shard(row.get(key, ""), vendors)]
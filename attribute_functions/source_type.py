@@ -1,10 +1,17 @@
-import urllib.request
-import csv
+from catalog_aggregator import aggregate_models
+from catalog_parser import parse_catalog_records
+from profiling import stage
+from providers import fetch_all_catalog_models
+from records import Record, as_record, write_records
 
-try:
-    from bs4 import BeautifulSoup
-except ImportError:
-    raise ImportError("BeautifulSoup (bs4) is required. Install it with 'pip install beautifulsoup4'.")
+
+class SourceTypeRecord(Record):
+    __slots__ = ("llm_name", "source_type")
+    COLUMNS = ("LLM name", "Source type")
+
+    def __init__(self, llm_name, source_type):
+        self.llm_name = llm_name
+        self.source_type = source_type
 
 
 def fetch_bedrock_catalog() -> str:
@@ -14,24 +21,15 @@ def fetch_bedrock_catalog() -> str:
         str: HTML content of the catalog.
     """
     url = "https://docs.aws.amazon.com/bedrock/latest/userguide/models-supported.html"
+    import urllib.request
     with urllib.request.urlopen(url) as response:
         html = response.read().decode("utf-8")
     return html
 
 
-def parse_bedrock_models(html: str) -> list[dict]:
-    soup = BeautifulSoup(html, "html.parser")
-    models = []
-    tables = soup.find_all("table")
-    for table in tables:
-        headers = [th.get_text(strip=True) for th in table.find_all("th")]
-        for row in table.find_all("tr")[1:]:
-            cells = row.find_all("td")
-            if len(cells) != len(headers):
-                continue
-            model_info = {headers[i]: cells[i].get_text(strip=True) for i in range(len(headers))}
-            models.append(model_info)
-    return models
+def parse_bedrock_models(html: str) -> list:
+    # Tables are split out and parsed in a process pool when the page is large
+    return parse_catalog_records(html)
 
 
 def get_provider_source_type(provider: str, provider_license_map: dict) -> str:
@@ -48,48 +46,46 @@ def get_provider_source_type(provider: str, provider_license_map: dict) -> str:
     return provider_license_map.get(provider.strip(), "unknown")
 
 
-def get_llm_source_type_info(llm_names: list[str], catalog_models: list[dict], provider_license_map: dict) -> list[dict]:
+def get_llm_source_type_info(llm_names: list[str], catalog_models: list, provider_license_map: dict) -> list[SourceTypeRecord]:
     """
     Gets source type info for input LLMs using the Provider column and a mapping dict.
     Args:
         llm_names (list[str]): List of LLM names to check.
-        catalog_models (list[dict]): List of all catalog model dictionaries.
+        catalog_models (list[CatalogRecord | dict]): Catalog (or aggregated) model records.
         provider_license_map (dict): Mapping of provider names to 'open' or 'closed'.
     Returns:
-        list[dict]: List of dicts with LLM name and source type.
+        list[SourceTypeRecord]: LLM name and source type per name.
     """
     results = []
+    # Index the catalog once; the first row for a name wins, as before
+    catalog_by_name = {}
+    for m in map(as_record, catalog_models):
+        catalog_by_name.setdefault(m.model_name, m)
     for name in llm_names:
-        model = next((m for m in catalog_models if m.get("Model name", "") == name), None)
+        model = catalog_by_name.get(name)
         if model:
-            provider = model.get("Provider", "")
-            source_type = get_provider_source_type(provider, provider_license_map)
+            source_type = get_provider_source_type(model.provider, provider_license_map)
         else:
             source_type = "unknown"
-        results.append({"LLM name": name, "Source type": source_type})
+        results.append(SourceTypeRecord(name, source_type))
     return results
 
 
-def write_llm_source_type_to_csv(results: list[dict], filename: str = "source_type.csv") -> None:
+def write_llm_source_type_to_csv(results: list[SourceTypeRecord], filename: str = "source_type.csv") -> None:
     """
     Writes the LLM source type results to a CSV file.
     Args:
-        results (list[dict]): List of LLM source type info dicts.
+        results (list[SourceTypeRecord]): LLM source type records.
         filename (str, optional): Output CSV filename. Defaults to 'source_type.csv'.
     Returns:
         None
     """
-    if not results:
-        return
-    with open(filename, mode="w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=results[0].keys())
-        writer.writeheader()
-        writer.writerows(results)
+    write_records(results, filename)
 
 
 if __name__ == "__main__":
-    html = fetch_bedrock_catalog()
-    models = parse_bedrock_models(html)
+    # Bedrock plus the Azure, Vertex and Hugging Face catalogs, normalized to Bedrock's columns
+    models = fetch_all_catalog_models()
     print(f"Total models found: {len(models)}")
     
     # Example provider_license_map (expand as needed)
@@ -105,22 +101,22 @@ if __name__ == "__main__":
         "Stability": "open",
         "Google": "closed",
         "Jurassic": "closed",
+        "OpenAI": "closed",
+        "Microsoft": "open",
+        "Nvidia": "open",
+        "Hugging Face": "open",
         # Add more mappings as needed
     }
     
-    # Get all model names and analyze source types (deduplicated)
-    seen_models = set()
-    llm_names = []
-    for m in models:
-        name = m.get("Model name", "Unknown")
-        if name not in seen_models:
-            seen_models.add(name)
-            llm_names.append(name)
-    llm_source_type_results = get_llm_source_type_info(llm_names, models, provider_license_map)
+    # One merged record per model
+    with stage("classify"):
+        aggregated = aggregate_models(models)
+        llm_names = [m.model_name for m in aggregated]
+        llm_source_type_results = get_llm_source_type_info(llm_names, aggregated, provider_license_map)
     write_llm_source_type_to_csv(llm_source_type_results)
     print(f"Wrote LLM source type info for {len(llm_source_type_results)} models to source_type.csv")
     
     # Print sample results
     print("\nSample source type analysis:")
     for result in llm_source_type_results[:5]:
-        print(f"  {result['LLM name']}: {result['Source type']}")
+        print(f"  {result.llm_name}: {result.source_type}")
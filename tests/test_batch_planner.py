@@ -0,0 +1,57 @@
+import json
+
+import batch_planner
+from cost_accounting import PricingTable
+
+V1 = 'anthropic.claude-3-5-sonnet-20240620-v1:0'
+V2 = 'anthropic.claude-3-5-sonnet-20241022-v2:0'
+
+
+def write_labels(tmp_path):
+    path = tmp_path / 'latency_label.csv'
+    path.write_text(f"model-id,support_type\n{V2},batch-supported\n{V1},real-time only\n", encoding='utf-8')
+    return str(path)
+
+
+def test_labeled_ids_keep_their_own_label(tmp_path):
+    support = batch_planner.BatchSupport(PricingTable(), write_labels(tmp_path))
+    assert support.resolve(V1) == ('Claude 3.5 Sonnet', False)
+    assert support.resolve(V2) == ('Claude 3.5 Sonnet', True)
+    # The bare name covers both versions, which disagree
+    assert support.resolve('Claude 3.5 Sonnet') == ('Claude 3.5 Sonnet', False)
+
+
+def test_name_matches_when_every_labeled_id_agrees(tmp_path):
+    path = tmp_path / 'latency_label.csv'
+    path.write_text(f"model-id,support_type\n{V2},batch-supported\n", encoding='utf-8')
+    support = batch_planner.BatchSupport(PricingTable(), str(path))
+    assert support.resolve('Claude 3.5 Sonnet') == ('Claude 3.5 Sonnet', True)
+
+
+def test_real_time_only_id_is_not_batched(tmp_path):
+    backlog = tmp_path / 'backlog.jsonl'
+    lines = [
+        {'request_id': 'r1', 'model': V1, 'modelInput': {'max_tokens': 10}},
+        {'request_id': 'r2', 'model': V2, 'modelInput': {'max_tokens': 10}},
+    ]
+    backlog.write_text(''.join(json.dumps(line) + '\n' for line in lines), encoding='utf-8')
+    out_dir = tmp_path / 'jobs'
+
+    plan = batch_planner.plan_files([str(backlog)], str(out_dir), labels_path=write_labels(tmp_path),
+                                    pricing_path=str(tmp_path / 'missing.csv'))
+
+    assert plan['batch_requests'] == 1
+    assert plan['on_demand_requests'] == 1
+    assert [job['model_id'] for job in plan['jobs']] == [V2]
+    on_demand = (out_dir / batch_planner.ON_DEMAND_FILE).read_text(encoding='utf-8').splitlines()
+    assert [json.loads(line)['model'] for line in on_demand] == [V1]
+    job = (out_dir / plan['jobs'][0]['file']).read_text(encoding='utf-8').splitlines()
+    assert [json.loads(line)['recordId'] for line in job] == ['r2']
+
+
+def test_job_directories_of_colliding_names(tmp_path):
+    writer = batch_planner.JobWriter(str(tmp_path), 10, 10 ** 6)
+    for name in ('X', 'X 2', 'X!'):
+        writer.start_job(name)
+    writer.close()
+    assert writer.job_dirs == {'X': 'x', 'X 2': 'x-2', 'X!': 'x-3'}
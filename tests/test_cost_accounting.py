@@ -0,0 +1,48 @@
+import json
+
+import cost_accounting
+from cost import MODEL_PRICING
+from pricing import BATCH, ON_DEMAND, PriceTable
+
+HAIKU_ID = 'anthropic.claude-3-5-haiku-20241022-v1:0'
+
+
+def price_table():
+    table = PriceTable()
+    for region, input_price in (('us-east-1', 0.0008), ('eu-central-1', 0.00092)):
+        table.add('Claude 3.5 Haiku', region, ON_DEMAND, 'input', input_price)
+        table.add('Claude 3.5 Haiku', region, ON_DEMAND, 'output', input_price * 5)
+        table.add('Claude 3.5 Haiku', region, BATCH, 'input', input_price / 2)
+        table.add('Claude 3.5 Haiku', region, BATCH, 'output', input_price * 2.5)
+    table.add('Nova Pro', 'us-west-2', ON_DEMAND, 'input', 0.0008)
+    table.add('Nova Pro', 'us-west-2', ON_DEMAND, 'output', 0.0032)
+    return table
+
+
+def test_prices_come_from_the_price_table_by_region():
+    pricing = cost_accounting.PricingTable(price_table=price_table(), region='eu-central-1')
+    name, _, price, _ = pricing.resolve(HAIKU_ID)
+    assert name == 'Claude 3.5 Haiku'
+    assert price == {'input': 0.00092, 'output': 0.0046}
+    # Priced in another region only
+    assert pricing.resolve('amazon.nova-pro-v1:0')[2] == {'input': 0.0008, 'output': 0.0032}
+
+
+def test_models_missing_from_the_table_fall_back_to_model_pricing():
+    pricing = cost_accounting.PricingTable(price_table=price_table(), region='us-east-1')
+    assert pricing.resolve('anthropic.claude-3-7-sonnet-20250219-v1:0')[2] == MODEL_PRICING['Claude 3.7 Sonnet']
+    assert pricing.resolve('unknown-model')[3] == cost_accounting.UNPRICED
+
+
+def test_cli_prices_with_a_pricing_table_csv(tmp_path, capsys):
+    pricing_path = tmp_path / 'pricing_table.csv'
+    price_table().save(str(pricing_path))
+    log = tmp_path / 'log.jsonl'
+    log.write_text(json.dumps({'model': HAIKU_ID, 'input_tokens': 1000, 'output_tokens': 1000}) + '\n',
+                   encoding='utf-8')
+    report_path = tmp_path / 'report.json'
+
+    assert cost_accounting.main([str(log), '--pricing', str(pricing_path), '--region', 'eu-central-1',
+                                 '--json', str(report_path)]) == 0
+    report = json.loads(report_path.read_text(encoding='utf-8'))
+    assert report['total_cost'] == round(0.00092 + 0.0046, 6)
@@ -0,0 +1,119 @@
+import functools
+import os
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import context_window
+import model_card_crawler
+from records import CatalogRecord
+
+CARDS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'model_cards')
+
+
+class CardHandler(SimpleHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        CardHandler.requests.append(self.path)
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def card_site(monkeypatch, tmp_path):
+    """Serves tests/fixtures/model_cards as the Bedrock card site, with a fresh crawl cache."""
+    CardHandler.requests = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), functools.partial(CardHandler, directory=CARDS_DIR))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv('LLM_DB_BEDROCK_CARD_URL', f'http://127.0.0.1:{server.server_address[1]}/{{slug}}.html')
+    monkeypatch.setenv(model_card_crawler.CACHE_DIR_ENV, str(tmp_path / 'cache'))
+    monkeypatch.setenv(model_card_crawler.CONCURRENCY_ENV, '2')
+    monkeypatch.setenv(model_card_crawler.DELAY_ENV, '0')
+    yield CardHandler.requests
+    server.shutdown()
+    server.server_close()
+
+
+def catalog_record(name, model_id):
+    return CatalogRecord.from_row({'Provider': 'Amazon', 'Model name': name, 'Model ID': model_id,
+                                   'Catalog source': 'bedrock'})
+
+
+MODELS = [
+    catalog_record('Nova Lite', 'amazon.nova-lite-v1:0'),
+    catalog_record('Claude 3 Haiku', 'anthropic.claude-3-haiku-20240307-v1:0'),
+    # No card page on the fixture site
+    catalog_record('Nova Micro', 'amazon.nova-micro-v1:0'),
+]
+
+
+def test_extract_limits_reads_the_fixture_card():
+    with open(os.path.join(CARDS_DIR, 'amazon-nova-lite.html'), encoding='utf-8') as f:
+        limits = model_card_crawler.extract_limits(f.read())
+    # The version number, date and CSS width are not token limits
+    assert limits == {'context': 300_000, 'max_output': 5_000}
+
+
+def test_extract_limits_from_config_json():
+    assert model_card_crawler.extract_limits('{"max_position_embeddings": 32768}') == {
+        'context': 32768, 'max_output': None}
+
+
+def test_card_url_uses_the_slug():
+    assert model_card_crawler.card_url(MODELS[0]) == (
+        'https://docs.aws.amazon.com/bedrock/latest/userguide/model-card-amazon-nova-lite.html')
+
+
+def test_crawl_caches_pages_and_missing_entries(card_site, tmp_path):
+    crawler = model_card_crawler.ModelCardCrawler()
+    cards = crawler.crawl(MODELS)
+    assert crawler.stats == {'cached': 0, 'fetched': 2, 'missing': 1, 'failed': 0}
+    assert cards['Nova Lite']['context'] == 300_000
+    assert cards['Nova Lite']['max_output'] == 5_000
+    assert 'Nova Micro' not in cards
+    cache_files = sorted(os.path.splitext(name)[1] for name in os.listdir(tmp_path / 'cache'))
+    assert cache_files == ['.html', '.html', '.missing']
+
+    # A second run is served from the cache, the 404 included
+    requests_before = len(card_site)
+    crawler = model_card_crawler.ModelCardCrawler()
+    assert crawler.crawl(MODELS) == cards
+    assert crawler.stats == {'cached': 3, 'fetched': 0, 'missing': 0, 'failed': 0}
+    assert len(card_site) == requests_before
+
+
+def test_expired_missing_entry_is_fetched_again(card_site):
+    model_card_crawler.ModelCardCrawler().crawl(MODELS[2:])
+    crawler = model_card_crawler.ModelCardCrawler(max_age_hours=0)
+    crawler.crawl(MODELS[2:])
+    assert crawler.stats['missing'] == 1
+    assert card_site == ['/amazon-nova-micro.html', '/amazon-nova-micro.html']
+
+
+def test_hand_maintained_values_take_precedence(card_site):
+    records = {r.model_name: r for r in context_window.build_context_window_table(MODELS)}
+    # Claude 3 Haiku is in CONTEXT_WINDOW_INFO, so its card isn't fetched at all
+    assert '/anthropic-claude-3-haiku-20240307.html' not in card_site
+    assert records['Claude 3 Haiku'].tokens == 200000
+    assert records['Claude 3 Haiku'].max_output == 'unknown'
+    # Nova Lite's entry is 'unknown', so the card fills it in
+    assert records['Nova Lite'].tokens == 300_000
+    assert records['Nova Lite'].category == 'large'
+    assert records['Nova Lite'].source.endswith('/amazon-nova-lite.html')
+    assert records['Nova Lite'].max_output == 5_000
+    # A 404 leaves the hand-maintained 'unknown'
+    assert records['Nova Micro'].tokens == 'unknown'
+    assert records['Nova Micro'].max_output == 'unknown'
+
+
+def test_a_card_never_overrides_a_known_value(card_site):
+    card = model_card_crawler.ModelCardCrawler().crawl(MODELS[1:2])['Claude 3 Haiku']
+    assert card['context'] == 48_000
+    tokens, category, source, _ = context_window.get_context_window_info('Claude 3 Haiku', card)
+    assert (tokens, category) == (200000, 'large')
+    assert source == context_window.CONTEXT_WINDOW_INFO['Claude 3 Haiku']['source']
@@ -0,0 +1,41 @@
+import csv
+
+import change_feed
+import snapshot
+
+HEADER = ['model_name', 'vendor_name', 'contextwindow_Context window tokens', 'status']
+
+
+def write_csv(path, header, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(header)
+        writer.writerows(rows)
+    return str(path)
+
+
+def old_rows():
+    return [[f"Model {i}", f"Vendor {i % 3}", str(1000 * i) if i % 4 else 'unknown', 'Active'] for i in range(40)]
+
+
+def test_streamed_snapshot_matches_in_memory(tmp_path):
+    rows = old_rows() + [['Short row', 'Vendor 1']]
+    database = write_csv(tmp_path / 'db.csv', HEADER, rows)
+    snapshot.write_snapshot_from_csv(database, str(tmp_path / 'a.snap'))
+    assert snapshot.stream_snapshot_from_csv(database, str(tmp_path / 'b.snap'), chunk_rows=7) == len(rows)
+    assert (tmp_path / 'a.snap').read_bytes() == (tmp_path / 'b.snap').read_bytes()
+
+
+def test_streamed_diff_matches_in_memory(tmp_path):
+    old = write_csv(tmp_path / 'old.csv', HEADER, old_rows() + [old_rows()[5]])
+    new_header = ['model_name', 'vendor_name', 'contextwindow_Context window tokens', 'region']
+    new_rows = [[name, vendor, tokens + '0' if i % 5 == 0 else tokens, 'us-east-1' if i % 2 else '']
+                for i, (name, vendor, tokens, _) in enumerate(old_rows()) if i % 7]
+    new_rows[3:3] = [['Model new', 'Vendor 9', '2048', '']]
+    new = write_csv(tmp_path / 'new.csv', new_header, list(reversed(new_rows)))
+
+    expected = change_feed.diff_tables(change_feed.read_table(old), change_feed.read_table(new))
+    # A 2 KB budget spills several sorted runs per table
+    streamed = list(change_feed.stream_diff(old, new, 2048, str(tmp_path)))
+    assert streamed == expected
+    assert {event['op'] for event in streamed} == {'insert', 'update', 'delete'}
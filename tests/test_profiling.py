@@ -0,0 +1,34 @@
+import os
+import pstats
+from concurrent.futures import ThreadPoolExecutor
+
+import profiling
+
+
+def busy_fetch(n):
+    return sum(i * i for i in range(n))
+
+
+def profiled_functions(directory):
+    names = set()
+    for file_name in os.listdir(directory):
+        stats = pstats.Stats(os.path.join(directory, file_name))
+        names.update(function for _, _, function in stats.stats)
+    return names
+
+
+def test_stage_is_a_noop_without_a_profile_dir(monkeypatch):
+    monkeypatch.delenv(profiling.PROFILE_DIR_ENV, raising=False)
+    assert profiling.profiled(busy_fetch) is busy_fetch
+    with profiling.stage('fetch'):
+        pass
+
+
+def test_profiled_thread_work_counts_toward_the_stage(monkeypatch, tmp_path):
+    monkeypatch.setenv(profiling.PROFILE_DIR_ENV, str(tmp_path))
+    with profiling.stage('fetch'), ThreadPoolExecutor(max_workers=2) as executor:
+        assert list(executor.map(profiling.profiled(busy_fetch), [1000, 2000])) == [
+            busy_fetch(1000), busy_fetch(2000)]
+    # Worker threads and the stage share the stage's stats file
+    assert [name.rsplit('.', 2)[0] for name in os.listdir(tmp_path)] == [f'{profiling.script_name()}.fetch']
+    assert 'busy_fetch' in profiled_functions(tmp_path)
@@ -0,0 +1,45 @@
+import csv
+
+import pytest
+
+import snapshot
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    database = tmp_path / 'db.csv'
+    with open(database, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['model_name', 'vendor_name', 'contextwindow_Notes'])
+        writer.writerow(['Model A', 'Vendor 1', 'June=2024 release'])
+        writer.writerow(['Model B', 'Vendor 2', 'a<b'])
+    path = str(tmp_path / 'db.snap')
+    snapshot.write_snapshot_from_csv(str(database), path)
+    return path
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('contextwindow_Notes~June=2024', ('contextwindow_Notes', '~', 'June=2024')),
+    ('col>=100', ('col', '>=', '100')),
+    ('col>100', ('col', '>', '100')),
+    ('col!=x', ('col', '!=', 'x')),
+    ('col<=a<b', ('col', '<=', 'a<b')),
+    ('col = a~b', ('col', '=', 'a~b')),
+])
+def test_parse_condition_splits_at_the_leftmost_operator(text, expected):
+    assert snapshot.parse_condition(text) == expected
+
+
+def test_query_matches_values_with_operator_characters(snapshot_path, capsys):
+    assert snapshot.query(['--snapshot', snapshot_path, '--where', 'contextwindow_Notes~June=2024', '--count']) == 0
+    assert capsys.readouterr().out.strip() == '1'
+
+
+@pytest.mark.parametrize('argv, message', [
+    (['--where', 'vendor_name'], "Can't parse condition 'vendor_name'"),
+    (['--where', 'nope=1'], "Unknown column 'nope'"),
+    (['--columns', 'model_name,nope'], "Unknown column 'nope'"),
+])
+def test_bad_arguments_exit_with_2(snapshot_path, capsys, argv, message):
+    assert snapshot.query(['--snapshot', snapshot_path] + argv) == 2
+    assert message in capsys.readouterr().err
@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""
+Batch-inference job planning for a request backlog.
+
+The backlog is JSONL, one request per line, e.g.
+    {"request_id": "r-0001", "model": "anthropic.claude-3-7-sonnet-20250219-v1:0",
+     "modelInput": {"messages": [...], "max_tokens": 512}}
+Requests are grouped by target model (IDs and provider spellings resolve to one
+model, as in cost_accounting.py). Requests for models that latency.py labels
+batch-supported are packed into batch job files in the Bedrock batch input
+format ({"recordId", "modelInput"}), each within --max-records records and
+--max-bytes bytes; the rest go to on_demand.jsonl unchanged.
+
+The backlog is streamed: each request is written to its model's open job as it
+is read, and a job is closed when the next request would push it past either
+limit (next-fit packing, in arrival order). Memory depends on the number of
+models, not on the size of the backlog.
+
+Savings compare each model's batch and on-demand prices from pricing_table.csv
+(written by cost.py), falling back to cost.MODEL_PRICING and BATCH_DISCOUNT for
+models the pricing pages don't list. Token counts come from the request's
+token fields, else are estimated from its size and max_tokens.
+
+Usage:
+    python batch_planner.py backlog.jsonl [more.jsonl ...] --out batch_jobs [--max-records 50000] [--max-bytes 1000000000]
+"""
+
+import os
+import re
+import sys
+import csv
+import json
+import time
+from collections import Counter, OrderedDict
+
+import publish
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ATTRIBUTE_DIR = os.path.join(BASE_DIR, '..', 'attribute_functions')
+
+if ATTRIBUTE_DIR not in sys.path:
+    sys.path.append(ATTRIBUTE_DIR)
+from cost_accounting import MODEL_FIELDS, INPUT_FIELDS, OUTPUT_FIELDS, PricingTable, first_field, read_price_table
+
+LATENCY_FILE = 'latency_label.csv'
+PRICING_TABLE_FILE = 'pricing_table.csv'
+BATCH_SUPPORT = 'batch-supported'
+
+PLAN_FILE = 'batch_plan.json'
+ON_DEMAND_FILE = 'on_demand.jsonl'
+
+# Bedrock's per-job quotas (records per job, input file size)
+DEFAULT_MAX_RECORDS = 50000
+DEFAULT_MAX_BYTES = 1000 * 1000 * 1000
+
+RECORD_ID_FIELDS = ('recordId', 'request_id', 'id')
+MAX_TOKENS_FIELDS = ('max_tokens', 'maxTokens', 'max_gen_len', 'max_new_tokens')
+# Rough size-based estimate for requests without token counts
+BYTES_PER_TOKEN = 4
+DEFAULT_OUTPUT_TOKENS = 256
+# Batch price as a share of on-demand when the pricing pages give no batch price
+BATCH_DISCOUNT = 0.5
+
+# Job files kept open at once; others are closed and reopened for append
+MAX_OPEN_FILES = 32
+
+
+def slug(name):
+    """Directory name of a model's jobs ('Claude 3.7 Sonnet' -> 'claude-3-7-sonnet')"""
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-') or 'model'
+
+
+def locate(name):
+    """Prefer the published build's copy of a file, else the working copy"""
+    return publish.published_path(name) or os.path.join(ATTRIBUTE_DIR, name)
+
+
+class BatchSupport:
+    """
+    Batch support by model, from latency_label.csv. Labels are keyed by Bedrock
+    model ID, and a labeled ID always gets its own label: two versions of a model
+    can differ (e.g. Claude 3.5 Sonnet v1 is real-time only, v2 batch-supported).
+    Any other spelling is matched by canonical name, and is batch-supported only
+    if every labeled ID with that name is.
+    """
+
+    def __init__(self, pricing, labels_path=None):
+        self.pricing = pricing
+        self.labels = {}  # model ID -> batch-supported
+        path = labels_path or locate(LATENCY_FILE)
+        if os.path.exists(path):
+            with open(path, newline='', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    self.labels[row['model-id']] = row.get('support_type') == BATCH_SUPPORT
+        self.ids = {model_id for model_id, batch in self.labels.items() if batch}
+        # canonical name -> labels of its IDs
+        name_labels = {}
+        for model_id, batch in self.labels.items():
+            name_labels.setdefault(pricing.resolve(model_id)[0], set()).add(batch)
+        self.names = {name for name, labels in name_labels.items() if labels == {True}}
+        self._resolved = {}
+
+    def resolve(self, raw_model):
+        """Raw model field -> (canonical name, batch-supported)"""
+        resolved = self._resolved.get(raw_model)
+        if resolved is None:
+            name = self.pricing.resolve(raw_model)[0]
+            batch = self.labels[raw_model] if raw_model in self.labels else name in self.names
+            resolved = (name, batch)
+            self._resolved[raw_model] = resolved
+        return resolved
+
+
+def estimate_tokens(record, line_bytes, default_output=DEFAULT_OUTPUT_TOKENS):
+    """
+    (input, output) tokens of a request: its token fields if it has them, else
+    its size / BYTES_PER_TOKEN and its max_tokens (an upper bound) or default_output.
+    """
+    input_tokens = first_field(record, INPUT_FIELDS)
+    if input_tokens is None:
+        input_tokens = line_bytes // BYTES_PER_TOKEN
+    output_tokens = first_field(record, OUTPUT_FIELDS)
+    if output_tokens is None:
+        model_input = record.get('modelInput')
+        if isinstance(model_input, dict):
+            output_tokens = first_field(model_input, MAX_TOKENS_FIELDS)
+    if output_tokens is None:
+        output_tokens = default_output
+    return int(input_tokens), int(output_tokens)
+
+
+def batch_record(record, line_number):
+    """A backlog request as a Bedrock batch input record"""
+    record_id = first_field(record, RECORD_ID_FIELDS)
+    model_input = record.get('modelInput')
+    if not isinstance(model_input, dict):
+        # Requests without a modelInput are passed through whole, minus routing fields
+        model_input = {key: value for key, value in record.items()
+                       if key not in MODEL_FIELDS and key not in RECORD_ID_FIELDS}
+    return {'recordId': str(record_id if record_id is not None else f"{line_number:011d}"),
+            'modelInput': model_input}
+
+
+class JobWriter:
+    """
+    Open batch jobs, one per model. Files are written as requests arrive; at most
+    MAX_OPEN_FILES handles stay open (least recently used are closed and later
+    reopened for append).
+    """
+
+    def __init__(self, out_dir, max_records, max_bytes):
+        self.out_dir = out_dir
+        self.max_records = max_records
+        self.max_bytes = max_bytes
+        # model name -> its open job: {'model', 'file' (relative to out_dir), 'records', 'bytes', tokens}
+        self.open_jobs = {}
+        self.job_counts = {}
+        # model name -> job directory; names that slug alike get a numbered suffix
+        self.job_dirs = {}
+        self.used_dirs = set()
+        self.jobs = []
+        self.handles = OrderedDict()
+
+    def add(self, name, data, input_tokens, output_tokens):
+        """Append one encoded record (with its newline) to the model's open job"""
+        job = self.open_jobs.get(name)
+        if job is not None and (job['records'] + 1 > self.max_records or job['bytes'] + len(data) > self.max_bytes):
+            self.close_job(name)
+            job = None
+        if job is None:
+            job = self.start_job(name)
+        self.handle(job['file']).write(data)
+        job['records'] += 1
+        job['bytes'] += len(data)
+        job['input_tokens'] += input_tokens
+        job['output_tokens'] += output_tokens
+
+    def start_job(self, name):
+        number = self.job_counts.get(name, 0) + 1
+        self.job_counts[name] = number
+        job_dir = self.job_dirs.get(name)
+        if job_dir is None:
+            base = job_dir = slug(name)
+            suffix = 2
+            while job_dir in self.used_dirs:
+                job_dir = f"{base}-{suffix}"
+                suffix += 1
+            self.job_dirs[name] = job_dir
+            self.used_dirs.add(job_dir)
+            os.makedirs(os.path.join(self.out_dir, job_dir), exist_ok=True)
+        job = {'model': name, 'file': f"{job_dir}/job-{number:05d}.jsonl",
+               'records': 0, 'bytes': 0, 'input_tokens': 0, 'output_tokens': 0}
+        self.open_jobs[name] = job
+        return job
+
+    def handle(self, path):
+        f = self.handles.pop(path, None)
+        if f is None:
+            if len(self.handles) >= MAX_OPEN_FILES:
+                _, oldest = self.handles.popitem(last=False)
+                oldest.close()
+            f = open(os.path.join(self.out_dir, path), 'ab')
+        self.handles[path] = f
+        return f
+
+    def close_job(self, name):
+        job = self.open_jobs.pop(name)
+        f = self.handles.pop(job['file'], None)
+        if f is not None:
+            f.close()
+        self.jobs.append(job)
+
+    def close(self):
+        for name in list(self.open_jobs):
+            self.close_job(name)
+        for f in self.handles.values():
+            f.close()
+        self.handles.clear()
+
+
+def new_totals():
+    return {'requests': 0, 'input_tokens': 0, 'output_tokens': 0}
+
+
+def plan_lines(lines, writer, on_demand, support, default_model=None, default_output=DEFAULT_OUTPUT_TOKENS, stats=None):
+    """
+    Route backlog lines to batch jobs or the on-demand file.
+    Args:
+        lines (iterable[bytes]): JSONL lines.
+        writer (JobWriter): Batch jobs being written.
+        on_demand (file): Binary file for requests that can't be batched.
+        support (BatchSupport): Model resolution and batch support.
+        default_model (str, optional): Model for requests that don't name one.
+        default_output (int): Output tokens assumed when a request gives no hint.
+        stats (dict, optional): Counts to add to.
+    Returns:
+        dict: {'lines', 'skipped', 'oversized', 'models': {name: {'batch': totals, 'on_demand': totals}}}
+    """
+    stats = stats or {'lines': 0, 'skipped': 0, 'oversized': 0, 'models': {}}
+    decode = json.JSONDecoder().decode
+    encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+    models = stats['models']
+    for line in lines:
+        stats['lines'] += 1
+        try:
+            record = decode(line.decode('utf-8', 'replace'))
+            model = record.get('model') or first_field(record, MODEL_FIELDS) or default_model
+            if model is None:
+                stats['skipped'] += 1
+                continue
+            input_tokens, output_tokens = estimate_tokens(record, len(line), default_output)
+        except (ValueError, TypeError, AttributeError):
+            # Blank or malformed line, or a JSON value that isn't an object
+            stats['skipped'] += 1
+            continue
+        name, batch = support.resolve(str(model))
+        model_stats = models.get(name)
+        if model_stats is None:
+            model_stats = models[name] = {'model_id': str(model), 'batch': new_totals(), 'on_demand': new_totals()}
+        elif batch and model_stats['model_id'] not in support.ids and str(model) in support.ids:
+            # Jobs are submitted under a Bedrock model ID when the backlog uses one
+            model_stats['model_id'] = str(model)
+        if batch:
+            data = (encode(batch_record(record, stats['lines'])) + '\n').encode('utf-8')
+            if len(data) <= writer.max_bytes:
+                writer.add(name, data, input_tokens, output_tokens)
+                totals = model_stats['batch']
+            else:
+                stats['oversized'] += 1
+                batch = False
+        if not batch:
+            on_demand.write(line if line.endswith(b'\n') else line + b'\n')
+            totals = model_stats['on_demand']
+        totals['requests'] += 1
+        totals['input_tokens'] += input_tokens
+        totals['output_tokens'] += output_tokens
+    return stats
+
+
+def model_prices(name, price_table=None, region=None):
+    """
+    (on-demand price, batch price, source) for a model in USD per 1K tokens.
+    The batch price is None when the model has no price at all.
+    """
+    from cost import MODEL_PRICING
+    from pricing import BATCH, ON_DEMAND, REFERENCE_REGION_ENV, DEFAULT_REFERENCE_REGION
+
+    region = region or os.environ.get(REFERENCE_REGION_ENV, DEFAULT_REFERENCE_REGION)
+    on_demand, price_region, source = price_table.lookup(name, ON_DEMAND, region) if price_table else (None, None, None)
+    if on_demand is None:
+        on_demand = MODEL_PRICING.get(name)
+        if on_demand is None:
+            return None, None, 'unpriced'
+        source = 'built-in'
+    batch = price_table.lookup(name, BATCH, price_region or region)[0] if price_table else None
+    if batch is None:
+        batch = {'input': on_demand['input'] * BATCH_DISCOUNT, 'output': on_demand['output'] * BATCH_DISCOUNT}
+        source = f"{source}, batch estimated at {BATCH_DISCOUNT:.0%}"
+    return on_demand, batch, source
+
+
+def request_cost(totals, price):
+    return (totals['input_tokens'] * price['input'] + totals['output_tokens'] * price['output']) / 1000
+
+
+def summarize(stats, jobs, price_table=None, region=None):
+    """
+    Price the plan: per model, what its batched requests cost on-demand and in batch.
+    Returns:
+        dict: JSON-friendly plan; models sorted by savings.
+    """
+    job_counts = Counter(job['model'] for job in jobs)
+    models = []
+    for name, model_stats in stats['models'].items():
+        batched, on_demand = model_stats['batch'], model_stats['on_demand']
+        on_demand_price, batch_price, source = model_prices(name, price_table, region)
+        entry = {'model': name, 'model_id': model_stats['model_id'],
+                 'batch_requests': batched['requests'], 'on_demand_requests': on_demand['requests'],
+                 'batch_input_tokens': batched['input_tokens'], 'batch_output_tokens': batched['output_tokens'],
+                 'jobs': job_counts[name], 'price_source': source,
+                 'on_demand_cost': None, 'batch_cost': None, 'savings': None}
+        if on_demand_price is not None:
+            entry['on_demand_cost'] = round(request_cost(batched, on_demand_price), 6)
+            entry['batch_cost'] = round(request_cost(batched, batch_price), 6)
+            entry['savings'] = round(entry['on_demand_cost'] - entry['batch_cost'], 6)
+        models.append(entry)
+    models.sort(key=lambda entry: -(entry['savings'] or 0))
+
+    priced = [entry for entry in models if entry['savings'] is not None]
+    return {
+        'lines': stats['lines'], 'skipped': stats['skipped'], 'oversized': stats['oversized'],
+        'batch_requests': sum(entry['batch_requests'] for entry in models),
+        'on_demand_requests': sum(entry['on_demand_requests'] for entry in models),
+        'on_demand_cost': round(sum(entry['on_demand_cost'] for entry in priced), 6),
+        'batch_cost': round(sum(entry['batch_cost'] for entry in priced), 6),
+        'savings': round(sum(entry['savings'] for entry in priced), 6),
+        'models': models,
+        'jobs': [dict(job, model_id=stats['models'][job['model']]['model_id']) for job in jobs],
+    }
+
+
+def plan_files(paths, out_dir, max_records=DEFAULT_MAX_RECORDS, max_bytes=DEFAULT_MAX_BYTES, default_model=None,
+               default_output=DEFAULT_OUTPUT_TOKENS, price_table=None, region=None, labels_path=None,
+               pricing_path=None):
+    """
+    Plan batch jobs for one or more backlog files and write them to out_dir.
+    Args:
+        paths (list[str]): Backlog JSONL files, read in order.
+        out_dir (str): Empty or missing directory for the job files and the plan.
+        max_records (int): Records per job.
+        max_bytes (int): Bytes per job file.
+        default_model (str, optional): Model for requests that don't name one.
+        price_table (PriceTable, optional): Prices; defaults to the build's pricing_table.csv.
+        region (str, optional): Region to price in. Defaults to LLM_DB_PRICING_REGION or us-east-1.
+        labels_path (str, optional): latency_label.csv to read batch support from.
+        pricing_path (str, optional): pricing_table.csv to load when no price_table is given.
+    Returns:
+        dict: The plan (see summarize()), also saved as PLAN_FILE in out_dir.
+    """
+    if os.path.isdir(out_dir) and os.listdir(out_dir):
+        raise FileExistsError(f"{out_dir} is not empty; plan into a new directory")
+    os.makedirs(out_dir, exist_ok=True)
+    if price_table is None:
+        price_table = read_price_table(pricing_path)
+
+    support = BatchSupport(PricingTable(), labels_path)
+    writer = JobWriter(out_dir, max_records, max_bytes)
+    stats = None
+    try:
+        with open(os.path.join(out_dir, ON_DEMAND_FILE), 'wb') as on_demand:
+            for path in paths:
+                with open(path, 'rb') as f:
+                    stats = plan_lines(f, writer, on_demand, support, default_model, default_output, stats)
+    finally:
+        writer.close()
+    plan = summarize(stats or {'lines': 0, 'skipped': 0, 'oversized': 0, 'models': {}}, writer.jobs, price_table, region)
+    with open(os.path.join(out_dir, PLAN_FILE), 'w', encoding='utf-8') as f:
+        json.dump(plan, f, indent=2)
+    return plan
+
+
+def print_plan(plan, top=10):
+    print(f"Requests: {plan['batch_requests']} batched in {len(plan['jobs'])} job(s), "
+          f"{plan['on_demand_requests']} on-demand ({plan['skipped']} lines skipped, {plan['oversized']} too large to batch)")
+    print(f"On-demand cost of the batched requests: ${plan['on_demand_cost']:.4f}")
+    print(f"Batch cost: ${plan['batch_cost']:.4f} (saves ${plan['savings']:.4f})")
+    print("\nBy model:")
+    for entry in plan['models'][:top]:
+        savings = f"${entry['savings']:>10.4f}" if entry['savings'] is not None else f"{'unpriced':>11}"
+        print(f"  {savings}  {entry['batch_requests']:>8} batched  {entry['on_demand_requests']:>8} on-demand"
+              f"  {entry['jobs']:>4} job(s)  {entry['model']}")
+    if len(plan['models']) > top:
+        print(f"  ... {len(plan['models']) - top} more")
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pack a JSONL request backlog into batch inference jobs")
+    parser.add_argument('backlog', nargs='+', help="Backlog JSONL file(s)")
+    parser.add_argument('--out', default='batch_jobs', help="Empty directory for the job files and plan")
+    parser.add_argument('--max-records', type=int, default=DEFAULT_MAX_RECORDS, help="Records per job")
+    parser.add_argument('--max-bytes', type=int, default=DEFAULT_MAX_BYTES, help="Bytes per job file")
+    parser.add_argument('--model', help="Model for requests that don't name one")
+    parser.add_argument('--output-tokens', type=int, default=DEFAULT_OUTPUT_TOKENS,
+                        help="Output tokens assumed for requests without a token count or max_tokens")
+    parser.add_argument('--region', help="Region to price in (default LLM_DB_PRICING_REGION or us-east-1)")
+    parser.add_argument('--labels', help=f"{LATENCY_FILE} to read batch support from (default: the current build's)")
+    parser.add_argument('--pricing', help=f"{PRICING_TABLE_FILE} to price with (default: the current build's)")
+    parser.add_argument('--top', type=int, default=10, help="Models shown")
+    args = parser.parse_args(argv)
+    if args.max_records < 1 or args.max_bytes < 1:
+        parser.error("--max-records and --max-bytes must be positive")
+
+    started = time.perf_counter()
+    try:
+        plan = plan_files(args.backlog, args.out, args.max_records, args.max_bytes, args.model,
+                          args.output_tokens, region=args.region, labels_path=args.labels, pricing_path=args.pricing)
+    except OSError as e:
+        print(f"✗ {e}")
+        return 1
+    elapsed = time.perf_counter() - started
+
+    print_plan(plan, args.top)
+    print(f"\n✓ {plan['lines']} lines in {elapsed:.2f}s; plan saved to {os.path.join(args.out, PLAN_FILE)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Change feed of per-model updates between published builds.
+
+Each build diffs its joined table against the previously published one, keyed
+by model_name, and writes the differences as JSONL events into the build
+(changes.jsonl). Once the build is published the same events are appended to
+builds/change_feed.jsonl. Every event carries a sequence number that keeps
+increasing across builds, so a consumer can remember the last one it applied
+and read on from there:
+
+    {"seq": 41, "build": "v000007", "op": "update", "model_name": "Nova Lite",
+     "changes": {"cost_Input Cost": {"old": "$0.000100", "new": "$0.000060"}}}
+    {"seq": 42, "build": "v000007", "op": "insert", "model_name": "Nova 2", "row": {...}}
+    {"seq": 43, "build": "v000007", "op": "delete", "model_name": "Claude Instant", "row": {...}}
+
+Values are the CSV cell text ('' for empty), so they compare exactly.
+
+Usage:
+    python change_feed.py --since 40      # print events after sequence number 40
+"""
+
+import os
+import sys
+import json
+
+import publish
+
+CHANGES_FILE = 'changes.jsonl'
+FEED_FILE = os.path.join(publish.BUILDS_DIR, 'change_feed.jsonl')
+KEY = 'model_name'
+
+# Bytes read from the end of a feed to find its last event
+TAIL_BYTES = 64 * 1024
+
+
+def read_table(path):
+    """Joined CSV as text, indexed by model name (later duplicates dropped)"""
+    import pandas as pd
+    df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    duplicated = df[KEY].duplicated()
+    if duplicated.any():
+        print(f"Warning: {int(duplicated.sum())} duplicate model name(s) ignored in change feed")
+        df = df[~duplicated]
+    return df.set_index(KEY)
+
+
+def diff_tables(old, new):
+    """
+    Compare two joined tables (from read_table).
+    Cells are compared column-wise over the models both tables share; a column
+    that exists on one side only counts as '' on the other.
+    Returns:
+        list[dict]: Events without sequence numbers, deletes first, then updates
+        and inserts in the new table's order.
+    """
+    events = [{'op': 'delete', 'model_name': name, 'row': old.loc[name].to_dict()}
+              for name in old.index.difference(new.index, sort=False)]
+
+    columns = list(new.columns) + [col for col in old.columns if col not in new.columns]
+    common = new.index.intersection(old.index, sort=False)
+    old_common = old.loc[common].reindex(columns=columns, fill_value='')
+    new_common = new.loc[common].reindex(columns=columns, fill_value='')
+    changed = old_common != new_common
+    changed_rows = changed.any(axis=1)
+    updates = {}
+    for name in common[changed_rows.to_numpy()]:
+        mask = changed.loc[name]
+        updates[name] = {
+            col: {'old': old_common.at[name, col], 'new': new_common.at[name, col]}
+            for col in mask.index[mask.to_numpy()]
+        }
+
+    inserted = set(new.index.difference(old.index, sort=False))
+    for name in new.index:
+        if name in updates:
+            events.append({'op': 'update', 'model_name': name, 'changes': updates[name]})
+        elif name in inserted:
+            events.append({'op': 'insert', 'model_name': name, 'row': new.loc[name].to_dict()})
+    return events
+
+
+def sorted_keyed_rows(path, memory_bytes, temp_dir, label):
+    """
+    Rows of a joined CSV as [model name, position, *cells], sorted by (name, position)
+    on disk within memory_bytes (see external_join.external_sort). Without a path
+    the table is empty.
+    Returns:
+        tuple: (header, key index, sorted row iterator)
+    """
+    import csv
+    import external_join
+
+    if not path or not os.path.exists(path):
+        return [KEY], 0, iter(())
+    f = open(path, newline='', encoding='utf-8')
+    reader = csv.reader(f)
+    header = next(reader)
+    key_index = header.index(KEY)
+
+    def keyed():
+        with f:
+            for position, row in enumerate(reader):
+                if not row:
+                    continue  # read_csv() skips blank lines
+                row += [''] * (len(header) - len(row))
+                yield [row[key_index], external_join.order_string(position)] + row
+
+    return header, key_index, external_join.external_sort(
+        keyed(), lambda r: (r[0], r[1]), memory_bytes, temp_dir, label)
+
+
+def first_rows(rows, path):
+    """First row of each model name in a sorted stream (what read_table() keeps)"""
+    from itertools import groupby
+
+    dropped = 0
+    for _, group in groupby(rows, key=lambda r: r[0]):
+        yield next(group)
+        dropped += sum(1 for _ in group)
+    if dropped:
+        print(f"Warning: {dropped} duplicate model name(s) ignored in change feed ({os.path.basename(path)})")
+
+
+def stream_diff(old_path, new_path, memory_bytes, temp_dir):
+    """
+    Same events as diff_tables(read_table(old_path), read_table(new_path)), without
+    loading either table: both are sorted by model name on disk and merged, and
+    the events are sorted back into table order (deletes in the old table's
+    order, then updates and inserts in the new one's).
+    Args:
+        old_path (str): Published joined CSV, or None for the first build.
+        new_path (str): New joined CSV.
+        memory_bytes (int): Approximate memory budget per sorted run.
+        temp_dir (str): Directory for the sorted runs.
+    Returns:
+        iterator[dict]: Events without sequence numbers.
+    """
+    import csv
+    import external_join
+
+    old_header, old_key, old_rows = sorted_keyed_rows(old_path, memory_bytes, temp_dir, 'old')
+    new_header, new_key, new_rows = sorted_keyed_rows(new_path, memory_bytes, temp_dir, 'new')
+    old_columns = [(i, col) for i, col in enumerate(old_header) if i != old_key]
+    new_columns = [(i, col) for i, col in enumerate(new_header) if i != new_key]
+    new_names = {col for _, col in new_columns}
+    columns = [col for _, col in new_columns] + [col for _, col in old_columns if col not in new_names]
+
+    def as_dict(row, table_columns):
+        return {col: row[2 + i] for i, col in table_columns}
+
+    def merged():
+        """(kind, position in its table, event) in model name order"""
+        old_iter = first_rows(old_rows, old_path)
+        new_iter = first_rows(new_rows, new_path)
+        old, new = next(old_iter, None), next(new_iter, None)
+        while old is not None or new is not None:
+            if new is None or (old is not None and old[0] < new[0]):
+                event = {'op': 'delete', 'model_name': old[0], 'row': as_dict(old, old_columns)}
+                yield 'delete', old[1], event
+                old = next(old_iter, None)
+            elif old is None or new[0] < old[0]:
+                event = {'op': 'insert', 'model_name': new[0], 'row': as_dict(new, new_columns)}
+                yield 'change', new[1], event
+                new = next(new_iter, None)
+            else:
+                old_values, new_values = as_dict(old, old_columns), as_dict(new, new_columns)
+                updates = {}
+                for col in columns:
+                    before, after = old_values.get(col, ''), new_values.get(col, '')
+                    if before != after:
+                        updates[col] = {'old': before, 'new': after}
+                if updates:
+                    yield 'change', new[1], {'op': 'update', 'model_name': new[0], 'changes': updates}
+                old, new = next(old_iter, None), next(new_iter, None)
+
+    # One merge pass, spilled by kind as [position, event JSON]; each spill is then
+    # sorted back into table order
+    delete_path = os.path.join(temp_dir, 'deletes.csv')
+    change_path = os.path.join(temp_dir, 'changes.csv')
+    with open(delete_path, 'w', newline='', encoding='utf-8') as delete_file, \
+            open(change_path, 'w', newline='', encoding='utf-8') as change_file:
+        writers = {'delete': csv.writer(delete_file), 'change': csv.writer(change_file)}
+        for kind, position, event in merged():
+            writers[kind].writerow([position, json.dumps(event, ensure_ascii=False)])
+
+    for path, label in ((delete_path, 'deletes'), (change_path, 'changes')):
+        for _, text in external_join.external_sort(
+                external_join.read_rows(path), lambda r: r[0], memory_bytes, temp_dir, label):
+            yield json.loads(text)
+
+
+def last_sequence(path):
+    """Sequence number of the last event in a JSONL feed (0 if none)"""
+    if not path or not os.path.exists(path):
+        return 0
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        f.seek(max(0, f.tell() - TAIL_BYTES))
+        lines = f.read().splitlines()
+    for line in reversed(lines):
+        try:
+            return json.loads(line)['seq']
+        except (ValueError, KeyError):
+            continue  # partial first line of the tail, or a torn write
+    return 0
+
+
+def build_changes(database_path, previous_path, build_dir, build_name, memory_bytes=None):
+    """
+    Diff a new joined table against the published one and write the build's changes.jsonl.
+    Sequence numbers continue from the feed (or the previous build, if its changes
+    never made it into the feed).
+    Args:
+        database_path (str): New joined CSV.
+        previous_path (str): Published joined CSV, or None for the first build.
+        build_dir (str): Staging directory of the new build.
+        build_name (str): e.g. 'v000007'.
+        memory_bytes (int, optional): Diff on disk within this budget per sorted run
+            (stream_diff()) instead of loading both tables.
+    Returns:
+        dict: Number of events written per op ('insert', 'update', 'delete').
+    """
+    import shutil
+    import tempfile
+
+    previous_changes = os.path.join(os.path.dirname(previous_path), CHANGES_FILE) if previous_path else None
+    seq = max(last_sequence(FEED_FILE), last_sequence(previous_changes))
+    if not (previous_path and os.path.exists(previous_path)):
+        previous_path = None
+
+    temp_dir = None
+    if memory_bytes:
+        temp_dir = tempfile.mkdtemp(prefix='.changes-', dir=build_dir)
+        events = stream_diff(previous_path, database_path, memory_bytes, temp_dir)
+    else:
+        new = read_table(database_path)
+        old = read_table(previous_path) if previous_path else new.iloc[0:0]
+        events = diff_tables(old, new)
+
+    counts = {'insert': 0, 'update': 0, 'delete': 0}
+    try:
+        with open(os.path.join(build_dir, CHANGES_FILE), 'w', encoding='utf-8') as f:
+            for event in events:
+                seq += 1
+                counts[event['op']] += 1
+                f.write(json.dumps({'seq': seq, 'build': build_name} | event, ensure_ascii=False) + '\n')
+    finally:
+        if temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+    return counts
+
+
+def append_to_feed(build_dir, feed_path=FEED_FILE):
+    """
+    Append a published build's changes to the feed, skipping events already in it
+    (so a retried publish doesn't duplicate them).
+    Returns:
+        int: Number of events appended.
+    """
+    last = last_sequence(feed_path)
+    appended = 0
+    with open(os.path.join(build_dir, CHANGES_FILE), encoding='utf-8') as source, \
+            open(feed_path, 'a', encoding='utf-8') as feed:
+        for line in source:
+            if json.loads(line)['seq'] > last:
+                feed.write(line)
+                appended += 1
+        feed.flush()
+        os.fsync(feed.fileno())
+    return appended
+
+
+def read_feed(since=0, feed_path=FEED_FILE):
+    """Yield feed events with a sequence number greater than `since`"""
+    if not os.path.exists(feed_path):
+        return
+    with open(feed_path, encoding='utf-8') as f:
+        for line in f:
+            event = json.loads(line)
+            if event['seq'] > since:
+                yield event
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Print change feed events")
+    parser.add_argument('--since', type=int, default=0, help="Last sequence number already applied")
+    args = parser.parse_args(argv)
+    for event in read_feed(args.since):
+        print(json.dumps(event, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Single-pass column profiling for the joined database.
+
+profile_frame() computes, for every column of a DataFrame chunk, null counts,
+a HyperLogLog distinct-count sketch, min/max, frequent values and (for numeric
+columns) a histogram. Each statistic is mergeable - counts add, HyperLogLog
+registers take the element-wise max, min/max combine, frequent-value counts
+add, and histogram buckets are powers of two so chunks with different ranges
+share bucket edges - so a database can be profiled chunk by chunk (or shard by
+shard) and the partial profiles merged with DatabaseProfile.merge().
+
+The orchestrator writes the result as llm_database_schema.csv (one row per
+column) and database_profile.json (everything, including histograms).
+
+Usage:
+    python column_profile.py complete_llm_database.csv [--chunksize 100000]
+"""
+
+import sys
+import json
+import math
+
+PROFILE_FILE = 'database_profile.json'
+
+# HyperLogLog precision: 2**12 registers, ~1.6% standard error
+HLL_PRECISION = 12
+HLL_REGISTERS = 1 << HLL_PRECISION
+
+# Frequent values kept per column (counts beyond this are dropped when merging,
+# so top values of very high-cardinality columns are approximate)
+TOP_CAPACITY = 256
+TOP_K = 5
+
+
+def hll_registers(values):
+    """
+    HyperLogLog registers for an array of values.
+    Numbers are hashed as float64 and everything else as text, so the same value
+    hashes alike in chunks where pandas inferred different dtypes.
+    """
+    import numpy as np
+    import pandas as pd
+
+    registers = np.zeros(HLL_REGISTERS, dtype=np.uint8)
+    if len(values) == 0:
+        return registers
+    if pd.api.types.is_numeric_dtype(values.dtype) and not pd.api.types.is_bool_dtype(values.dtype):
+        hashes = pd.util.hash_array(values.astype('float64').to_numpy())
+    else:
+        hashes = pd.util.hash_array(values.astype(str).to_numpy(dtype=object))
+    index = (hashes >> np.uint64(64 - HLL_PRECISION)).astype(np.intp)
+    # Rank = position of the first 1 bit in the remaining bits; the top 32 of them
+    # are exact in float64, which is plenty for the cardinalities here
+    rest = ((hashes << np.uint64(HLL_PRECISION)) >> np.uint64(32)).astype(np.float64)
+    rank = np.full(len(rest), 33, dtype=np.uint8)
+    nonzero = rest > 0
+    rank[nonzero] = (32 - np.floor(np.log2(rest[nonzero]))).astype(np.uint8)
+    np.maximum.at(registers, index, rank)
+    return registers
+
+
+def hll_estimate(registers):
+    """Cardinality estimate with the small-range (linear counting) correction"""
+    import numpy as np
+
+    m = HLL_REGISTERS
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimate = alpha * m * m / np.sum(np.power(2.0, -registers.astype(np.float64)))
+    zeros = int(np.count_nonzero(registers == 0))
+    if estimate <= 2.5 * m and zeros:
+        estimate = m * math.log(m / zeros)
+    return int(round(estimate))
+
+
+def histogram_bucket(values):
+    """
+    Power-of-two bucket of each value: k + 1 for 2**k <= |x| < 2**(k+1), negated
+    for negative values; zero is bucket 0.
+    """
+    import numpy as np
+
+    magnitude = np.abs(values)
+    buckets = np.zeros(len(values), dtype=np.int64)
+    nonzero = magnitude > 0
+    buckets[nonzero] = np.floor(np.log2(magnitude[nonzero])).astype(np.int64) + 1
+    return np.where(values < 0, -buckets, buckets)
+
+
+def bucket_range(bucket):
+    """[lower, upper) of a histogram bucket"""
+    if bucket == 0:
+        return 0.0, 0.0
+    lower, upper = 2.0 ** (abs(bucket) - 1), 2.0 ** abs(bucket)
+    return (lower, upper) if bucket > 0 else (-upper, -lower)
+
+
+def trim_top(counts):
+    if len(counts) <= TOP_CAPACITY:
+        return counts
+    return dict(sorted(counts.items(), key=lambda item: -item[1])[:TOP_CAPACITY])
+
+
+class ColumnProfile:
+    """Mergeable statistics of one column"""
+
+    def __init__(self, name, dtype):
+        import numpy as np
+        self.name = name
+        self.dtype = dtype
+        self.rows = 0
+        self.nulls = 0
+        self.registers = np.zeros(HLL_REGISTERS, dtype=np.uint8)
+        self.min = None
+        self.max = None
+        self.top = {}
+        self.histogram = {}
+
+    @property
+    def numeric(self):
+        return self.dtype.startswith(('int', 'uint', 'float'))
+
+    @classmethod
+    def from_series(cls, series):
+        """Profile one chunk of a column; every statistic is computed on whole arrays"""
+        import numpy as np
+        profile = cls(series.name, str(series.dtype))
+        present = series.dropna()
+        profile.rows = len(series)
+        profile.nulls = len(series) - len(present)
+        if len(present) == 0:
+            return profile
+        profile.registers = hll_registers(present)
+        if profile.numeric:
+            values = present.astype('float64').to_numpy()
+            profile.min, profile.max = float(values.min()), float(values.max())
+            buckets, counts = np.unique(histogram_bucket(values), return_counts=True)
+            profile.histogram = dict(zip(buckets.tolist(), counts.tolist()))
+        else:
+            text = present.astype(str)
+            profile.min, profile.max = text.min(), text.max()
+        counts = present.value_counts()
+        profile.top = trim_top({value.item() if hasattr(value, 'item') else value: int(count)
+                                for value, count in counts.head(TOP_CAPACITY).items()})
+        return profile
+
+    def merge(self, other):
+        import numpy as np
+        if self.dtype != other.dtype:
+            # Chunks can infer int for one part of a column and float for another
+            self.dtype = 'float64' if self.numeric and other.numeric else 'object'
+        self.rows += other.rows
+        self.nulls += other.nulls
+        self.registers = np.maximum(self.registers, other.registers)
+        for bound, pick in (('min', min), ('max', max)):
+            mine, theirs = getattr(self, bound), getattr(other, bound)
+            if mine is None or theirs is None:
+                setattr(self, bound, theirs if mine is None else mine)
+            elif type(mine) is type(theirs):
+                setattr(self, bound, pick(mine, theirs))
+            else:
+                setattr(self, bound, pick(str(mine), str(theirs)))
+        for value, count in other.top.items():
+            self.top[value] = self.top.get(value, 0) + count
+        self.top = trim_top(self.top)
+        for bucket, count in other.histogram.items():
+            self.histogram[bucket] = self.histogram.get(bucket, 0) + count
+        return self
+
+    def distinct(self):
+        # Never report more distinct values than non-null rows
+        return min(hll_estimate(self.registers), self.rows - self.nulls)
+
+    def top_values(self, k=TOP_K):
+        return sorted(self.top.items(), key=lambda item: (-item[1], str(item[0])))[:k]
+
+    def to_json(self):
+        return {
+            'column': self.name,
+            'dtype': self.dtype,
+            'rows': self.rows,
+            'nulls': self.nulls,
+            'non_null': self.rows - self.nulls,
+            'distinct_estimate': self.distinct(),
+            'min': self.min,
+            'max': self.max,
+            'top_values': [[value, count] for value, count in self.top_values()],
+            'histogram': [
+                [*bucket_range(bucket), count] for bucket, count in sorted(self.histogram.items())
+            ] if self.numeric else None,
+        }
+
+
+class DatabaseProfile:
+    """Column profiles of a table, in column order"""
+
+    def __init__(self, columns=None):
+        self.columns = columns or {}
+
+    def merge(self, other):
+        for name, column in other.columns.items():
+            if name in self.columns:
+                self.columns[name].merge(column)
+            else:
+                self.columns[name] = column
+        return self
+
+    def rows(self):
+        return max((column.rows for column in self.columns.values()), default=0)
+
+    def to_json(self):
+        return {'rows': self.rows(), 'columns': [column.to_json() for column in self.columns.values()]}
+
+
+def profile_frame(df):
+    """Profile of one DataFrame (a whole table or one chunk of it)"""
+    return DatabaseProfile({col: ColumnProfile.from_series(df[col]) for col in df.columns})
+
+
+def profile_csv(path, chunksize=100_000):
+    """Profile a CSV in chunks of `chunksize` rows, merging the partial profiles"""
+    import pandas as pd
+
+    profile = DatabaseProfile()
+    for chunk in pd.read_csv(path, chunksize=chunksize, float_precision='round_trip'):
+        profile.merge(profile_frame(chunk))
+    return profile
+
+
+def format_value(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return '' if value is None else str(value)
+
+
+def schema_rows(profile, describe):
+    """
+    llm_database_schema.csv rows: the original columns first, so existing readers
+    keep working, then the profile statistics.
+    """
+    rows = []
+    for column in profile.columns.values():
+        rows.append({
+            'Column_Name': column.name,
+            'Data_Type': column.dtype,
+            'Non_Null_Count': column.rows - column.nulls,
+            'Null_Count': column.nulls,
+            'Description': describe(column.name),
+            'Distinct_Estimate': column.distinct(),
+            'Min': format_value(column.min),
+            'Max': format_value(column.max),
+            'Top_Values': '; '.join(f"{format_value(value)} ({count})" for value, count in column.top_values()),
+        })
+    return rows
+
+
+def write_profile(profile, schema_path, profile_path, describe):
+    """Write the schema CSV and the JSON profile"""
+    import csv
+
+    rows = schema_rows(profile, describe)
+    with open(schema_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else ['Column_Name'])
+        writer.writeheader()
+        writer.writerows(rows)
+    with open(profile_path, 'w', encoding='utf-8') as f:
+        json.dump(profile.to_json(), f, indent=2, default=str)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Profile the columns of a CSV")
+    parser.add_argument('csv', help="CSV file, e.g. complete_llm_database.csv")
+    parser.add_argument('--chunksize', type=int, default=100_000, help="Rows per chunk")
+    args = parser.parse_args(argv)
+
+    profile = profile_csv(args.csv, args.chunksize)
+    print(f"{profile.rows()} rows")
+    for column in profile.columns.values():
+        print(f"{column.name}\t{column.dtype}\tnulls={column.nulls}\tdistinct≈{column.distinct()}"
+              f"\tmin={format_value(column.min)}\tmax={format_value(column.max)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
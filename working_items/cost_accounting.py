@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Streaming cost accounting over JSONL request logs.
+
+Each line is one request, e.g.
+    {"timestamp": "2025-06-01T12:00:03Z", "model": "anthropic.claude-3-7-sonnet-20250219-v1:0",
+     "input_tokens": 1200, "output_tokens": 350}
+Logs are read line by line, so memory stays constant whatever the file size.
+On-demand prices come from the build's pricing_table.csv (written by cost.py,
+read with pricing.PriceTable) for one region, falling back to cost.MODEL_PRICING
+for models the pricing pages don't list. They are indexed by normalized name so
+that model IDs and provider spellings resolve to the same entry. Large files can be split into byte ranges and processed in
+a process pool.
+
+Usage:
+    python cost_accounting.py logs.jsonl [more.jsonl ...] [--window day] [--workers 4] [--region us-west-2]
+"""
+
+import os
+import sys
+import json
+import time
+
+import publish
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ATTRIBUTE_DIR = os.path.join(BASE_DIR, '..', 'attribute_functions')
+
+if ATTRIBUTE_DIR not in sys.path:
+    sys.path.append(ATTRIBUTE_DIR)
+from cost import MODEL_PRICING, categorize_cost
+from pricing import ON_DEMAND, PRICING_TABLE_FILE, REFERENCE_REGION_ENV, DEFAULT_REFERENCE_REGION, PriceTable
+from providers import normalize_key, resolve_model_name, load_model_vendor_mapping
+
+# Field names accepted for each value, in order of preference; 'usage' objects are searched too
+MODEL_FIELDS = ('model', 'model_id', 'modelId', 'model_name')
+INPUT_FIELDS = ('input_tokens', 'prompt_tokens', 'inputTokenCount', 'inputTokens')
+OUTPUT_FIELDS = ('output_tokens', 'completion_tokens', 'outputTokenCount', 'outputTokens')
+TIME_FIELDS = ('timestamp', 'time', 'created', 'created_at')
+
+# Time window -> length of the ISO-8601 prefix that identifies it
+WINDOWS = {'hour': 13, 'day': 10, 'month': 7, 'all': 0}
+
+# Files smaller than this are never split across processes
+PARALLEL_MIN_BYTES = 64 * 1024 * 1024
+
+UNPRICED = 'unpriced'
+
+
+def read_price_table(path=None):
+    """
+    pricing.PriceTable from a pricing_table.csv: `path`, else the published build's
+    copy, else the one cost.py wrote in attribute_functions/. None if there is none.
+    """
+    path = path or publish.published_path(PRICING_TABLE_FILE) or os.path.join(ATTRIBUTE_DIR, PRICING_TABLE_FILE)
+    return PriceTable.load(path) if os.path.exists(path) else None
+
+
+class PricingTable:
+    """
+    Model prices (USD per 1K tokens) indexed by normalized name.
+    On-demand prices come from `price_table` (pricing.PriceTable.lookup) in `region`,
+    or the first region that prices the model; models it doesn't price fall back
+    to MODEL_PRICING.
+    Lookups resolve provider IDs such as 'anthropic.claude-3-7-sonnet-20250219-v1:0'
+    or 'mistral-7b-instruct' to the canonical name; each raw spelling is resolved
+    once and cached, so the per-request cost is a dict lookup.
+    """
+
+    def __init__(self, pricing=None, vendors=None, price_table=None, region=None):
+        self.pricing = dict(MODEL_PRICING if pricing is None else pricing)
+        self.price_table = price_table
+        self.region = region or os.environ.get(REFERENCE_REGION_ENV, DEFAULT_REFERENCE_REGION)
+        self.vendors = load_model_vendor_mapping() if vendors is None else vendors
+        priced = list(self.pricing)
+        if price_table is not None:
+            priced += sorted(price_table.models() - set(self.pricing))
+        self.by_key = {normalize_key(name): name for name in priced}
+        priced_names = set(priced)
+        self.canonical_names = priced + [n for n in self.vendors if n not in priced_names]
+        self._resolved = {}
+
+    def price(self, name):
+        """{'input', 'output'} for a canonical name, or None if it isn't priced"""
+        if self.price_table is not None:
+            price = self.price_table.lookup(name, ON_DEMAND, self.region)[0]
+            if price is not None:
+                return {'input': price['input'], 'output': price['output']}
+        return self.pricing.get(name)
+
+    def resolve(self, raw_name):
+        """
+        Raw model field -> (canonical name, vendor, price dict or None, cost category).
+        """
+        resolved = self._resolved.get(raw_name)
+        if resolved is not None:
+            return resolved
+
+        name = self.by_key.get(normalize_key(raw_name))
+        if name is None:
+            # Bedrock IDs are '<provider>.<model>'; try the name with and without the provider
+            candidates = [raw_name]
+            if '.' in raw_name:
+                candidates.append(raw_name.split('.', 1)[1])
+            name = raw_name
+            for candidate in candidates:
+                resolved_name = resolve_model_name(candidate, self.canonical_names)
+                if resolved_name != candidate:
+                    name = resolved_name
+                    break
+        name = self.by_key.get(normalize_key(name), name)
+        price = self.price(name)
+        category = categorize_cost(price['input']) if price else UNPRICED
+        resolved = (name, self.vendors.get(name, 'Unknown'), price, category)
+        self._resolved[raw_name] = resolved
+        return resolved
+
+
+def first_field(record, fields):
+    for field in fields:
+        value = record.get(field)
+        if value is not None:
+            return value
+    usage = record.get('usage')
+    if isinstance(usage, dict):
+        for field in fields:
+            value = usage.get(field)
+            if value is not None:
+                return value
+    return None
+
+
+def window_key(timestamp, window):
+    """
+    Timestamp -> window label. ISO strings are bucketed by prefix (no date parsing);
+    epoch seconds (or milliseconds) are converted with gmtime.
+    """
+    length = WINDOWS[window]
+    if not length:
+        return 'all'
+    if timestamp is None:
+        return 'unknown'
+    if isinstance(timestamp, (int, float)):
+        seconds = timestamp / 1000 if timestamp > 1e11 else timestamp
+        timestamp = time.strftime('%Y-%m-%dT%H', time.gmtime(seconds))
+    return str(timestamp)[:length].replace(' ', 'T')
+
+
+def new_counts():
+    """Raw counts: (model field, window) -> [requests, input tokens, output tokens]"""
+    return {'groups': {}, 'lines': 0, 'skipped': 0}
+
+
+def account_lines(lines, window='day', counts=None):
+    """
+    Fold request log lines into running counts.
+    Cost is linear in tokens, so the loop only sums tokens per (raw model, window);
+    prices, vendors and categories are applied once per group in summarize().
+    Args:
+        lines (iterable[bytes | str]): JSONL lines.
+        window (str): 'hour', 'day', 'month' or 'all'.
+        counts (dict, optional): Counts to add to (from new_counts()).
+    Returns:
+        dict: The updated counts.
+    """
+    counts = new_counts() if counts is None else counts
+    # A reused decoder skips json.loads' per-call type and encoding checks
+    decode = json.JSONDecoder().decode
+    length = WINDOWS[window]
+    groups = counts['groups']
+    skipped = 0
+    n_lines = 0
+    for line in lines:
+        n_lines += 1
+        try:
+            record = decode(line if isinstance(line, str) else line.decode('utf-8', 'replace'))
+            # Try the usual field names inline before falling back to the alias search
+            model = record.get('model') or first_field(record, MODEL_FIELDS)
+            if model is None:
+                skipped += 1
+                continue
+            input_tokens = int(record.get('input_tokens') or first_field(record, INPUT_FIELDS) or 0)
+            output_tokens = int(record.get('output_tokens') or first_field(record, OUTPUT_FIELDS) or 0)
+        except (ValueError, TypeError, AttributeError):
+            # Blank or malformed line, or a JSON value that isn't an object
+            skipped += 1
+            continue
+        timestamp = record.get('timestamp') or first_field(record, TIME_FIELDS)
+        # Day and month labels are plain prefixes of an ISO string
+        if type(timestamp) is str and 0 < length <= 10:
+            key = (str(model), timestamp[:length])
+        else:
+            key = (str(model), window_key(timestamp, window))
+        totals = groups.get(key)
+        if totals is None:
+            groups[key] = [1, input_tokens, output_tokens]
+        else:
+            totals[0] += 1
+            totals[1] += input_tokens
+            totals[2] += output_tokens
+    counts['lines'] += n_lines
+    counts['skipped'] += skipped
+    return counts
+
+
+def merge_counts(target, source):
+    """Add one set of counts into another (used to combine chunk results)"""
+    groups = target['groups']
+    for key, (requests, input_tokens, output_tokens) in source['groups'].items():
+        totals = groups.setdefault(key, [0, 0, 0])
+        totals[0] += requests
+        totals[1] += input_tokens
+        totals[2] += output_tokens
+    target['lines'] += source['lines']
+    target['skipped'] += source['skipped']
+    return target
+
+
+def chunk_ranges(path, n_chunks):
+    """
+    Split a file into byte ranges that start at line boundaries.
+    Returns:
+        list[tuple]: (start, end) offsets covering the whole file.
+    """
+    size = os.path.getsize(path)
+    boundaries = [0]
+    with open(path, 'rb') as f:
+        for i in range(1, n_chunks):
+            f.seek(size * i // n_chunks)
+            f.readline()  # move to the start of the next line
+            position = f.tell()
+            if boundaries[-1] < position < size:
+                boundaries.append(position)
+    boundaries.append(size)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def read_range(path, start, end):
+    """Yield the lines of a file between two line-aligned offsets"""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        position = start
+        for line in f:
+            if position >= end:
+                break
+            position += len(line)
+            yield line
+
+
+def account_chunk(path, start, end, window):
+    """Process pool task: counts for one byte range of a log file"""
+    return account_lines(read_range(path, start, end), window)
+
+
+def account_files(paths, window='day', workers=1):
+    """
+    Count every request in one or more JSONL log files.
+    With workers > 1, files above PARALLEL_MIN_BYTES are split into line-aligned
+    byte ranges and processed in a process pool; chunk counts are merged at the end.
+    Args:
+        paths (list[str]): Log files.
+        window (str): Time window for the 'window' breakdown.
+        workers (int): Process count.
+    Returns:
+        dict: Counts (see new_counts()).
+    """
+    counts = new_counts()
+    tasks = []
+    for path in paths:
+        if workers > 1 and os.path.getsize(path) >= PARALLEL_MIN_BYTES:
+            tasks.extend((path, start, end) for start, end in chunk_ranges(path, workers * 4))
+        else:
+            with open(path, 'rb') as f:
+                account_lines(f, window, counts)
+
+    if tasks:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(account_chunk, path, start, end, window)
+                       for path, start, end in tasks]
+            for future in futures:
+                merge_counts(counts, future.result())
+    return counts
+
+
+def summarize(counts, pricing=None):
+    """
+    Price the counts and roll them up per model, vendor, cost category and window.
+    Args:
+        counts (dict): From account_files() or account_lines().
+        pricing (PricingTable, optional): Price index. Defaults to MODEL_PRICING only.
+    Returns:
+        dict: JSON-friendly report; groups sorted by cost, windows by time.
+    """
+    pricing = pricing or PricingTable()
+    rollups = {'model': {}, 'vendor': {}, 'category': {}, 'window': {}}
+    for (raw_model, window), (requests, input_tokens, output_tokens) in counts['groups'].items():
+        name, vendor, price, category = pricing.resolve(raw_model)
+        cost = (input_tokens * price['input'] + output_tokens * price['output']) / 1000 if price else 0.0
+        for group, key in (('model', name), ('vendor', vendor), ('category', category), ('window', window)):
+            totals = rollups[group].setdefault(key, [0, 0, 0, 0.0])
+            totals[0] += requests
+            totals[1] += input_tokens
+            totals[2] += output_tokens
+            totals[3] += cost
+
+    report = {'lines': counts['lines'], 'skipped': counts['skipped']}
+    for group, totals in rollups.items():
+        ordered = sorted(totals.items()) if group == 'window' else sorted(totals.items(), key=lambda item: -item[1][3])
+        report[group] = [
+            {group: key, 'requests': r, 'input_tokens': i, 'output_tokens': o, 'cost': round(c, 6)}
+            for key, (r, i, o, c) in ordered
+        ]
+    report['total_cost'] = round(sum(c for _, _, _, c in rollups['model'].values()), 6)
+    return report
+
+
+def print_report(report, top=10):
+    print(f"Requests: {report['lines'] - report['skipped']} ({report['skipped']} lines skipped)")
+    print(f"Total cost: ${report['total_cost']:.4f}")
+    for group in ('vendor', 'category', 'model', 'window'):
+        print(f"\nBy {group}:")
+        for entry in report[group][:top]:
+            print(f"  ${entry['cost']:>12.4f}  {entry['requests']:>9} req  {entry[group]}")
+        if len(report[group]) > top:
+            print(f"  ... {len(report[group]) - top} more")
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Aggregate request cost from JSONL logs")
+    parser.add_argument('logs', nargs='+', help="JSONL request log file(s)")
+    parser.add_argument('--window', choices=list(WINDOWS), default='day', help="Time window for the breakdown")
+    parser.add_argument('--workers', type=int, default=1, help="Processes for large files")
+    parser.add_argument('--pricing', help=f"{PRICING_TABLE_FILE} to price with (default: the current build's)")
+    parser.add_argument('--region', help="Region to price in (default: LLM_DB_PRICING_REGION or us-east-1)")
+    parser.add_argument('--json', help="Write the full report to this path")
+    parser.add_argument('--top', type=int, default=10, help="Rows shown per breakdown")
+    args = parser.parse_args(argv)
+
+    if args.pricing and not os.path.exists(args.pricing):
+        parser.error(f"{args.pricing} not found")
+    pricing = PricingTable(price_table=read_price_table(args.pricing), region=args.region)
+
+    started = time.perf_counter()
+    report = summarize(account_files(args.logs, args.window, args.workers), pricing)
+    elapsed = time.perf_counter() - started
+
+    print_report(report, args.top)
+    print(f"\n✓ {report['lines']} lines in {elapsed:.2f}s")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Out-of-core version of orchestrator_database.join_all_data().
+
+Every input is sorted by model key in runs that fit a memory budget; runs are
+spilled to temporary files and k-way merged. The base table is then merge-joined
+with one attribute source at a time, and a final external sort by original row
+order restores the row order of the in-memory (pandas) join.
+
+Each row carries its position as a dotted string of fixed-width counters
+(base row, then the matching row of each source), so sorting by that string
+reproduces pandas' left-join order: base rows in order, and for a base row
+with several matches, the matches in source order.
+
+The output is byte-identical to the pandas path: values are read as strings and
+normalized the way read_csv()/to_csv() would round-trip them (NA markers,
+integer, float and boolean columns, and integer columns that become float when
+the left join leaves gaps).
+
+Usage:
+    python external_join.py <build_dir> [--memory-mb 64]
+"""
+
+import os
+import re
+import sys
+import csv
+import heapq
+import shutil
+import tempfile
+from itertools import groupby
+
+# Default memory budget for one sorted run
+DEFAULT_MEMORY_BYTES = 256 * 1024 * 1024
+
+# Strings read_csv() turns into NaN by default
+NA_VALUES = {
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND',
+    '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+}
+TRUE_VALUES = {'True', 'TRUE', 'true'}
+FALSE_VALUES = {'False', 'FALSE', 'false'}
+INT_PATTERN = re.compile(r'^[+-]?\d+$')
+
+# Width of one counter in the row-order string
+ORDER_WIDTH = 12
+
+# Per-row memory overhead estimate (list and string headers) on top of the cell text
+ROW_OVERHEAD = 64
+CELL_OVERHEAD = 56
+
+csv.field_size_limit(sys.maxsize)
+
+
+class ColumnTypes:
+    """
+    Tracks, in one streaming pass, which dtype read_csv() would give each column:
+    'int', 'float', 'bool', 'object', or 'empty' (all NA, read as float).
+    """
+
+    def __init__(self, n_columns):
+        self.has_na = [False] * n_columns
+        self.candidates = [{'int', 'float', 'bool'} for _ in range(n_columns)]
+        self.seen = [False] * n_columns
+
+    def update(self, row):
+        for i, value in enumerate(row):
+            if value in NA_VALUES:
+                self.has_na[i] = True
+                continue
+            self.seen[i] = True
+            candidates = self.candidates[i]
+            if not candidates:
+                continue
+            if 'int' in candidates and not INT_PATTERN.match(value):
+                candidates.discard('int')
+            if 'bool' in candidates and value not in TRUE_VALUES and value not in FALSE_VALUES:
+                candidates.discard('bool')
+            if 'float' in candidates:
+                try:
+                    float(value)
+                except ValueError:
+                    candidates.discard('float')
+                else:
+                    # float() accepts these, read_csv() doesn't
+                    if '_' in value or value != value.strip():
+                        candidates.discard('float')
+
+    def kinds(self):
+        result = []
+        for seen, has_na, candidates in zip(self.seen, self.has_na, self.candidates):
+            if not seen:
+                result.append('empty')
+            elif 'int' in candidates:
+                # Integers with missing values are read as float64
+                result.append('float' if has_na else 'int')
+            elif 'float' in candidates:
+                result.append('float')
+            elif 'bool' in candidates:
+                result.append('bool')
+            else:
+                result.append('object')
+        return result
+
+
+def normalize_cell(value, kind):
+    """Cell as to_csv() would write it after read_csv() (and a left join, for 'float')"""
+    if value in NA_VALUES:
+        return ''
+    if kind == 'int':
+        return str(int(value))
+    if kind == 'float':
+        return repr(float(value))
+    if kind == 'bool':
+        return 'True' if value in TRUE_VALUES else 'False'
+    return value
+
+
+def order_string(*positions):
+    return '.'.join(str(p).zfill(ORDER_WIDTH) for p in positions)
+
+
+def row_size(row):
+    return ROW_OVERHEAD + CELL_OVERHEAD * len(row) + sum(map(len, row))
+
+
+def write_rows(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        csv.writer(f).writerows(rows)
+
+
+def read_rows(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        yield from csv.reader(f)
+
+
+def external_sort(rows, sort_key, memory_bytes, temp_dir, label):
+    """
+    Sort an iterable of rows within a memory budget.
+    Rows are buffered until the budget is reached, sorted and spilled as a run;
+    the runs are then k-way merged.
+    Args:
+        rows (iterable[list[str]]): Rows to sort.
+        sort_key (callable): Row -> sort key.
+        memory_bytes (int): Approximate budget for one in-memory run.
+        temp_dir (str): Directory for the run files.
+        label (str): Prefix for the run file names.
+    Returns:
+        iterator[list[str]]: Rows in sorted order.
+    """
+    runs = []
+    buffer = []
+    used = 0
+    for row in rows:
+        buffer.append(row)
+        used += row_size(row)
+        if used >= memory_bytes:
+            buffer.sort(key=sort_key)
+            runs.append(os.path.join(temp_dir, f"{label}.run{len(runs)}.csv"))
+            write_rows(runs[-1], buffer)
+            buffer = []
+            used = 0
+    if not runs:
+        buffer.sort(key=sort_key)
+        return iter(buffer)
+    if buffer:
+        buffer.sort(key=sort_key)
+        runs.append(os.path.join(temp_dir, f"{label}.run{len(runs)}.csv"))
+        write_rows(runs[-1], buffer)
+        buffer = None
+    return heapq.merge(*(read_rows(path) for path in runs), key=sort_key)
+
+
+def read_source(path, key_column=None):
+    """
+    Open an attribute CSV the way join_all_data() does.
+    The key is the first column whose name contains 'model' or 'name' (renamed
+    to model_name), unless key_column is given.
+    Returns:
+        tuple: (header, key index, row iterator)
+    """
+    f = open(path, newline='', encoding='utf-8')
+    reader = csv.reader(f)
+    header = next(reader)
+    if key_column is None:
+        key_index = next((i for i, col in enumerate(header)
+                          if 'model' in col.lower() or 'name' in col.lower()), None)
+    else:
+        key_index = header.index(key_column)
+
+    def rows():
+        with f:
+            for row in reader:
+                # Short rows are padded with NA, like read_csv()
+                yield row + [''] * (len(header) - len(row)) if len(row) < len(header) else row
+
+    return header, key_index, rows()
+
+
+def sorted_source(path, memory_bytes, temp_dir, label, key_column=None):
+    """
+    Sort a source by (model key, original row) into rows of [key, order, *cells].
+    NA keys are normalized to '' (pandas matches NaN keys with each other).
+    Returns:
+        tuple: (header, key index, ColumnTypes, sorted row iterator)
+    """
+    header, key_index, rows = read_source(path, key_column)
+    if key_index is None:
+        # join_all_data() can't join such a file either
+        raise ValueError(f"{os.path.basename(path)} has no model/name column to join on")
+    types = ColumnTypes(len(header))
+
+    def keyed():
+        for position, row in enumerate(rows):
+            types.update(row)
+            key = row[key_index]
+            yield ['' if key in NA_VALUES else key, order_string(position)] + row
+
+    # external_sort() reads its whole input before returning, so the types are complete
+    sorted_rows = external_sort(keyed(), lambda r: (r[0], r[1]), memory_bytes, temp_dir, label)
+    return header, key_index, types, sorted_rows
+
+
+def merge_join(left_rows, right_rows, n_right_columns, key_index, stats):
+    """
+    Left join two streams sorted by (key, order).
+    Yields [key, left order + '.' + right order, *left cells, *right cells without key].
+    stats['unmatched'] is set when some left row had no match.
+    """
+    right_groups = groupby(right_rows, key=lambda r: r[0])
+    right_key, right_group = next(right_groups, (None, None))
+    empty = [''] * (n_right_columns - 1)
+    no_match = '0' * ORDER_WIDTH
+
+    for key, left_group in groupby(left_rows, key=lambda r: r[0]):
+        while right_key is not None and right_key < key:
+            right_key, right_group = next(right_groups, (None, None))
+        if right_key == key:
+            # Only one key's matches are held in memory
+            matches = [r[1:2] + r[2:2 + key_index] + r[3 + key_index:] for r in right_group]
+            right_key, right_group = next(right_groups, (None, None))
+        else:
+            matches = []
+        for left in left_group:
+            if matches:
+                for match in matches:
+                    yield [key, f"{left[1]}.{match[0]}"] + left[2:] + match[1:]
+            else:
+                stats['unmatched'] = True
+                yield [key, f"{left[1]}.{no_match}"] + left[2:] + empty
+
+
+def external_join(build_dir, output_files, database_file, memory_bytes=DEFAULT_MEMORY_BYTES):
+    """
+    Join the attribute CSVs onto the vendor database without holding any of them in memory.
+    Args:
+        build_dir (str): Directory with the module outputs; the result is written here.
+        output_files (dict): Module -> output CSV, base first (orchestrator OUTPUT_FILES).
+        database_file (str): Output file name.
+        memory_bytes (int): Approximate memory budget per sorted run.
+    Returns:
+        tuple: (row count, column names)
+    """
+    temp_dir = tempfile.mkdtemp(prefix='.join-', dir=build_dir)
+    try:
+        modules = list(output_files)
+        base_module = modules[0]
+        header, _, types, left = sorted_source(
+            os.path.join(build_dir, output_files[base_module]), memory_bytes, temp_dir, 'base', 'model_name')
+        columns = list(header)
+        key_index = header.index('model_name')
+        kinds = types.kinds()
+        left_file = None
+
+        for n, module in enumerate(modules[1:]):
+            path = os.path.join(build_dir, output_files[module])
+            if not os.path.exists(path):
+                continue
+            right_header, right_key, right_types, right = sorted_source(
+                path, memory_bytes, temp_dir, f"source{n}")
+
+            stats = {'unmatched': False}
+            joined = merge_join(left, right, len(right_header), right_key, stats)
+            # The join output is already sorted by (key, order); materialise it on disk
+            next_file = os.path.join(temp_dir, f"joined{n}.csv")
+            write_rows(next_file, joined)
+            left = read_rows(next_file)
+            if left_file:
+                os.remove(left_file)
+            left_file = next_file
+
+            prefix = module.replace('.py', '').replace('_', '')
+            right_kinds = right_types.kinds()
+            for i, col in enumerate(right_header):
+                if i == right_key:
+                    continue
+                columns.append(f"{prefix}_{col}")
+                kind = right_kinds[i]
+                # Gaps from the left join turn int columns into float; bools stay True/False
+                kinds.append('float' if kind == 'int' and stats['unmatched'] else kind)
+            print(f"✓ Joined {output_files[module]}")
+
+        # Back to the original row order
+        final_rows = external_sort(left, lambda r: r[1], memory_bytes, temp_dir, 'final')
+        n_rows = 0
+        with open(os.path.join(build_dir, database_file), 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerow(columns)
+            for row in final_rows:
+                writer.writerow([normalize_cell(value, kind) for value, kind in zip(row[2:], kinds)])
+                n_rows += 1
+        return n_rows, columns
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def main(argv=None):
+    import argparse
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from orchestrator_database import OUTPUT_FILES, DATABASE_FILE
+
+    parser = argparse.ArgumentParser(description="Join module outputs with bounded memory")
+    parser.add_argument('build_dir', help="Directory holding the module output CSVs")
+    parser.add_argument('--memory-mb', type=int, default=DEFAULT_MEMORY_BYTES // (1024 * 1024))
+    args = parser.parse_args(argv)
+
+    n_rows, columns = external_join(args.build_dir, OUTPUT_FILES, DATABASE_FILE, args.memory_mb * 1024 * 1024)
+    print(f"✓ Complete database saved: {n_rows} rows, {len(columns)} columns")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
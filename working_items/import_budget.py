@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Import-time budget check for the lightweight entry points.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter for each
+entry point and fails if the module's cumulative import time exceeds its budget
+or if it pulls in a heavy dependency (pandas, numpy, bs4) at import time.
+Modules without a budget must be listed in EXEMPT with the reason.
+
+Usage:
+    python import_budget.py            # exit code 1 on any violation
+"""
+
+import os
+import sys
+import subprocess
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ATTRIBUTE_DIR = os.path.join(BASE_DIR, '..', 'attribute_functions')
+
+# Packages that must only be imported inside the functions that need them
+HEAVY_PACKAGES = ('pandas', 'numpy', 'bs4')
+
+# module -> (directory, cumulative import budget in microseconds)
+# Budgets are about 2.5x the module's usual best-of-3 time, so scheduler noise on a
+# busy machine doesn't fail the check; a stray heavy import costs hundreds of ms.
+BUDGETS = {
+    'main': (BASE_DIR, 30000),
+    'publish': (BASE_DIR, 30000),
+    'orchestrator_database': (BASE_DIR, 60000),
+    'model_search': (BASE_DIR, 30000),
+    'snapshot': (BASE_DIR, 30000),
+    'profile_report': (BASE_DIR, 25000),
+    'validate_database': (BASE_DIR, 30000),
+    'cost_accounting': (BASE_DIR, 75000),
+    'batch_planner': (BASE_DIR, 90000),
+    'model_router': (BASE_DIR, 40000),
+    'external_join': (BASE_DIR, 40000),
+    'change_feed': (BASE_DIR, 30000),
+    'result_cache': (BASE_DIR, 30000),
+    'vendor_rollups': (BASE_DIR, 40000),
+    'region_query': (BASE_DIR, 30000),
+    'column_profile': (BASE_DIR, 25000),
+    'shards': (BASE_DIR, 40000),
+    'vendor_database': (ATTRIBUTE_DIR, 25000),
+    'providers': (ATTRIBUTE_DIR, 40000),
+    'catalog_aggregator': (ATTRIBUTE_DIR, 25000),
+    'catalog_parser': (ATTRIBUTE_DIR, 30000),
+    'profiling': (ATTRIBUTE_DIR, 25000),
+    'parse_cache': (ATTRIBUTE_DIR, 25000),
+    'region_index': (ATTRIBUTE_DIR, 25000),
+    'model_card_crawler': (ATTRIBUTE_DIR, 50000),
+    'sharding': (ATTRIBUTE_DIR, 25000),
+    'pricing': (ATTRIBUTE_DIR, 40000),
+    'records': (ATTRIBUTE_DIR, 25000),
+    'cost': (ATTRIBUTE_DIR, 50000),
+    'context_window': (ATTRIBUTE_DIR, 50000),
+    'latency': (ATTRIBUTE_DIR, 40000),
+    'modality': (ATTRIBUTE_DIR, 40000),
+    'model_specificity': (ATTRIBUTE_DIR, 40000),
+    'source_type': (ATTRIBUTE_DIR, 40000),
+    'deployment_v2': (ATTRIBUTE_DIR, 40000),
+}
+
+# Modules deliberately not checked -> reason. Every other module in the two
+# directories must have a budget.
+EXEMPT = {
+    'import_budget': "this checker",
+    'model_similarity': "standalone script built on NumPy arrays; no entry point imports it",
+}
+
+# Best of N runs, so a cold disk cache doesn't fail the check
+RUNS = 3
+
+
+def measure_import(module_name, directory):
+    """
+    Import a module in a fresh interpreter with -X importtime.
+    Returns:
+        tuple: (cumulative microseconds for the module, set of imported top-level packages)
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f"import {module_name}"],
+        cwd=directory, capture_output=True, text=True, check=True
+    )
+    cumulative = None
+    imported = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative_us, name = line.split('|')
+        if not cumulative_us.strip().isdigit():
+            continue  # header line
+        package = name.strip().split('.')[0]
+        imported.add(package)
+        # The top-level entry is the unindented one
+        if name.rstrip() == f" {module_name}":
+            cumulative = int(cumulative_us)
+    return cumulative, imported
+
+
+def unlisted_modules(budgets=BUDGETS, exempt=EXEMPT):
+    """Modules in working_items/ and attribute_functions/ with neither a budget nor an exemption"""
+    return sorted(
+        name[:-3]
+        for directory in (BASE_DIR, ATTRIBUTE_DIR)
+        for name in os.listdir(directory)
+        if name.endswith('.py') and name[:-3] not in budgets and name[:-3] not in exempt
+    )
+
+
+def check_budgets(budgets=BUDGETS):
+    """Measure every entry point and return a list of violation messages"""
+    violations = [f"{name} has no budget (add it to BUDGETS, or to EXEMPT with a reason)"
+                  for name in unlisted_modules(budgets)]
+    for module_name, (directory, budget_us) in budgets.items():
+        best = None
+        imported = set()
+        for _ in range(RUNS):
+            cumulative, imported = measure_import(module_name, directory)
+            best = cumulative if best is None else min(best, cumulative)
+        heavy = sorted(set(HEAVY_PACKAGES) & imported)
+        status = '✓' if best <= budget_us and not heavy else '✗'
+        print(f"{status} {module_name}: {best / 1000:.1f} ms (budget {budget_us / 1000:.0f} ms)")
+        if best > budget_us:
+            violations.append(f"{module_name} took {best} us (budget {budget_us} us)")
+        if heavy:
+            violations.append(f"{module_name} imports {', '.join(heavy)} at import time")
+    return violations
+
+
+def main():
+    violations = check_budgets()
+    if violations:
+        print("\nImport budget exceeded:")
+        for violation in violations:
+            print(f"  - {violation}")
+        sys.exit(1)
+    print("\n✓ All entry points within import budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,18 +5,32 @@ Run this to generate LLM vendor database generator
 
 import os
 import sys
-import subprocess
 
-def run_database_generation():
+import publish
+
+def run_database_generation(profile=False, strict=False, sharded=False):
     """Run the database generation"""
+    import subprocess
+    
     print("Starting database generation...")
     
-    result = subprocess.run([sys.executable, 'orchestrator_database.py'], 
+    command = [sys.executable, 'orchestrator_database.py']
+    if profile:
+        command.append('--profile')
+    if strict:
+        command.append('--strict')
+    if sharded:
+        command.append('--sharded')
+    result = subprocess.run(command, 
                           capture_output=True, 
                           text=True)
     
     if result.returncode == 0:
         print("Database generation completed successfully!")
+        if profile:
+            # The hotspot summary is printed after the build output
+            _, marker, summary = result.stdout.partition("Profile by stage:")
+            print(marker + summary)
         return True
     else:
         print("Database generation failed")
@@ -38,12 +52,45 @@ def show_status():
             print(f"{file_path} ({size} bytes)")
         else:
             print(f"{file_path} (missing)")
+    
+    version = publish.current_version()
+    if version is None:
+        print("Published build: none")
+    else:
+        print(f"Published build: {publish.version_name(version)} ({publish.current_build_dir()})")
 
 def main():
     if len(sys.argv) > 1 and sys.argv[1] == '--status':
         show_status()
+    elif len(sys.argv) > 1 and sys.argv[1] == 'query':
+        import snapshot
+        sys.exit(snapshot.query(sys.argv[2:]))
+    elif len(sys.argv) > 1 and sys.argv[1] == 'route':
+        import model_router
+        sys.exit(model_router.main(sys.argv[2:]))
+    elif len(sys.argv) > 1 and sys.argv[1] == 'costs':
+        import cost_accounting
+        sys.exit(cost_accounting.main(sys.argv[2:]))
+    elif len(sys.argv) > 1 and sys.argv[1] == 'batch':
+        import batch_planner
+        sys.exit(batch_planner.main(sys.argv[2:]))
+    elif len(sys.argv) > 1 and sys.argv[1] == 'changes':
+        import change_feed
+        sys.exit(change_feed.main(sys.argv[2:]))
+    elif len(sys.argv) > 1 and sys.argv[1] == 'vendors':
+        import vendor_rollups
+        sys.exit(vendor_rollups.main(sys.argv[2:]))
+    elif len(sys.argv) > 1 and sys.argv[1] == 'regions':
+        import region_query
+        sys.exit(region_query.main(sys.argv[2:]))
+    elif len(sys.argv) > 1 and sys.argv[1] == 'search':
+        # Imported here so the other commands don't pay for it
+        import model_search
+        sys.exit(model_search.main(sys.argv[2:]))
     else:
-        run_database_generation()
+        run_database_generation(profile='--profile' in sys.argv[1:],
+                                strict='--strict' in sys.argv[1:],
+                                sharded='--sharded' in sys.argv[1:])
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Per-request model routing from a precomputed table.
+
+compile_routing_table() turns the joined database into a decision table:
+for every context-size breakpoint x combination of input modalities that
+some model accepts x latency class it stores the candidate models, cheapest
+first. Routing a request is then a small bisect over the breakpoints, a
+bitmask, a dict lookup and one list index - no scan over models. Modality
+combinations no model accepts are not stored and route to nothing.
+
+Batch support comes from latency_label.csv, which latency.py keys by Bedrock
+model ID; the IDs are resolved to database model names when compiling.
+
+The orchestrator writes the compiled table (routing_table.json) into each
+build, so it is published atomically with the database it came from.
+ModelRouter follows the current build: when a newer one is published it
+loads that build's table in full, then swaps a single reference.
+
+Usage:
+    python model_router.py --tokens 12000 --modality Text --modality Image [--latency batch]
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+from bisect import bisect_left
+
+import publish
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ATTRIBUTE_DIR = os.path.join(BASE_DIR, '..', 'attribute_functions')
+
+ROUTING_FILE = 'routing_table.json'
+DATABASE_FILE = 'complete_llm_database.csv'
+LATENCY_FILE = 'latency_label.csv'
+TABLE_FORMAT = 2
+
+CONTEXT_COLUMN = 'contextwindow_Context window tokens'
+MODALITY_COLUMN = 'modality_Input modalities'
+LATENCY_COLUMN = 'latency_support_type'
+INPUT_COST_COLUMN = 'cost_Input Cost'
+OUTPUT_COST_COLUMN = 'cost_Output Cost'
+
+# 'realtime' requests can use any model; 'batch' requests need batch support
+LATENCY_CLASSES = ['realtime', 'batch']
+BATCH_SUPPORT = 'batch-supported'
+
+# Seconds between checks for a newly published build
+CHECK_INTERVAL = 5.0
+
+
+def parse_number(value):
+    """'200000', '$0.003000' -> float; None for missing or non-numeric cells"""
+    try:
+        return float(str(value).strip().lstrip('$').replace(',', ''))
+    except ValueError:
+        return None
+
+
+def split_modalities(value):
+    return [m.strip() for m in (value or '').split(',') if m.strip()]
+
+
+def model_prices(row):
+    """
+    (input, output) USD per 1K tokens for a database row, from the joined cost
+    columns or cost.MODEL_PRICING; None if the model isn't priced.
+    """
+    input_cost = parse_number(row.get(INPUT_COST_COLUMN, ''))
+    output_cost = parse_number(row.get(OUTPUT_COST_COLUMN, ''))
+    if input_cost is not None and output_cost is not None:
+        return input_cost, output_cost
+    if ATTRIBUTE_DIR not in sys.path:
+        sys.path.append(ATTRIBUTE_DIR)
+    from cost import MODEL_PRICING
+    pricing = MODEL_PRICING.get(row.get('model_name'))
+    return (pricing['input'], pricing['output']) if pricing else None
+
+
+def batch_supported_models(labels_path, names):
+    """
+    Names (from `names`) of the models latency_label.csv marks batch-supported.
+    The labels are keyed by Bedrock model ID ('<provider>.<model>-v1:0'); each ID
+    is resolved with and without its provider prefix, as in cost_accounting.PricingTable.
+    Returns:
+        set[str]: Model names; empty if the labels file is missing.
+    """
+    if not labels_path or not os.path.exists(labels_path):
+        return set()
+    if ATTRIBUTE_DIR not in sys.path:
+        sys.path.append(ATTRIBUTE_DIR)
+    from providers import resolve_model_name
+
+    names = list(names)
+    batch = set()
+    with open(labels_path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            if row.get('support_type') != BATCH_SUPPORT:
+                continue
+            model_id = row['model-id']
+            for candidate in (model_id, model_id.split('.', 1)[-1]):
+                name = resolve_model_name(candidate, names)
+                if name != candidate:
+                    batch.add(name)
+                    break
+    return batch
+
+
+def submasks(mask):
+    """Every mask whose bits are all set in `mask`, including 0"""
+    sub = mask
+    while True:
+        yield sub
+        if sub == 0:
+            return
+        sub = (sub - 1) & mask
+
+
+def compile_routing_table(rows, labels_path=None):
+    """
+    Build the decision table from joined database rows.
+    Models without a known context window are left out, since a fit can't be
+    guaranteed. Candidates are ordered by input + output price per 1K tokens;
+    unpriced models follow the priced ones. Only modality masks that are a
+    subset of some model's modalities get entries.
+    Args:
+        rows (iterable[dict]): Joined database rows.
+        labels_path (str, optional): latency_label.csv for batch support; without
+            it the batch class has no candidates.
+    Returns:
+        dict: JSON-serializable table (see RoutingTable).
+    """
+    models = []
+    for row in rows:
+        name = row.get('model_name')
+        context = parse_number(row.get(CONTEXT_COLUMN, ''))
+        if not name or not context:
+            continue
+        prices = model_prices(row)
+        models.append({
+            'name': name,
+            'context': int(context),
+            'modalities': set(split_modalities(row.get(MODALITY_COLUMN))),
+            'price': round(sum(prices), 8) if prices else None,
+        })
+    batch = batch_supported_models(labels_path, (model['name'] for model in models))
+    for model in models:
+        model['batch'] = model['name'] in batch
+    # Cheapest first, so every candidate list below is already in routing order
+    models.sort(key=lambda m: (m['price'] is None, m['price'] or 0.0, m['name']))
+
+    modalities = sorted({m for model in models for m in model['modalities']})
+    bits = {modality: 1 << i for i, modality in enumerate(modalities)}
+    masks = [sum(bits[m] for m in model['modalities']) for model in models]
+    breakpoints = sorted({model['context'] for model in models})
+    # A request mask outside these has no candidates at any breakpoint
+    stored_masks = sorted({sub for mask in set(masks) for sub in submasks(mask)})
+
+    # Flat list indexed by (breakpoint, position in stored_masks, latency class)
+    table = []
+    for breakpoint in breakpoints:
+        for mask in stored_masks:
+            for latency in LATENCY_CLASSES:
+                table.append([
+                    i for i, model in enumerate(models)
+                    if model['context'] >= breakpoint
+                    and masks[i] & mask == mask
+                    and (latency == 'realtime' or model['batch'])
+                ])
+
+    return {
+        'format': TABLE_FORMAT,
+        'models': [model['name'] for model in models],
+        'prices': [model['price'] for model in models],
+        'breakpoints': breakpoints,
+        'modalities': modalities,
+        'masks': stored_masks,
+        'latency_classes': LATENCY_CLASSES,
+        'table': table,
+    }
+
+
+def write_routing_table(database_path, path, labels_path=None):
+    """Compile the table for a database CSV (batch labels from the same build directory) and write it as JSON"""
+    labels_path = labels_path or os.path.join(os.path.dirname(database_path), LATENCY_FILE)
+    with open(database_path, newline='', encoding='utf-8') as f:
+        compiled = compile_routing_table(csv.DictReader(f), labels_path)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(compiled, f, separators=(',', ':'))
+    return compiled
+
+
+class RoutingTable:
+    """Immutable, query-ready form of a compiled table"""
+
+    def __init__(self, compiled):
+        if compiled.get('format') != TABLE_FORMAT:
+            raise ValueError(f"Unsupported routing table format: {compiled.get('format')}")
+        models = compiled['models']
+        self.breakpoints = compiled['breakpoints']
+        self.bits = {modality: 1 << i for i, modality in enumerate(compiled['modalities'])}
+        self.mask_index = {mask: i for i, mask in enumerate(compiled['masks'])}
+        self.latency_index = {latency: i for i, latency in enumerate(compiled['latency_classes'])}
+        # Resolve indices to names once, so a lookup returns a ready tuple
+        self.table = [tuple(models[i] for i in entry) for entry in compiled['table']]
+        self.prices = dict(zip(models, compiled['prices']))
+
+    def route(self, tokens, modalities=('Text',), latency='realtime'):
+        """
+        Candidate models for a request, cheapest first.
+        Args:
+            tokens (int): Input plus maximum output tokens the request needs.
+            modalities (iterable[str]): Required input modalities.
+            latency (str): 'realtime' or 'batch'.
+        Returns:
+            tuple[str]: Model names; empty if nothing fits.
+        """
+        bucket = bisect_left(self.breakpoints, tokens)
+        if bucket == len(self.breakpoints):
+            return ()
+        mask = 0
+        for modality in modalities:
+            bit = self.bits.get(modality)
+            if bit is None:
+                return ()  # no model accepts this modality
+            mask |= bit
+        position = self.mask_index.get(mask)
+        if position is None:
+            return ()  # no model accepts this combination
+        return self.table[(bucket * len(self.mask_index) + position) * len(self.latency_index) + self.latency_index[latency]]
+
+
+def load_routing_table(path=None):
+    """
+    Read the published routing table, compiling one from the database CSV if the
+    build predates routing tables.
+    """
+    path = path or publish.published_path(ROUTING_FILE)
+    if path and os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            return RoutingTable(json.load(f))
+    database_path = publish.published_path(DATABASE_FILE) or os.path.join(BASE_DIR, DATABASE_FILE)
+    labels_path = publish.published_path(LATENCY_FILE) or os.path.join(ATTRIBUTE_DIR, LATENCY_FILE)
+    with open(database_path, newline='', encoding='utf-8') as f:
+        return RoutingTable(compile_routing_table(csv.DictReader(f), labels_path))
+
+
+class ModelRouter:
+    """
+    Routes requests with the table of the current build.
+    Every CHECK_INTERVAL seconds a route() call checks whether a newer build has
+    been published; if so the new table is loaded completely before the reference
+    is swapped, so concurrent callers see either the old table or the new one.
+    """
+
+    def __init__(self, check_interval=CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self.version = publish.current_version()
+        self.table = load_routing_table()
+        self._next_check = time.monotonic() + check_interval
+
+    def refresh(self):
+        """Reload if a different build is published. Returns True if the table changed."""
+        self._next_check = time.monotonic() + self.check_interval
+        version = publish.current_version()
+        if version == self.version:
+            return False
+        table = load_routing_table()
+        self.table, self.version = table, version
+        return True
+
+    def route(self, tokens, modalities=('Text',), latency='realtime'):
+        if time.monotonic() >= self._next_check:
+            self.refresh()
+        return self.table.route(tokens, modalities, latency)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pick the cheapest model for a request")
+    parser.add_argument('--tokens', type=int, required=True, help="Input plus maximum output tokens")
+    parser.add_argument('--modality', action='append', help="Required input modality (repeatable, default Text)")
+    parser.add_argument('--latency', choices=LATENCY_CLASSES, default='realtime')
+    parser.add_argument('--table', help="Routing table JSON (default: published build)")
+    args = parser.parse_args(argv)
+
+    table = load_routing_table(args.table)
+    candidates = table.route(args.tokens, args.modality or ['Text'], args.latency)
+    if not candidates:
+        print("No model fits this request")
+        return 1
+    for name in candidates:
+        price = table.prices[name]
+        print(f"{name}\t{'$%.6f per 1K+1K tokens' % price if price is not None else 'unpriced'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
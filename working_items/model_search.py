@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Fuzzy model-name search over a character-trigram inverted index.
+
+Indexes model names, Bedrock model IDs and vendor names so that queries like
+"sonnet 3.5", "llama 405b" or "titan embed v2" find the right entries.
+
+Usage:
+    python model_search.py "sonnet 3.5"
+    python model_search.py "titan embed v2" --limit 5
+"""
+
+import os
+import re
+import csv
+import sys
+import heapq
+from collections import Counter
+from itertools import chain
+
+import publish
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ATTRIBUTE_DIR = os.path.join(BASE_DIR, '..', 'attribute_functions')
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+# Posting lists longer than this fraction of the index are not counted during
+# candidate generation (they match almost everything); candidates are still
+# scored exactly against every query trigram.
+COMMON_TRIGRAM_FRACTION = 0.05
+
+# Number of candidates rescored exactly per query, as a multiple of the limit
+CANDIDATE_FACTOR = 8
+
+
+def trigrams(text):
+    """
+    Padded per-word trigrams, so word order doesn't matter ('sonnet 3.5' ~ 'Claude 3.5 Sonnet').
+    Returns:
+        set: Trigram strings.
+    """
+    grams = set()
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        padded = f" {token} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+class TrigramIndex:
+    """Inverted index from trigram to entry ids"""
+
+    def __init__(self):
+        self.texts = []
+        self.kinds = []
+        self.targets = []
+        self.sizes = []
+        self.postings = {}
+        self._seen = set()
+        # Set copies of common posting lists, built lazily for fast intersection
+        self._common_sets = {}
+
+    def __len__(self):
+        return len(self.texts)
+
+    def add(self, text, kind, target=None):
+        """
+        Add a searchable entry.
+        Args:
+            text (str): Text to match (model name, model ID or vendor name).
+            kind (str): 'model', 'model_id' or 'vendor'.
+            target (str, optional): What the entry refers to; defaults to text.
+        """
+        if not text or (text, kind) in self._seen:
+            return
+        grams = trigrams(text)
+        if not grams:
+            return
+        self._seen.add((text, kind))
+        entry_id = len(self.texts)
+        self.texts.append(text)
+        self.kinds.append(kind)
+        self.targets.append(target or text)
+        self.sizes.append(len(grams))
+        for gram in grams:
+            self.postings.setdefault(gram, []).append(entry_id)
+            self._common_sets.pop(gram, None)
+
+    def _common_set(self, gram):
+        posting_set = self._common_sets.get(gram)
+        if posting_set is None:
+            posting_set = self._common_sets[gram] = frozenset(self.postings[gram])
+        return posting_set
+
+    def search(self, query, limit=10, min_score=0.2, kinds=None):
+        """
+        Rank entries by Dice similarity of trigram sets.
+        Args:
+            query (str): Free-text query.
+            limit (int): Maximum number of matches.
+            min_score (float): Drop matches scoring below this (0-1).
+            kinds (set, optional): Only return entries of these kinds.
+        Returns:
+            list[dict]: Matches with text, kind, target and score, best first.
+        """
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+
+        grams = sorted((g for g in query_grams if g in self.postings), key=lambda g: len(self.postings[g]))
+        if not grams:
+            return []
+        n_candidates = limit * CANDIDATE_FACTOR
+        max_postings = max(1, int(len(self.texts) * COMMON_TRIGRAM_FRACTION))
+        rare_lists = [self.postings[g] for g in grams if len(self.postings[g]) <= max_postings]
+
+        if rare_lists:
+            # Candidate generation: count hits from the rarer trigrams
+            hits = Counter(chain.from_iterable(rare_lists))
+            if kinds:
+                hits = Counter({e: n for e, n in hits.items() if self.kinds[e] in kinds})
+            candidates = [entry_id for entry_id, _ in hits.most_common(n_candidates)]
+        else:
+            # Every trigram is common: narrow by set intersection (C speed), skipping
+            # trigrams that would empty the set so a typo doesn't lose everything
+            candidates = self._common_set(grams[0])
+            for gram in grams[1:]:
+                if len(candidates) <= n_candidates:
+                    break
+                narrowed = candidates & self._common_set(gram)
+                if narrowed:
+                    candidates = narrowed
+            if kinds:
+                candidates = [e for e in candidates if self.kinds[e] in kinds]
+            if len(candidates) > n_candidates:
+                # Remaining candidates share the same trigrams; shorter entries score higher
+                candidates = heapq.nsmallest(n_candidates, candidates, key=self.sizes.__getitem__)
+
+        # Exact rescoring of the most promising candidates
+        n_query = len(query_grams)
+        scored = []
+        for entry_id in candidates:
+            common = len(query_grams & trigrams(self.texts[entry_id]))
+            score = 2 * common / (n_query + self.sizes[entry_id])
+            if score >= min_score:
+                scored.append((score, -entry_id))
+
+        return [
+            {
+                'text': self.texts[-neg_id],
+                'kind': self.kinds[-neg_id],
+                'target': self.targets[-neg_id],
+                'score': round(score, 4),
+            }
+            for score, neg_id in heapq.nlargest(limit, scored)
+        ]
+
+
+def read_csv_rows(path):
+    """Yield rows of a CSV file as dicts, or nothing if it doesn't exist"""
+    if not path or not os.path.exists(path):
+        return
+    with open(path, newline='', encoding='utf-8') as f:
+        yield from csv.DictReader(f)
+
+
+def locate(name, fallback_dir):
+    """Prefer the published build's copy of a file, else the working copy"""
+    return publish.published_path(name) or os.path.join(fallback_dir, name)
+
+
+def build_default_index():
+    """
+    Index the database's model and vendor names and the catalog's Bedrock model IDs.
+    Returns:
+        TrigramIndex: Populated index.
+    """
+    index = TrigramIndex()
+    for row in read_csv_rows(locate('complete_llm_database.csv', BASE_DIR)):
+        index.add(row.get('model_name'), 'model')
+        index.add(row.get('vendor_name'), 'vendor')
+    for row in read_csv_rows(locate('latency_label.csv', ATTRIBUTE_DIR)):
+        index.add(row.get('model-id'), 'model_id')
+    return index
+
+
+_default_index = None
+
+
+def search_models(query, limit=10, min_score=0.2, kinds=None):
+    """Search the default index (built on first use)"""
+    global _default_index
+    if _default_index is None:
+        _default_index = build_default_index()
+    return _default_index.search(query, limit=limit, min_score=min_score, kinds=kinds)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Fuzzy search over model names, model IDs and vendors")
+    parser.add_argument('query', nargs='+', help="Search text, e.g. 'sonnet 3.5'")
+    parser.add_argument('--limit', type=int, default=10, help="Maximum number of matches")
+    parser.add_argument('--min-score', type=float, default=0.2, help="Minimum similarity (0-1)")
+    parser.add_argument('--kind', action='append', choices=['model', 'model_id', 'vendor'],
+                        help="Restrict to an entry kind (repeatable)")
+    args = parser.parse_args(argv)
+
+    matches = search_models(' '.join(args.query), limit=args.limit,
+                            min_score=args.min_score, kinds=set(args.kind or []))
+    if not matches:
+        print("No matches")
+        return 1
+    for match in matches:
+        print(f"{match['score']:.3f}  {match['text']}  ({match['kind']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+"Models like this one": weighted attribute-similarity search over the joined database.
+
+Each model is encoded once into NumPy feature blocks - multi-hot categoricals
+(modalities, classification, source type, deployment) and log-scaled numerics
+(context window, input cost). Queries for one or many models are answered with
+a single matrix operation per feature group.
+
+Usage:
+    python model_similarity.py "Claude 3 Haiku" --top 5
+"""
+
+import os
+import csv
+import sys
+import math
+
+import numpy as np
+
+import publish
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# group -> (joined database column, kind, default weight)
+# 'multi' cells hold comma-separated values, 'category' cells hold one value
+FEATURE_GROUPS = {
+    'input_modalities': ('modality_Input modalities', 'multi', 1.0),
+    'output_modalities': ('modality_Output modalities', 'multi', 1.0),
+    'classification': ('modelspecificity_Classification', 'category', 1.0),
+    'source_type': ('sourcetype_Source type', 'category', 0.5),
+    'deployment': ('deploymentv2_Deployment type', 'category', 0.5),
+    'context_window': ('contextwindow_Context window tokens', 'log', 1.0),
+    'cost': ('cost_Input Cost', 'log', 1.0),
+}
+
+# log10 range mapped onto [0, 1] for each numeric group
+LOG_RANGES = {
+    'context_window': (3.0, 7.0),   # 1K .. 10M tokens
+    'cost': (-6.0, 0.0),            # $0.000001 .. $1 per 1K tokens
+}
+
+MISSING_VALUES = {'', 'unknown', 'n/a', 'nan', 'none'}
+
+
+def parse_number(value):
+    """Parse '200000', '$0.003000' or '1,000'; None if not a positive number"""
+    if value is None:
+        return None
+    text = str(value).strip().lstrip('$').replace(',', '')
+    try:
+        number = float(text)
+    except ValueError:
+        return None
+    return number if number > 0 and math.isfinite(number) else None
+
+
+def encode_tokens(value, kind):
+    """Categorical cell -> list of tokens (empty if missing)"""
+    if value is None or str(value).strip().lower() in MISSING_VALUES:
+        return []
+    if kind == 'multi':
+        return [v.strip().lower() for v in str(value).split(',') if v.strip()]
+    return [str(value).strip().lower()]
+
+
+def encode_log(value, group):
+    """Numeric cell -> position in [0, 1] on a log scale, or nan if missing"""
+    number = parse_number(value)
+    if number is None:
+        return np.nan
+    low, high = LOG_RANGES[group]
+    return float(np.clip((math.log10(number) - low) / (high - low), 0.0, 1.0))
+
+
+class SimilarityIndex:
+    """
+    Feature matrix over the joined database, updated incrementally.
+    Categorical groups are stored as L2-normalised multi-hot blocks (cosine similarity
+    is then a dot product); numeric groups as one column scored by 1 - |a - b|.
+    """
+
+    def __init__(self):
+        self.models = []
+        self.positions = {}
+        self.fingerprints = {}
+        self.vocab = {g: {} for g, (_, kind, _) in FEATURE_GROUPS.items() if kind != 'log'}
+        self.blocks = {g: np.zeros((0, 0), dtype=np.float32) for g in self.vocab}
+        self.numeric = {g: np.zeros(0) for g, (_, kind, _) in FEATURE_GROUPS.items() if kind == 'log'}
+
+    def __len__(self):
+        return len(self.models)
+
+    def update(self, rows):
+        """
+        Bring the index in line with the database rows.
+        Only models whose feature columns changed are re-encoded; removed models are dropped.
+        Args:
+            rows (iterable[dict]): Joined database rows (must include 'model_name').
+        Returns:
+            dict: Counts of added, updated, removed and unchanged models.
+        """
+        seen = set()
+        changed = []
+        for row in rows:
+            name = row.get('model_name')
+            if not name or name in seen:
+                continue
+            seen.add(name)
+            fingerprint = tuple(row.get(column) for column, _, _ in FEATURE_GROUPS.values())
+            if self.fingerprints.get(name) != fingerprint:
+                changed.append((name, fingerprint))
+
+        removed = [name for name in self.models if name not in seen]
+        if removed:
+            keep = np.array([name in seen for name in self.models], dtype=bool)
+            self.models = [name for name in self.models if name in seen]
+            self.positions = {name: i for i, name in enumerate(self.models)}
+            for name in removed:
+                del self.fingerprints[name]
+            for group in self.blocks:
+                self.blocks[group] = self.blocks[group][keep]
+            for group in self.numeric:
+                self.numeric[group] = self.numeric[group][keep]
+
+        added = [name for name, _ in changed if name not in self.positions]
+        if added:
+            for name in added:
+                self.positions[name] = len(self.models)
+                self.models.append(name)
+            n_new = len(added)
+            for group, block in self.blocks.items():
+                self.blocks[group] = np.vstack([block, np.zeros((n_new, block.shape[1]), dtype=np.float32)])
+            for group, values in self.numeric.items():
+                self.numeric[group] = np.concatenate([values, np.full(n_new, np.nan)])
+
+        for name, fingerprint in changed:
+            self._encode_row(self.positions[name], fingerprint)
+            self.fingerprints[name] = fingerprint
+
+        return {
+            'added': len(added),
+            'updated': len(changed) - len(added),
+            'removed': len(removed),
+            'unchanged': len(seen) - len(changed),
+        }
+
+    def _encode_row(self, position, fingerprint):
+        for (group, (_, kind, _)), value in zip(FEATURE_GROUPS.items(), fingerprint):
+            if kind == 'log':
+                self.numeric[group][position] = encode_log(value, group)
+                continue
+            tokens = encode_tokens(value, kind)
+            vocab = self.vocab[group]
+            new_tokens = [t for t in dict.fromkeys(tokens) if t not in vocab]
+            if new_tokens:
+                for token in new_tokens:
+                    vocab[token] = len(vocab)
+                # Existing rows get zeros in the new columns, so their encoding stays valid
+                self.blocks[group] = np.pad(self.blocks[group], ((0, 0), (0, len(new_tokens))))
+            row = np.zeros(len(vocab), dtype=np.float32)
+            for token in tokens:
+                row[vocab[token]] = 1.0
+            norm = np.linalg.norm(row)
+            self.blocks[group][position] = row / norm if norm else row
+
+    def similarity(self, names, weights=None):
+        """
+        Weighted similarity of the given models to every model, in one pass per group.
+        Groups missing on either side don't count towards that pair's score.
+        Args:
+            names (list[str]): Query model names.
+            weights (dict, optional): Group -> weight, overriding FEATURE_GROUPS defaults.
+        Returns:
+            np.ndarray: (len(names), len(index)) matrix of scores in [0, 1].
+        """
+        weights = {g: w for g, (_, _, w) in FEATURE_GROUPS.items()} | (weights or {})
+        rows = np.array([self.positions[name] for name in names], dtype=np.intp)
+        total = np.zeros((len(rows), len(self.models)))
+        weight_sum = np.zeros_like(total)
+
+        for group, block in self.blocks.items():
+            weight = weights.get(group, 0.0)
+            if not weight or block.shape[1] == 0:
+                continue
+            present = block.any(axis=1)
+            total += weight * (block[rows] @ block.T)
+            weight_sum += weight * np.outer(present[rows], present)
+
+        for group, values in self.numeric.items():
+            weight = weights.get(group, 0.0)
+            if not weight:
+                continue
+            diff = np.abs(values[rows][:, None] - values[None, :])
+            present = ~np.isnan(diff)
+            total += weight * np.where(present, 1.0 - diff, 0.0)
+            weight_sum += weight * present
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(weight_sum > 0, total / weight_sum, 0.0)
+
+    def most_similar(self, names, k=5, weights=None):
+        """
+        Top-k substitutes for each query model (the model itself excluded).
+        Args:
+            names (str or list[str]): One model name or several.
+            k (int): Number of substitutes per model.
+            weights (dict, optional): Group weights.
+        Returns:
+            dict: Model name -> list of (substitute name, score), best first.
+        """
+        if isinstance(names, str):
+            names = [names]
+        missing = [name for name in names if name not in self.positions]
+        if missing:
+            raise KeyError(f"Unknown model(s): {', '.join(missing)}")
+        scores = self.similarity(names, weights)
+        scores[np.arange(len(names)), [self.positions[name] for name in names]] = -np.inf
+
+        k = min(k, len(self.models) - 1)
+        if k <= 0:
+            return {name: [] for name in names}
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind='stable')
+        top = np.take_along_axis(top, order, axis=1)
+        return {
+            name: [(self.models[j], round(float(scores[i, j]), 4)) for j in top[i]]
+            for i, name in enumerate(names)
+        }
+
+
+def load_database_rows(path=None):
+    """Read the joined database (published build first) as a list of dicts"""
+    path = path or publish.published_path('complete_llm_database.csv') or os.path.join(BASE_DIR, 'complete_llm_database.csv')
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Find the closest substitutes for a model")
+    parser.add_argument('models', nargs='+', help="Model name(s), e.g. 'Claude 3 Haiku'")
+    parser.add_argument('--top', type=int, default=5, help="Substitutes per model")
+    parser.add_argument('--weight', action='append', default=[], metavar='GROUP=W',
+                        help=f"Override a group weight; groups: {', '.join(FEATURE_GROUPS)}")
+    args = parser.parse_args(argv)
+
+    weights = {}
+    for item in args.weight:
+        group, _, value = item.partition('=')
+        if group not in FEATURE_GROUPS:
+            parser.error(f"unknown group '{group}'")
+        weights[group] = float(value)
+
+    index = SimilarityIndex()
+    index.update(load_database_rows())
+    try:
+        results = index.most_similar(args.models, k=args.top, weights=weights)
+    except KeyError as e:
+        print(e.args[0])
+        return 1
+    for name, matches in results.items():
+        print(f"{name}:")
+        for match, score in matches:
+            print(f"  {score:.3f}  {match}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,7 +6,23 @@ LLM Vendor Database Generator - Simple Orchestrator
 import os
 import sys
 import subprocess
-import pandas as pd
+
+import publish
+import snapshot
+import model_router
+import shards
+import change_feed
+import vendor_rollups
+import validate_database
+import column_profile
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ATTRIBUTE_DIR = os.path.join(BASE_DIR, '..', 'attribute_functions')
+
+# The profiling hooks are shared with the attribute modules
+sys.path.append(ATTRIBUTE_DIR)
+import profiling
+from profiling import stage
 
 # All modules to run
 MODULES = [
@@ -23,55 +39,85 @@ MODULES = [
 # Expected output files from each module
 OUTPUT_FILES = {
     'vendor_database.py': 'vendor_database_output.csv',
-    'cost.py': 'cost_analysis_output.csv',
+    'cost.py': 'cost_analysis.csv',
     'context_window.py': 'context_window_output.csv',
     'latency.py': 'latency_label.csv',
     'modality.py': 'modality_output.csv',
     'model_specificity.py': 'llm_specificity_output.csv',
     'source_type.py': 'source_type.csv',
-    'deployment_v2.py': 'deployment_types.csv'
+    'deployment_v2.py': 'deployment.csv'
 }
 
-def clean_files():
-    """Remove existing output files"""
-    files_to_remove = list(OUTPUT_FILES.values()) + [
-        'complete_llm_database.csv',
-        'schema_documentation.csv'
-    ]
-    
-    for file_path in files_to_remove:
-        if os.path.exists(file_path):
-            os.remove(file_path)
+# Set to a memory budget in MB to join out of core (external_join.py)
+JOIN_MEMORY_ENV = 'LLM_DB_JOIN_MEMORY_MB'
+
+# Model card crawling (model_card_crawler.py) only runs when this is set explicitly
+CRAWL_CONCURRENCY_ENV = 'LLM_DB_CRAWL_CONCURRENCY'
+
+# Final files, also exported to working_items/ for existing readers
+DATABASE_FILE = 'complete_llm_database.csv'
+SCHEMA_FILE = 'llm_database_schema.csv'
+SNAPSHOT_FILE = snapshot.SNAPSHOT_FILE
+ROUTING_FILE = model_router.ROUTING_FILE
+# Kept with the build, not exported
+VALIDATION_FILE = validate_database.REPORT_FILE
+PROFILE_FILE = column_profile.PROFILE_FILE
+CHANGES_FILE = change_feed.CHANGES_FILE
+ROLLUP_FILE = vendor_rollups.ROLLUP_FILE
+# Written by cost.py next to its output; kept with the build (batch planning reads it)
+PRICING_TABLE_FILE = 'pricing_table.csv'
 
-def run_module(module_name):
-    """Run a single module"""
+def run_module(module_name, build_dir):
+    """Run a single module, writing its output into the build directory"""
     print(f"Running {module_name}...")
     
-    # Change to attribute_functions directory to run the module
-    original_dir = os.getcwd()
-    os.chdir('../attribute_functions')
+    # Modules write to their working directory, so run them from the staging dir
+    module_path = os.path.join(ATTRIBUTE_DIR, module_name)
+    subprocess.run([sys.executable, module_path], check=True, cwd=build_dir)
     
-    subprocess.run([sys.executable, module_name], check=True)
-    
-    # Change back to original directory
-    os.chdir(original_dir)
     print(f"✓ {module_name} completed")
 
-def join_all_data():
+def merge_shard_outputs(build_dir, workers=1):
+    """Build any missing vendor shards, then merge the shard outputs (see shards.py)"""
+    missing = shards.missing_shards()
+    if missing:
+        print(f"Building {len(missing)} missing shard(s)...")
+        failed = shards.build_shards(missing, workers)
+        if failed:
+            raise RuntimeError(f"Shard build failed for: {', '.join(failed)}")
+    print("Merging vendor shards...")
+    counts = shards.merge_shards(build_dir, list(OUTPUT_FILES.values()) + [PRICING_TABLE_FILE])
+    print(f"✓ Merged {len(counts)} output files from {len(shards.vendors())} shards")
+
+def rebuild_shards(vendors):
+    """Rebuild the given vendors' shards in this process; other shards are left as they are"""
+    for vendor in vendors:
+        print(f"Building shard {vendor}...")
+        shard_build = shards.build_shard(vendor, MODULES, run_module)
+        print(f"✓ Shard {vendor} published: {shard_build}")
+
+def join_all_data(build_dir):
     """Join all CSV files into one comprehensive database"""
+    # pandas is only needed once the modules have run; keep it off the import path
+    import pandas as pd
+    
+    if out_of_core():
+        join_out_of_core(build_dir, int(os.environ[JOIN_MEMORY_ENV]))
+        return None
+    
     print("Joining all data files...")
     
     # Start with vendor database as the base
-    base_df = pd.read_csv(f"../attribute_functions/{OUTPUT_FILES['vendor_database.py']}")
+    base_df = pd.read_csv(os.path.join(build_dir, OUTPUT_FILES['vendor_database.py']), float_precision='round_trip')
     
     # Join each additional file
     for module, output_file in OUTPUT_FILES.items():
         if module == 'vendor_database.py':
             continue  # Skip base file
             
-        file_path = f"../attribute_functions/{output_file}"
+        file_path = os.path.join(build_dir, output_file)
         if os.path.exists(file_path):
-            df = pd.read_csv(file_path)
+            df = pd.read_csv(file_path, float_precision='round_trip')
             
             # Standardize model name column to model_name
             model_col = None
@@ -94,28 +140,77 @@ def join_all_data():
             print(f"✓ Joined {output_file}")
     
     # Save joined database
-    base_df.to_csv('complete_llm_database.csv', index=False)
+    base_df.to_csv(os.path.join(build_dir, DATABASE_FILE), index=False)
     print(f"✓ Complete database saved: {len(base_df)} rows, {len(base_df.columns)} columns")
     return base_df
 
-def create_schema_documentation(df):
-    """Create schema documentation for the final database"""
-    print("Creating schema documentation...")
+def out_of_core():
+    """Whether the build joins on disk (LLM_DB_JOIN_MEMORY_MB); every later stage then streams the joined CSV"""
+    return bool(os.environ.get(JOIN_MEMORY_ENV))
+
+def join_out_of_core(build_dir, memory_mb):
+    """Same join as join_all_data(), sorting and merging on disk within memory_mb per run"""
+    import external_join
     
-    schema_data = []
-    for col in df.columns:
-        schema_data.append({
-            'Column_Name': col,
-            'Data_Type': str(df[col].dtype),
-            'Non_Null_Count': df[col].notna().sum(),
-            'Null_Count': len(df) - df[col].notna().sum(),
-            'Description': get_column_description(col)
-        })
-    
-    schema_df = pd.DataFrame(schema_data)
-    schema_df.to_csv('llm_database_schema.csv', index=False)
+    print(f"Joining all data files out of core ({memory_mb} MB per sorted run)...")
+    n_rows, columns = external_join.external_join(
+        build_dir, OUTPUT_FILES, DATABASE_FILE, memory_mb * 1024 * 1024)
+    print(f"✓ Complete database saved: {n_rows} rows, {len(columns)} columns")
+    return n_rows
+
+def validate_database_output(df, build_dir, strict=False):
+    """Check the joined database against validate_database.RULES (in chunks from the CSV when df is None)"""
+    print("Validating joined database...")
+    if df is None:
+        report = validate_database.validate_csv(os.path.join(build_dir, DATABASE_FILE))
+    else:
+        report = validate_database.validate(df)
+    validate_database.write_report(report, os.path.join(build_dir, VALIDATION_FILE))
+    validate_database.print_report(report)
+    if strict and not report['passed']:
+        raise RuntimeError(f"Validation failed with {report['errors']} error(s); see {VALIDATION_FILE}")
+    return report
+
+def create_schema_documentation(df, build_dir):
+    """Profile every column in one pass and write the schema CSV and JSON profile (see column_profile.py)"""
+    print("Creating schema documentation...")
+    if df is None:
+        profile = column_profile.profile_csv(os.path.join(build_dir, DATABASE_FILE))
+    else:
+        profile = column_profile.profile_frame(df)
+    column_profile.write_profile(profile, os.path.join(build_dir, SCHEMA_FILE),
+                                 os.path.join(build_dir, PROFILE_FILE), get_column_description)
     print("✓ LLM database schema saved")
 
+def create_snapshot(build_dir):
+    """Write the memory-mappable snapshot of the joined database (streamed from the CSV after an out-of-core join)"""
+    print("Creating database snapshot...")
+    write = snapshot.stream_snapshot_from_csv if out_of_core() else snapshot.write_snapshot_from_csv
+    n_rows = write(os.path.join(build_dir, DATABASE_FILE), os.path.join(build_dir, SNAPSHOT_FILE))
+    print(f"✓ Snapshot saved: {n_rows} rows")
+
+def create_routing_table(build_dir):
+    """Compile the request routing table for this build (see model_router.py)"""
+    print("Compiling routing table...")
+    compiled = model_router.write_routing_table(
+        os.path.join(build_dir, DATABASE_FILE), os.path.join(build_dir, ROUTING_FILE))
+    print(f"✓ Routing table saved: {len(compiled['models'])} models, {len(compiled['table'])} entries")
+
+def create_change_feed(version, build_dir):
+    """Diff this build against the published one (see change_feed.py); on disk after an out-of-core join"""
+    print("Diffing against the published database...")
+    memory_bytes = int(os.environ[JOIN_MEMORY_ENV]) * 1024 * 1024 if out_of_core() else None
+    counts = change_feed.build_changes(
+        os.path.join(build_dir, DATABASE_FILE), publish.published_path(DATABASE_FILE),
+        build_dir, publish.version_name(version), memory_bytes)
+    print(f"✓ Changes: {counts['insert']} inserted, {counts['update']} updated, {counts['delete']} deleted")
+
+def create_vendor_rollups(build_dir):
+    """Update the per-vendor rollups from this build's change feed (see vendor_rollups.py)"""
+    print("Updating vendor rollups...")
+    rollups, mode = vendor_rollups.update_rollups(build_dir, publish.current_build_dir(), DATABASE_FILE)
+    print(f"✓ Vendor rollups saved: {len(rollups.vendors)} vendors ({mode})")
+
 def get_column_description(col):
     """Get description for a column based on its name"""
     descriptions = {
@@ -127,12 +222,12 @@ def get_column_description(col):
         'status': 'Vendor company status',
         'vendor_maturity': 'Vendor maturity level (emerging/established/mature)',
         'cost_': 'Cost-related information',
-        'context_window_': 'Context window information',
+        'contextwindow_': 'Context window information',
         'latency_': 'Latency-related data',
         'modality_': 'Input/output modality information',
-        'model_specificity_': 'Model specificity details',
-        'source_type_': 'Source type information',
-        'deployment_': 'Deployment type information'
+        'modelspecificity_': 'Model specificity details',
+        'sourcetype_': 'Source type information',
+        'deploymentv2_': 'Deployment type information'
     }
     
     for prefix, desc in descriptions.items():
@@ -140,27 +235,105 @@ def get_column_description(col):
             return desc
     return 'Additional model attribute'
 
-def main():
+def start_profiling(version):
+    """Profile this run: stages in every process write their stats to one directory"""
+    import profile_report
+    
+    profile_dir = profile_report.profile_dir_for(publish.version_name(version))
+    os.makedirs(profile_dir, exist_ok=True)
+    # Inherited by the module subprocesses and their worker pools
+    os.environ[profiling.PROFILE_DIR_ENV] = profile_dir
+    print(f"Profiling enabled: {profile_dir}")
+    return profile_dir
+
+def main(profile=False, strict=False, sharded=False, workers=1):
     print("LLM Vendor Database Generator")
     print("=" * 40)
     
-    # Clean existing files
-    clean_files()
-    
-    # Run all modules
-    for module in MODULES:
-        run_module(module)
+    # Builds don't fetch model cards unless crawling is configured; inherited by
+    # the module subprocesses
+    os.environ.setdefault(CRAWL_CONCURRENCY_ENV, '0')
     
-    # Join all data
-    final_df = join_all_data()
+    # Build into a private staging directory; the published build stays readable
+    version, build_dir = publish.create_staging_dir()
+    profile_dir = start_profiling(version) if profile else None
+    try:
+        if sharded:
+            # Module outputs come from the per-vendor shard builds
+            with stage("merge"):
+                merge_shard_outputs(build_dir, workers)
+        else:
+            # Run all modules
+            for module in MODULES:
+                run_module(module, build_dir)
+        
+        # Join all data
+        with stage("join"):
+            final_df = join_all_data(build_dir)
+        
+        # Validate the join (--strict fails the build on errors)
+        with stage("validate"):
+            validate_database_output(final_df, build_dir, strict)
+        
+        # Create schema documentation
+        with stage("schema"):
+            create_schema_documentation(final_df, build_dir)
+        
+        # Binary snapshot for fast lookups (main.py query)
+        with stage("snapshot"):
+            create_snapshot(build_dir)
+        
+        # Precomputed routing decisions (main.py route); reads the CSV row by row
+        with stage("routing"):
+            create_routing_table(build_dir)
+        
+        # Per-model changes since the published build (main.py changes)
+        with stage("changes"):
+            create_change_feed(version, build_dir)
+        
+        # Vendor-level rollups, updated from the changes above
+        with stage("rollups"):
+            create_vendor_rollups(build_dir)
+    except Exception:
+        publish.discard_staging_dir(build_dir)
+        print("✗ Build failed; previous database left in place")
+        raise
     
-    # Create schema documentation
-    create_schema_documentation(final_df)
+    published_dir = publish.publish(version, build_dir)
+    for name in (DATABASE_FILE, SCHEMA_FILE, SNAPSHOT_FILE):
+        publish.export_file(published_dir, name, BASE_DIR)
+    change_feed.append_to_feed(published_dir)
     
-    print("\n✓ Database generation completed!")
+    print(f"\n✓ Database generation completed! (build {publish.version_name(version)})")
     print("Files created:")
-    print("  - complete_llm_database.csv")
-    print("  - llm_database_schema.csv")
+    print(f"  - {DATABASE_FILE}")
+    print(f"  - {SCHEMA_FILE}")
+    print(f"  - {SNAPSHOT_FILE}")
+    
+    if profile_dir:
+        import profile_report
+        profile_report.build_report(profile_dir)
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Build the LLM vendor database")
+    parser.add_argument('--profile', action='store_true', help="Profile every stage of the build")
+    parser.add_argument('--strict', action='store_true', help="Fail the build on validation errors")
+    parser.add_argument('--shard', action='append', metavar='VENDOR', help="Rebuild only this vendor's shard (repeatable)")
+    parser.add_argument('--build-shards', action='store_true', help="Rebuild every vendor shard")
+    parser.add_argument('--sharded', action='store_true', help="Build from the vendor shards, building missing ones first")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Shard builds running at once")
+    args = parser.parse_args()
+    
+    if args.shard:
+        try:
+            vendors = [shards.resolve_vendor(name) for name in args.shard]
+        except ValueError as e:
+            parser.error(str(e))
+        rebuild_shards(vendors)
+    elif args.build_shards:
+        failed = shards.build_shards(shards.vendors(), args.workers)
+        sys.exit(1 if failed else 0)
+    else:
+        main(profile=args.profile, strict=args.strict, sharded=args.sharded, workers=args.workers)
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Merges the per-process stats written by `orchestrator_database.py --profile`.
+
+Every profiled process (the orchestrator, each attribute module and their
+parse workers) writes <script>.<stage>.<pid>.pstats into the run's profile
+directory. This combines them into one <script>.<stage>.pstats per stage, a
+collapsed-stack file for flame graph tools (flamegraph.pl, speedscope) and a
+top-N hotspot summary.
+
+Usage:
+    python profile_report.py profiles/v000007 [--top 20]
+"""
+
+import os
+import re
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROFILES_DIR = os.path.join(BASE_DIR, 'profiles')
+
+COLLAPSED_FILE = 'profile.collapsed'
+DEFAULT_TOP = 20
+
+# Raw per-process file: <script>.<stage>.<pid>.pstats
+RAW_PATTERN = re.compile(r'^(?P<stage>.+)\.(?P<pid>\d+)\.pstats$')
+
+# Collapsed stacks stop below this much time or this depth
+MIN_STACK_US = 1
+MAX_DEPTH = 64
+
+
+def profile_dir_for(version_name):
+    return os.path.join(PROFILES_DIR, version_name)
+
+
+def merge_stage_files(profile_dir):
+    """
+    Combine the raw per-process files of each stage into <stage>.pstats.
+    The raw files are removed once merged.
+    Returns:
+        dict: Stage name -> pstats.Stats
+    """
+    import pstats
+
+    raw_files = {}
+    for name in sorted(os.listdir(profile_dir)):
+        match = RAW_PATTERN.match(name)
+        if match:
+            raw_files.setdefault(match.group('stage'), []).append(os.path.join(profile_dir, name))
+
+    merged = {}
+    for stage, paths in raw_files.items():
+        stats = pstats.Stats(*paths)
+        stats.dump_stats(os.path.join(profile_dir, f"{stage}.pstats"))
+        for path in paths:
+            os.remove(path)
+        merged[stage] = stats
+    return merged
+
+
+def load_stage_stats(profile_dir):
+    """Read already merged <stage>.pstats files"""
+    import pstats
+
+    return {
+        name[:-len('.pstats')]: pstats.Stats(os.path.join(profile_dir, name))
+        for name in sorted(os.listdir(profile_dir))
+        if name.endswith('.pstats') and not RAW_PATTERN.match(name)
+    }
+
+
+def frame_label(func):
+    filename, line, name = func
+    if filename == '~':
+        label = name  # built-in, e.g. "<method 'join' of 'str' objects>"
+    else:
+        label = f"{name} ({os.path.basename(filename)}:{line})"
+    # ';' separates frames in the collapsed format
+    return label.replace(';', ',')
+
+
+def collapsed_stacks(stage, stats):
+    """
+    Reconstruct approximate call stacks from a pstats call graph.
+    cProfile only records caller -> callee edges, so a function's time is split
+    across its callers in proportion to the time each edge accounts for.
+    Args:
+        stage (str): Stage name, used as the root frame.
+        stats (pstats.Stats): Stats of that stage.
+    Returns:
+        dict: 'frame;frame;...' -> self time in microseconds
+    """
+    entries = stats.stats
+    callees = {}
+    roots = []
+    for func, (_, _, _, _, callers) in entries.items():
+        known_callers = [caller for caller in callers if caller in entries]
+        if not known_callers:
+            roots.append(func)
+        for caller in known_callers:
+            callees.setdefault(caller, []).append((func, callers[caller][3]))
+
+    stacks = {}
+
+    def walk(func, path, labels, scale):
+        _, _, self_time, cumulative, _ = entries[func]
+        if cumulative * scale * 1e6 < MIN_STACK_US or len(path) > MAX_DEPTH:
+            return
+        labels = labels + [frame_label(func)]
+        self_us = int(self_time * scale * 1e6)
+        if self_us:
+            key = ';'.join(labels)
+            stacks[key] = stacks.get(key, 0) + self_us
+        for callee, edge_cumulative in callees.get(func, ()):
+            if callee in path:
+                continue  # recursion; already inside the callee's cumulative time
+            callee_cumulative = entries[callee][3]
+            if callee_cumulative > 0:
+                walk(callee, path | {callee}, labels, scale * edge_cumulative / callee_cumulative)
+
+    for root in roots:
+        walk(root, frozenset([root]), [stage], 1.0)
+    return stacks
+
+
+def write_collapsed(stats_by_stage, path):
+    """Write every stage's stacks into one collapsed-stack file"""
+    n_lines = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for stage, stats in stats_by_stage.items():
+            for stack, micros in sorted(collapsed_stacks(stage, stats).items()):
+                f.write(f"{stack} {micros}\n")
+                n_lines += 1
+    return n_lines
+
+
+def print_hotspots(stats_by_stage, top=DEFAULT_TOP):
+    """Print per-stage totals and the top functions by own time across all stages"""
+    print("\nProfile by stage:")
+    for stage, stats in sorted(stats_by_stage.items(), key=lambda item: -item[1].total_tt):
+        print(f"  {stats.total_tt:8.3f}s  {stage}")
+
+    rows = []
+    for stage, stats in stats_by_stage.items():
+        for func, (_, calls, self_time, cumulative, _) in stats.stats.items():
+            rows.append((self_time, cumulative, calls, stage, func))
+    rows.sort(key=lambda row: -row[0])
+
+    print(f"\nTop {top} hotspots (own time):")
+    print(f"  {'own s':>8}  {'cum s':>8}  {'calls':>8}  stage / function")
+    for self_time, cumulative, calls, stage, func in rows[:top]:
+        print(f"  {self_time:8.3f}  {cumulative:8.3f}  {calls:8d}  {stage}: {frame_label(func)}")
+
+
+def build_report(profile_dir, top=DEFAULT_TOP):
+    """
+    Merge raw stats, write the collapsed stacks and print the summary.
+    Returns:
+        dict: Stage name -> pstats.Stats
+    """
+    stats_by_stage = merge_stage_files(profile_dir) or load_stage_stats(profile_dir)
+    if not stats_by_stage:
+        print(f"No profile data in {profile_dir}")
+        return stats_by_stage
+    collapsed_path = os.path.join(profile_dir, COLLAPSED_FILE)
+    write_collapsed(stats_by_stage, collapsed_path)
+    print_hotspots(stats_by_stage, top)
+    print(f"\n✓ Profile written to {profile_dir}")
+    print(f"  - {len(stats_by_stage)} stage .pstats files")
+    print(f"  - {COLLAPSED_FILE} (flamegraph.pl / speedscope)")
+    return stats_by_stage
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Summarize a profiled database build")
+    parser.add_argument('profile_dir', help="Profile directory, e.g. profiles/v000007")
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP, help="Number of hotspots to show")
+    args = parser.parse_args(argv)
+    build_report(args.profile_dir, args.top)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
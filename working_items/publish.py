@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Atomic publication of database builds.
+
+Each build is written into a private staging directory under builds/, fsynced,
+renamed to builds/v<NNNNNN> and marked read-only. The `current` symlink is then
+swapped with a single rename, so readers always see either the previous build
+or the new one - never a half-written file.
+"""
+
+import os
+import re
+import mmap
+import shutil
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BUILDS_DIR = os.path.join(BASE_DIR, 'builds')
+CURRENT_LINK = os.path.join(BUILDS_DIR, 'current')
+
+# Number of published builds kept on disk (including current)
+KEEP_BUILDS = 3
+
+VERSION_PATTERN = re.compile(r'^v(\d{6})$')
+
+
+def list_versions(builds_dir=BUILDS_DIR):
+    """Return published version numbers in ascending order"""
+    if not os.path.isdir(builds_dir):
+        return []
+    versions = []
+    for entry in os.listdir(builds_dir):
+        match = VERSION_PATTERN.match(entry)
+        if match:
+            versions.append(int(match.group(1)))
+    return sorted(versions)
+
+
+def version_name(version):
+    """Directory name for a version number"""
+    return f"v{version:06d}"
+
+
+def create_staging_dir(builds_dir=BUILDS_DIR):
+    """Claim the next version number and create its staging directory"""
+    os.makedirs(builds_dir, exist_ok=True)
+    version = (list_versions(builds_dir) or [0])[-1] + 1
+    while True:
+        staging_dir = os.path.join(builds_dir, f".staging-{version_name(version)}")
+        try:
+            # mkdir is atomic, so two concurrent builds can't claim the same version
+            os.mkdir(staging_dir)
+            return version, staging_dir
+        except FileExistsError:
+            version += 1
+
+
+def discard_staging_dir(staging_dir):
+    """Remove a failed build without touching the published one"""
+    shutil.rmtree(staging_dir, ignore_errors=True)
+
+
+def fsync_path(path):
+    """fsync a file or directory"""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def publish(version, staging_dir, builds_dir=BUILDS_DIR):
+    """
+    Make a staged build the current one.
+    Args:
+        version (int): Version number claimed by create_staging_dir().
+        staging_dir (str): Directory holding the finished build.
+    Returns:
+        str: Path of the published build directory.
+    """
+    # Flush every file and make it read-only so readers can mmap safely
+    for name in os.listdir(staging_dir):
+        path = os.path.join(staging_dir, name)
+        if os.path.isfile(path):
+            fsync_path(path)
+            os.chmod(path, 0o444)
+    fsync_path(staging_dir)
+
+    final_dir = os.path.join(builds_dir, version_name(version))
+    os.rename(staging_dir, final_dir)
+
+    # Swap the pointer: create a temporary symlink, then rename it over `current`
+    current_link = os.path.join(builds_dir, 'current')
+    tmp_link = f"{current_link}.tmp-{os.getpid()}"
+    if os.path.lexists(tmp_link):
+        os.remove(tmp_link)
+    os.symlink(version_name(version), tmp_link)
+    os.replace(tmp_link, current_link)
+    fsync_path(builds_dir)
+
+    prune_builds(builds_dir)
+    return final_dir
+
+
+def prune_builds(builds_dir=BUILDS_DIR, keep=KEEP_BUILDS):
+    """Delete old builds; open mmaps of removed files stay valid until closed"""
+    current = current_version(builds_dir)
+    for version in list_versions(builds_dir)[:-keep]:
+        if version != current:
+            shutil.rmtree(os.path.join(builds_dir, version_name(version)), ignore_errors=True)
+
+
+def export_file(build_dir, name, dest_dir):
+    """
+    Atomically replace dest_dir/name with the published copy.
+    Used for the top-level files that existing scripts read directly.
+    """
+    dest = os.path.join(dest_dir, name)
+    tmp = f"{dest}.tmp-{os.getpid()}"
+    shutil.copyfile(os.path.join(build_dir, name), tmp)
+    fsync_path(tmp)
+    os.replace(tmp, dest)
+
+
+def current_version(builds_dir=BUILDS_DIR):
+    """Return the published version number, or None if nothing is published"""
+    current_link = os.path.join(builds_dir, 'current')
+    if not os.path.islink(current_link):
+        return None
+    match = VERSION_PATTERN.match(os.readlink(current_link))
+    return int(match.group(1)) if match else None
+
+
+def current_build_dir(builds_dir=BUILDS_DIR):
+    """Resolve `current` once; keep using the result for a consistent view"""
+    version = current_version(builds_dir)
+    if version is None:
+        return None
+    return os.path.join(builds_dir, version_name(version))
+
+
+def published_path(name, builds_dir=BUILDS_DIR):
+    """Path of a file in the current build, or None if it isn't published"""
+    build_dir = current_build_dir(builds_dir)
+    if build_dir is None:
+        return None
+    path = os.path.join(build_dir, name)
+    return path if os.path.exists(path) else None
+
+
+def open_published(name, builds_dir=BUILDS_DIR):
+    """
+    Memory-map a published file read-only.
+    Published files are never modified in place, so the mapping can't race the writer.
+    Returns:
+        mmap.mmap: Read-only mapping (caller closes it).
+    """
+    path = published_path(name, builds_dir)
+    if path is None:
+        raise FileNotFoundError(f"{name} is not published in {builds_dir}")
+    with open(path, 'rb') as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
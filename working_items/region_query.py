@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Which models are available in a set of AWS regions.
+
+Reads the region bitset column written by deployment_v2.py (see
+attribute_functions/region_index.py) from the joined database or a
+deployment.csv, parses it into an int64 array once, and answers any/all-region
+questions with one vectorized AND over every model.
+
+Usage:
+    python region_query.py --all eu-central-1 eu-west-3 us-east-1
+    python region_query.py --any eu-west-3 eu-south-1 --file deployment.csv
+    python region_query.py --list-regions
+"""
+
+import os
+import sys
+import csv
+
+import publish
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ATTRIBUTE_DIR = os.path.join(BASE_DIR, '..', 'attribute_functions')
+if ATTRIBUTE_DIR not in sys.path:
+    sys.path.append(ATTRIBUTE_DIR)
+import region_index
+
+DATABASE_FILE = 'complete_llm_database.csv'
+# Name of the mask column in the joined database (deployment_v2.py's prefix)
+JOINED_MASK_COLUMN = f"deploymentv2_{region_index.MASK_COLUMN}"
+
+
+class RegionAvailability:
+    """Model names and their region masks, ready for vectorized queries"""
+
+    def __init__(self, names, masks):
+        import numpy as np
+        self.names = np.asarray(names, dtype=object)
+        self.masks = masks
+
+    @classmethod
+    def from_csv(cls, path):
+        """Load from the joined database or a deployment.csv (whichever mask column it has)"""
+        with open(path, newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            mask_column = JOINED_MASK_COLUMN if JOINED_MASK_COLUMN in header else region_index.MASK_COLUMN
+            if mask_column not in header:
+                raise ValueError(f"{os.path.basename(path)} has no region mask column; rebuild the database")
+            name_index = header.index('model_name' if 'model_name' in header else 'Model name')
+            mask_index = header.index(mask_column)
+            names, texts = [], []
+            for row in reader:
+                names.append(row[name_index])
+                texts.append(row[mask_index])
+        return cls(names, region_index.mask_array(texts))
+
+    def available_in_all(self, regions):
+        return list(self.names[region_index.available_in_all(self.masks, regions)])
+
+    def available_in_any(self, regions):
+        return list(self.names[region_index.available_in_any(self.masks, regions)])
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Find models by region availability")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--all', nargs='+', metavar='REGION', help="Available in every one of these regions")
+    group.add_argument('--any', nargs='+', metavar='REGION', help="Available in at least one of these regions")
+    group.add_argument('--list-regions', action='store_true', help="Print the region dictionary")
+    parser.add_argument('--file', help="Joined database or deployment.csv (default: published database)")
+    args = parser.parse_args(argv)
+
+    if args.list_regions:
+        for bit, region in enumerate(region_index.REGIONS):
+            print(f"{bit}\t{region}")
+        return 0
+
+    path = args.file or publish.published_path(DATABASE_FILE) or os.path.join(BASE_DIR, DATABASE_FILE)
+    try:
+        availability = RegionAvailability.from_csv(path)
+        names = availability.available_in_all(args.all) if args.all else availability.available_in_any(args.any)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    for name in names:
+        print(name)
+    return 0 if names else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Memoized filtered views of the published database.
+
+ResultCache answers the same filters snapshot.query accepts ('col=value',
+'col>=100', 'col~text', ...) and keeps the resulting rows, keyed by the
+normalized filter and the published build version. Conditions are normalized
+before lookup, so 'cost_Cost Category = Low Cost' and the same conditions in
+another order or with a different spelling of a number share one entry.
+
+Entries are evicted least recently used first once their estimated size passes
+the memory cap. Every lookup checks which build `current` points at (one
+readlink); when the orchestrator publishes a new build, entries of the old one
+are dropped and the new snapshot is mapped on the next lookup.
+
+    cache = ResultCache(max_bytes=32 * 1024 * 1024)
+    rows = cache.select(['cost_Cost Category=Low Cost'])
+    rows = cache.select(['modality_Input modalities~Text', 'modality_Input modalities~Image'])
+    cache.stats()   # {'hits': 1, 'misses': 2, ...}
+
+Usage:
+    python result_cache.py --where 'vendor_name=Anthropic' --repeat 100
+"""
+
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import publish
+import snapshot
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Estimated bytes for one cached row dict (on top of its values) and one entry
+ROW_OVERHEAD = 232
+ENTRY_OVERHEAD = 512
+VALUE_OVERHEAD = 49
+
+
+def normalize_condition(condition):
+    """
+    ('col', op, value) or 'col<op>value' -> canonical tuple.
+    Numeric thresholds are compared as floats ('100' and '1e2' are the same
+    filter) and substring matches are case-insensitive, so their values are folded.
+    """
+    if isinstance(condition, str):
+        condition = snapshot.parse_condition(condition)
+    column, op, value = condition
+    column, value = column.strip(), str(value).strip()
+    if op not in snapshot.COMPARISONS:
+        raise ValueError(f"Unknown operator '{op}'")
+    if op in ('<', '<=', '>', '>='):
+        value = repr(float(value))
+    elif op == '~':
+        value = value.lower()
+    return column, op, value
+
+
+def normalize_predicate(conditions, columns=None):
+    """AND-ed conditions and a column selection -> hashable cache key"""
+    normalized = tuple(sorted({normalize_condition(c) for c in conditions}))
+    return normalized, tuple(columns) if columns else None
+
+
+def rows_size(rows):
+    """Rough memory footprint of a list of row dicts (keys are shared column names)"""
+    return ENTRY_OVERHEAD + sum(
+        ROW_OVERHEAD + sum(VALUE_OVERHEAD + len(value) for value in row.values()) for row in rows)
+
+
+class ResultCache:
+    """
+    LRU cache of filtered row lists for the current build.
+    Cached rows are shared between callers; treat them as read-only.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, snapshot_path=None):
+        """
+        Args:
+            max_bytes (int): Memory cap for cached results.
+            snapshot_path (str): Fixed snapshot to read instead of following the
+                published build (its modification time stands in for the version).
+        """
+        self.max_bytes = max_bytes
+        self.snapshot_path = snapshot_path
+        self._entries = OrderedDict()  # key -> (rows, size)
+        self._size = 0
+        self._lock = threading.Lock()
+        self._version = None
+        self._snapshot = None
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+    def _current(self):
+        """(version, snapshot path) of the database lookups should see now"""
+        if self.snapshot_path:
+            return os.stat(self.snapshot_path).st_mtime_ns, self.snapshot_path
+        version = publish.current_version()
+        if version is not None:
+            path = os.path.join(publish.BUILDS_DIR, publish.version_name(version), snapshot.SNAPSHOT_FILE)
+            return version, path
+        # Nothing published: the copy exported to working_items
+        path = os.path.join(snapshot.BASE_DIR, snapshot.SNAPSHOT_FILE)
+        return ('unpublished', os.stat(path).st_mtime_ns), path
+
+    def _sync_version(self):
+        """Drop everything cached for an older build. Returns (version, Snapshot)."""
+        version, path = self._current()
+        with self._lock:
+            if version != self._version:
+                if self._entries:
+                    self._stats['invalidations'] += 1
+                self._entries.clear()
+                self._size = 0
+                # Not closed: another thread may still be reading the old build
+                self._snapshot = snapshot.Snapshot(path)
+                self._version = version
+            return self._version, self._snapshot
+
+    def select(self, conditions=(), columns=None):
+        """
+        Rows matching all conditions, from the cache when possible.
+        Args:
+            conditions (iterable): 'col=value' strings or (column, op, value) tuples.
+            columns (list[str]): Columns to include (default: all).
+        Returns:
+            list[dict]: Matching rows in database order.
+        """
+        key = normalize_predicate(conditions, columns)
+        version, snap = self._sync_version()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._version == version:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                return entry[0]
+            self._stats['misses'] += 1
+
+        rows = [snap.row(r, columns) for r in snapshot.filter_rows(snap, list(key[0]))]
+        size = rows_size(rows)
+        with self._lock:
+            # A build published meanwhile: the result belongs to the old version
+            if self._version == version and size <= self.max_bytes:
+                if key not in self._entries:
+                    self._entries[key] = (rows, size)
+                    self._size += size
+                self._evict()
+        return rows
+
+    def _evict(self):
+        while self._size > self.max_bytes:
+            _, (_, size) = self._entries.popitem(last=False)
+            self._size -= size
+            self._stats['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self):
+        """Hit/miss counters plus the current number of entries and their estimated bytes"""
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return dict(self._stats, entries=len(self._entries), bytes=self._size,
+                        hit_rate=self._stats['hits'] / lookups if lookups else 0.0,
+                        version=self._version)
+
+
+def main(argv=None):
+    import time
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a filter repeatedly through the result cache")
+    parser.add_argument('--where', action='append', default=[], metavar='COND',
+                        help="Condition such as 'col=value', 'col>=100' or 'col~text' (repeatable)")
+    parser.add_argument('--repeat', type=int, default=10, help="Number of lookups")
+    parser.add_argument('--snapshot', help="Snapshot file (default: published build)")
+    args = parser.parse_args(argv)
+
+    cache = ResultCache(snapshot_path=args.snapshot)
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        rows = cache.select(args.where)
+    elapsed = time.perf_counter() - start
+    print(f"{len(rows)} rows, {args.repeat} lookups in {elapsed * 1000:.1f} ms")
+    print(cache.stats())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
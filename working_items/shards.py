@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Vendor-sharded builds.
+
+The model universe is partitioned by vendor (MODEL_VENDOR_MAPPING in
+attribute_functions/vendor_database.py). A shard build runs every attribute
+module with LLM_DB_SHARD_VENDORS set to one vendor, so each module only writes
+that vendor's rows, and publishes the outputs to builds/shards/<vendor>/ the same
+way whole builds are published (versioned directories and a `current` symlink).
+Shards are independent: they can run as parallel processes or on separate hosts
+sharing the builds directory, and rebuilding one never touches the others.
+
+merge_shards() then concatenates each module's output across the current shard
+builds, in vendor order, into a build directory; the orchestrator joins the
+result as usual.
+
+Usage:
+    python orchestrator_database.py --shard Amazon        # rebuild one shard
+    python orchestrator_database.py --build-shards --workers 4
+    python orchestrator_database.py --sharded             # merge into a full build
+    python shards.py                                      # shard status
+"""
+
+import os
+import re
+import sys
+import csv
+import json
+import time
+
+import publish
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ATTRIBUTE_DIR = os.path.join(BASE_DIR, '..', 'attribute_functions')
+if ATTRIBUTE_DIR not in sys.path:
+    sys.path.append(ATTRIBUTE_DIR)
+import sharding
+
+SHARDS_DIR = os.path.join(publish.BUILDS_DIR, 'shards')
+MANIFEST_FILE = 'shard.json'
+
+
+def vendors():
+    """All shard vendors, in MODEL_VENDOR_MAPPING order (the order of an unsharded build)"""
+    from vendor_database import MODEL_VENDOR_MAPPING
+    return list(dict.fromkeys(MODEL_VENDOR_MAPPING.values()))
+
+
+def slug(vendor):
+    """Directory name of a vendor's shard ('Hugging Face' -> 'hugging-face')"""
+    return re.sub(r'[^a-z0-9]+', '-', vendor.lower()).strip('-')
+
+
+def shard_dir(vendor, shards_dir=SHARDS_DIR):
+    return os.path.join(shards_dir, slug(vendor))
+
+
+def resolve_vendor(name):
+    """Vendor for a name or slug given on the command line"""
+    for vendor in vendors():
+        if name in (vendor, slug(vendor)):
+            return vendor
+    raise ValueError(f"Unknown vendor '{name}'; expected one of: {', '.join(vendors())}")
+
+
+def build_shard(vendor, modules, run_module, shards_dir=SHARDS_DIR):
+    """
+    Run every module for one vendor and publish the outputs as the shard's current build.
+    Args:
+        vendor (str): Vendor name from MODEL_VENDOR_MAPPING.
+        modules (list): Module scripts to run.
+        run_module (callable): run_module(module, build_dir), as in the orchestrator.
+    Returns:
+        str: Path of the published shard build.
+    """
+    builds_dir = shard_dir(vendor, shards_dir)
+    version, staging_dir = publish.create_staging_dir(builds_dir)
+    previous = os.environ.get(sharding.SHARD_ENV)
+    # Inherited by the module subprocesses
+    os.environ[sharding.SHARD_ENV] = vendor
+    try:
+        for module in modules:
+            run_module(module, staging_dir)
+        write_manifest(vendor, staging_dir)
+    except Exception:
+        publish.discard_staging_dir(staging_dir)
+        raise
+    finally:
+        if previous is None:
+            os.environ.pop(sharding.SHARD_ENV, None)
+        else:
+            os.environ[sharding.SHARD_ENV] = previous
+    return publish.publish(version, staging_dir, builds_dir)
+
+
+def write_manifest(vendor, build_dir):
+    """Record what the shard contains: row counts per output file and the build time"""
+    outputs = {}
+    for name in sorted(os.listdir(build_dir)):
+        if name.endswith('.csv'):
+            with open(os.path.join(build_dir, name), newline='', encoding='utf-8') as f:
+                outputs[name] = max(sum(1 for _ in csv.reader(f)) - 1, 0)
+    manifest = {'vendor': vendor, 'built': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()), 'outputs': outputs}
+    with open(os.path.join(build_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+
+def read_manifest(vendor, shards_dir=SHARDS_DIR):
+    """Manifest of a vendor's current shard build, or None if it has never been built"""
+    build_dir = publish.current_build_dir(shard_dir(vendor, shards_dir))
+    if build_dir is None:
+        return None
+    with open(os.path.join(build_dir, MANIFEST_FILE), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def missing_shards(shard_vendors=None, shards_dir=SHARDS_DIR):
+    """Vendors without a published shard build"""
+    return [vendor for vendor in (shard_vendors or vendors())
+            if publish.current_build_dir(shard_dir(vendor, shards_dir)) is None]
+
+
+def build_shards(shard_vendors, workers=1, script=None):
+    """
+    Build shards in parallel, one orchestrator process per shard.
+    Args:
+        shard_vendors (list): Vendors to build.
+        workers (int): Maximum shard builds running at once.
+    Returns:
+        list: Vendors whose shard build failed.
+    """
+    import subprocess
+    from concurrent.futures import ThreadPoolExecutor
+
+    script = script or os.path.join(BASE_DIR, 'orchestrator_database.py')
+
+    def build(vendor):
+        result = subprocess.run([sys.executable, script, '--shard', vendor],
+                                cwd=BASE_DIR, capture_output=True, text=True)
+        if result.returncode == 0:
+            print(f"✓ Shard {vendor} built")
+        else:
+            print(f"✗ Shard {vendor} failed:\n{result.stderr}")
+        return vendor, result.returncode == 0
+
+    if not shard_vendors:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(shard_vendors)))) as executor:
+        results = list(executor.map(build, shard_vendors))
+    return [vendor for vendor, ok in results if not ok]
+
+
+def merge_shards(build_dir, file_names, shards_dir=SHARDS_DIR):
+    """
+    Concatenate each module output across the current shard builds into build_dir.
+    The merged files hold the same rows as an unsharded build, but grouped by vendor
+    (in vendors() order) rather than in the order the modules write them. The joined
+    database takes its row order from vendor_database_output.csv, which an unsharded
+    build already writes vendor by vendor, so it comes out the same. Columns are the
+    union of the shards' headers, in first-seen order.
+    Args:
+        build_dir (str): Staging directory of the full build.
+        file_names (list): CSV files to merge (the orchestrator's OUTPUT_FILES values and extras).
+    Returns:
+        dict: Output file name -> merged row count.
+    """
+    shard_builds = []
+    for vendor in vendors():
+        shard_build = publish.current_build_dir(shard_dir(vendor, shards_dir))
+        if shard_build is None:
+            raise FileNotFoundError(f"Shard {vendor} has not been built; run orchestrator_database.py --shard '{vendor}'")
+        shard_builds.append(shard_build)
+
+    counts = {}
+    for name in file_names:
+        header, rows = [], []
+        for shard_build in shard_builds:
+            path = os.path.join(shard_build, name)
+            # A module writes nothing for a shard it has no rows for
+            if not os.path.exists(path):
+                continue
+            with open(path, newline='', encoding='utf-8') as f:
+                reader = csv.DictReader(f)
+                header.extend(col for col in reader.fieldnames or [] if col not in header)
+                rows.extend(reader)
+        if not header:
+            continue
+        with open(os.path.join(build_dir, name), 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=header, restval='')
+            writer.writeheader()
+            writer.writerows(rows)
+        counts[name] = len(rows)
+    return counts
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Show the state of the vendor shards")
+    parser.parse_args(argv)
+
+    for vendor in vendors():
+        manifest = read_manifest(vendor)
+        if manifest is None:
+            print(f"{vendor}\t(not built)")
+        else:
+            rows = manifest['outputs'].get('vendor_database_output.csv', 0)
+            print(f"{vendor}\t{publish.version_name(publish.current_version(shard_dir(vendor)))}"
+                  f"\t{manifest['built']}\t{rows} models")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,485 @@
+#!/usr/bin/env python3
+"""
+Memory-mappable binary snapshot of the joined database, and a fast query CLI.
+
+Layout (little-endian, arrays 8-byte aligned):
+    header      magic, row/column/string counts, section offsets
+    strings     sorted string table: (n_strings + 1) uint32 offsets + UTF-8 blob
+    columns     per column: name id, flags, and offsets of its arrays
+    arrays      per column: uint32 string ids (one per row), uint32 row ids sorted
+                by value (the index), and float64 values for numeric columns
+
+String ids follow the sorted order of the strings' UTF-8 bytes, so comparing ids
+compares values and the per-column index answers equality lookups by binary
+search. Readers map the file and read arrays through memoryviews; only the rows
+being returned are decoded.
+
+Usage:
+    python snapshot.py build [database.csv] [output.snap]
+    python snapshot.py query --model "Claude 3 Haiku"
+    python snapshot.py query --vendor Anthropic --columns model_name,modality_Input\\ modalities
+    python snapshot.py query --where "contextwindow_Context window tokens>=100000" --count
+"""
+
+import os
+import re
+import sys
+import mmap
+import struct
+import bisect
+
+import publish
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SNAPSHOT_FILE = 'complete_llm_database.snap'
+DATABASE_FILE = 'complete_llm_database.csv'
+
+MAGIC = b'LLMSNAP1'
+# magic, n_rows, n_cols, n_strings, strings_pos, columns_pos
+HEADER = struct.Struct('<8sIIIQQ')
+# name id, flags, ids_pos, index_pos, numeric_pos
+COLUMN_ENTRY = struct.Struct('<IIQQQ')
+FLAG_NUMERIC = 1
+
+MISSING = float('nan')
+MISSING_MARKERS = {'', 'unknown', 'N/A', 'n/a', 'NA', 'nan', 'None'}
+
+
+def align(buffer):
+    """Pad the buffer to an 8-byte boundary"""
+    buffer.extend(b'\0' * (-len(buffer) % 8))
+
+
+def parse_float(value):
+    if value in MISSING_MARKERS:
+        return MISSING
+    try:
+        return float(value)
+    except ValueError:
+        return MISSING
+
+
+def write_snapshot(columns, rows, path):
+    """
+    Write rows of text values to a snapshot file (atomically, via a temp file).
+    Args:
+        columns (list[str]): Column names.
+        rows (list[list[str]]): Row values as text ('' for missing).
+        path (str): Output path.
+    """
+    strings = sorted({''} | set(columns) | {v for row in rows for v in row}, key=lambda s: s.encode('utf-8'))
+    string_ids = {s: i for i, s in enumerate(strings)}
+    n_rows = len(rows)
+
+    buffer = bytearray(HEADER.size)
+    align(buffer)
+
+    # String table
+    strings_pos = len(buffer)
+    encoded = [s.encode('utf-8') for s in strings]
+    offsets = [0]
+    for blob in encoded:
+        offsets.append(offsets[-1] + len(blob))
+    buffer += struct.pack(f'<{len(offsets)}I', *offsets)
+    buffer += b''.join(encoded)
+    align(buffer)
+
+    # Column directory is filled in after the arrays are placed
+    columns_pos = len(buffer)
+    buffer += b'\0' * (COLUMN_ENTRY.size * len(columns))
+    align(buffer)
+
+    entries = []
+    for c, column in enumerate(columns):
+        ids = [string_ids[row[c]] for row in rows]
+        ids_pos = len(buffer)
+        buffer += struct.pack(f'<{n_rows}I', *ids)
+        align(buffer)
+
+        index_pos = len(buffer)
+        order = sorted(range(n_rows), key=lambda r: (ids[r], r))
+        buffer += struct.pack(f'<{n_rows}I', *order)
+        align(buffer)
+
+        # A column is numeric if every value parses as a float or is a missing marker
+        # ('unknown', 'N/A'); markers become NaN in the numeric array, text is kept as is
+        values = [parse_float(row[c]) for row in rows]
+        numeric = [v for v, row in zip(values, rows) if row[c] not in MISSING_MARKERS]
+        flags, numeric_pos = 0, 0
+        if numeric and all(v == v for v in numeric):
+            flags |= FLAG_NUMERIC
+            numeric_pos = len(buffer)
+            buffer += struct.pack(f'<{n_rows}d', *values)
+            align(buffer)
+        entries.append(COLUMN_ENTRY.pack(string_ids[column], flags, ids_pos, index_pos, numeric_pos))
+
+    buffer[columns_pos:columns_pos + COLUMN_ENTRY.size * len(columns)] = b''.join(entries)
+    buffer[:HEADER.size] = HEADER.pack(MAGIC, n_rows, len(columns), len(strings), strings_pos, columns_pos)
+
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(buffer)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def write_snapshot_from_csv(csv_path, path):
+    """Build a snapshot from a CSV file, keeping values exactly as written"""
+    import csv
+
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        columns = next(reader)
+        rows = [row + [''] * (len(columns) - len(row)) for row in reader]
+    write_snapshot(columns, rows, path)
+    return len(rows)
+
+
+def stream_snapshot_from_csv(csv_path, path, chunk_rows=65536):
+    """
+    Same file as write_snapshot_from_csv(), without holding the rows in memory
+    (for databases joined out of core). A first pass over the CSV collects each
+    column's distinct values; a second spills every column's string ids to a
+    temporary file, `chunk_rows` rows at a time; the snapshot is then written one
+    column at a time. Memory grows with the number of distinct values and the
+    arrays of one column.
+    Returns:
+        int: Number of rows written.
+    """
+    import csv
+    import shutil
+    import tempfile
+    from array import array
+    import numpy as np
+
+    # Pass 1: distinct values per column
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        columns = next(reader)
+        n_cols = len(columns)
+        distinct = [set() for _ in columns]
+        for row in reader:
+            for c in range(n_cols):
+                distinct[c].add(row[c] if c < len(row) else '')
+
+    strings = sorted({''}.union(columns, *distinct), key=lambda s: s.encode('utf-8'))
+    string_ids = {s: i for i, s in enumerate(strings)}
+    # Same test as write_snapshot(): every value that isn't a missing marker parses
+    numeric_columns = []
+    for values in distinct:
+        numbers = [parse_float(v) for v in values if v not in MISSING_MARKERS]
+        numeric_columns.append(bool(numbers) and all(v == v for v in numbers))
+    distinct = None
+    floats_by_id = np.array([parse_float(s) for s in strings], dtype='<f8') if any(numeric_columns) else None
+
+    temp_dir = tempfile.mkdtemp(prefix='.snapshot-', dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        # Pass 2: string ids of each column, in row order
+        id_paths = [os.path.join(temp_dir, f"column{c}.ids") for c in range(n_cols)]
+        id_files = [open(p, 'wb') for p in id_paths]
+        n_rows = 0
+        try:
+            with open(csv_path, newline='', encoding='utf-8') as f:
+                reader = csv.reader(f)
+                next(reader)
+                buffers = [array('I') for _ in columns]
+                for row in reader:
+                    for c in range(n_cols):
+                        buffers[c].append(string_ids[row[c] if c < len(row) else ''])
+                    n_rows += 1
+                    if n_rows % chunk_rows == 0:
+                        for buffer, id_file in zip(buffers, id_files):
+                            buffer.tofile(id_file)
+                        buffers = [array('I') for _ in columns]
+                for buffer, id_file in zip(buffers, id_files):
+                    buffer.tofile(id_file)
+        finally:
+            for id_file in id_files:
+                id_file.close()
+
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        with open(tmp_path, 'wb') as out:
+            def pad():
+                out.write(b'\0' * (-out.tell() % 8))
+
+            out.write(b'\0' * HEADER.size)
+            pad()
+
+            # String table
+            strings_pos = out.tell()
+            offsets = array('I', [0])
+            for s in strings:
+                offsets.append(offsets[-1] + len(s.encode('utf-8')))
+            out.write(struct.pack(f'<{len(offsets)}I', *offsets))
+            for s in strings:
+                out.write(s.encode('utf-8'))
+            pad()
+
+            # Column directory is filled in after the arrays are placed
+            columns_pos = out.tell()
+            out.write(b'\0' * (COLUMN_ENTRY.size * n_cols))
+            pad()
+
+            entries = []
+            for c, column in enumerate(columns):
+                ids = np.fromfile(id_paths[c], dtype='<u4')
+                ids_pos = out.tell()
+                out.write(ids.tobytes())
+                pad()
+
+                # A stable sort orders rows by (id, row)
+                index_pos = out.tell()
+                out.write(np.argsort(ids, kind='stable').astype('<u4').tobytes())
+                pad()
+
+                flags, numeric_pos = 0, 0
+                if numeric_columns[c]:
+                    flags |= FLAG_NUMERIC
+                    numeric_pos = out.tell()
+                    out.write(floats_by_id[ids].tobytes())
+                    pad()
+                entries.append(COLUMN_ENTRY.pack(string_ids[column], flags, ids_pos, index_pos, numeric_pos))
+
+            out.seek(columns_pos)
+            out.write(b''.join(entries))
+            out.seek(0)
+            out.write(HEADER.pack(MAGIC, n_rows, n_cols, len(strings), strings_pos, columns_pos))
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    return n_rows
+
+
+class Snapshot:
+    """Read-only, zero-copy view of a snapshot file"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        # Views handed out over the mapping; released on close() so the mmap can be closed
+        self._views = []
+        self._ids_cache = {}
+        magic, self.n_rows, n_cols, self.n_strings, strings_pos, columns_pos = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an LLM database snapshot")
+
+        self._offsets = self._uint32_array(strings_pos, self.n_strings + 1)
+        self._blob_pos = strings_pos + 4 * (self.n_strings + 1)
+
+        self.columns = []
+        self._entries = {}
+        for c in range(n_cols):
+            name_id, flags, ids_pos, index_pos, numeric_pos = COLUMN_ENTRY.unpack_from(
+                self._mmap, columns_pos + c * COLUMN_ENTRY.size)
+            name = self.string(name_id)
+            self.columns.append(name)
+            self._entries[name] = (flags, ids_pos, index_pos, numeric_pos)
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._view.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _array(self, pos, count, fmt):
+        raw = self._view[pos:pos + struct.calcsize(fmt) * count]
+        array = raw.cast(fmt)
+        self._views += [raw, array]
+        return array
+
+    def _uint32_array(self, pos, count):
+        return self._array(pos, count, 'I')
+
+    def _string_bytes(self, string_id):
+        start = self._blob_pos + self._offsets[string_id]
+        end = self._blob_pos + self._offsets[string_id + 1]
+        return self._mmap[start:end]
+
+    def string(self, string_id):
+        return self._string_bytes(string_id).decode('utf-8')
+
+    def string_id(self, value):
+        """Id of a string in the table, or None if no row holds that value"""
+        target = value.encode('utf-8')
+        i = bisect.bisect_left(range(self.n_strings), target, key=self._string_bytes)
+        if i < self.n_strings and self._string_bytes(i) == target:
+            return i
+        return None
+
+    def _column(self, name):
+        if name not in self._entries:
+            raise KeyError(f"Unknown column '{name}'")
+        return self._entries[name]
+
+    def column_ids(self, name):
+        if name not in self._ids_cache:
+            _, ids_pos, _, _ = self._column(name)
+            self._ids_cache[name] = self._uint32_array(ids_pos, self.n_rows)
+        return self._ids_cache[name]
+
+    def column_numbers(self, name):
+        """float64 view of a numeric column, or None if the column isn't numeric"""
+        flags, _, _, numeric_pos = self._column(name)
+        if not flags & FLAG_NUMERIC:
+            return None
+        return self._array(numeric_pos, self.n_rows, 'd')
+
+    def rows_equal(self, name, value):
+        """Row ids whose column equals value, via binary search on the column index"""
+        _, ids_pos, index_pos, _ = self._column(name)
+        string_id = self.string_id(value)
+        if string_id is None:
+            return []
+        ids = self.column_ids(name)
+        index = self._uint32_array(index_pos, self.n_rows)
+        lo = bisect.bisect_left(index, string_id, key=ids.__getitem__)
+        hi = bisect.bisect_right(index, string_id, lo=lo, key=ids.__getitem__)
+        return sorted(index[lo:hi])
+
+    def value(self, row, name):
+        return self.string(self.column_ids(name)[row])
+
+    def row(self, row, columns=None):
+        return {name: self.value(row, name) for name in (columns or self.columns)}
+
+
+def open_snapshot(path=None):
+    """Open the published snapshot (or the copy in working_items)"""
+    path = path or publish.published_path(SNAPSHOT_FILE) or os.path.join(BASE_DIR, SNAPSHOT_FILE)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No snapshot at {path}; run the orchestrator or 'python snapshot.py build'")
+    return Snapshot(path)
+
+
+COMPARISONS = ('>=', '<=', '!=', '=', '>', '<', '~')
+# Two-character operators first, so '>=' at a position wins over '>'
+OPERATOR_PATTERN = re.compile('|'.join(re.escape(op) for op in COMPARISONS))
+
+
+def parse_condition(text):
+    """
+    'col>=100' -> ('col', '>=', '100'). The text is split at its leftmost
+    operator, so the value may contain operator characters ('col~a=b').
+    """
+    match = OPERATOR_PATTERN.search(text)
+    if not match:
+        raise ValueError(f"Can't parse condition '{text}' (use =, !=, <, <=, >, >= or ~)")
+    return text[:match.start()].strip(), match.group(), text[match.end():].strip()
+
+
+def filter_rows(snapshot, conditions):
+    """
+    Apply AND-ed conditions. Equality uses the column index; other operators scan
+    one fixed-width column.
+    Args:
+        snapshot (Snapshot): Open snapshot.
+        conditions (list[tuple]): (column, operator, value) tuples.
+    Returns:
+        list[int]: Matching row ids in database order.
+    """
+    rows = None
+    # Indexed equality first, so later scans only look at surviving rows
+    ordered = sorted(conditions, key=lambda c: c[1] != '=')
+    for column, op, value in ordered:
+        if op == '=':
+            matches = snapshot.rows_equal(column, value)
+            if rows is None:
+                rows = matches
+            else:
+                match_set = set(matches)
+                rows = [r for r in rows if r in match_set]
+            continue
+        candidates = range(snapshot.n_rows) if rows is None else rows
+        if op in ('<', '<=', '>', '>='):
+            numbers = snapshot.column_numbers(column)
+            if numbers is None:
+                raise ValueError(f"Column '{column}' is not numeric")
+            threshold = float(value)
+            test = {
+                '<': lambda x: x < threshold, '<=': lambda x: x <= threshold,
+                '>': lambda x: x > threshold, '>=': lambda x: x >= threshold,
+            }[op]
+            rows = [r for r in candidates if test(numbers[r])]
+        elif op == '!=':
+            string_id = snapshot.string_id(value)
+            ids = snapshot.column_ids(column)
+            rows = [r for r in candidates if ids[r] != string_id]
+        else:  # '~' case-insensitive substring
+            needle = value.lower()
+            rows = [r for r in candidates if needle in snapshot.value(r, column).lower()]
+    return list(range(snapshot.n_rows)) if rows is None else rows
+
+
+def query(argv):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='query', description="Query the database snapshot")
+    parser.add_argument('--model', help="Exact model name")
+    parser.add_argument('--vendor', help="Exact vendor name")
+    parser.add_argument('--where', action='append', default=[], metavar='COND',
+                        help="Condition such as 'col=value', 'col>=100' or 'col~text' (repeatable)")
+    parser.add_argument('--columns', help="Comma-separated columns to print (default: all)")
+    parser.add_argument('--count', action='store_true', help="Only print the number of matching rows")
+    parser.add_argument('--snapshot', help="Snapshot file (default: published build)")
+    args = parser.parse_args(argv)
+
+    try:
+        conditions = [parse_condition(c) for c in args.where]
+    except ValueError as e:
+        print(e.args[0], file=sys.stderr)
+        return 2
+    if args.model:
+        conditions.append(('model_name', '=', args.model))
+    if args.vendor:
+        conditions.append(('vendor_name', '=', args.vendor))
+
+    try:
+        snapshot = open_snapshot(args.snapshot)
+    except FileNotFoundError as e:
+        print(e, file=sys.stderr)
+        return 2
+    with snapshot:
+        columns = args.columns.split(',') if args.columns else snapshot.columns
+        unknown = [column for column in columns if column not in snapshot.columns]
+        if unknown:
+            print(f"Unknown column '{unknown[0]}'", file=sys.stderr)
+            return 2
+        try:
+            rows = filter_rows(snapshot, conditions)
+        except (KeyError, ValueError) as e:
+            print(e.args[0], file=sys.stderr)
+            return 2
+        if args.count:
+            print(len(rows))
+            return 0 if rows else 1
+        print('\t'.join(columns))
+        for row in rows:
+            print('\t'.join(snapshot.value(row, column) for column in columns))
+    return 0 if rows else 1
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == 'build':
+        csv_path = argv[1] if len(argv) > 1 else os.path.join(BASE_DIR, DATABASE_FILE)
+        out_path = argv[2] if len(argv) > 2 else os.path.join(BASE_DIR, SNAPSHOT_FILE)
+        n_rows = write_snapshot_from_csv(csv_path, out_path)
+        print(f"✓ Snapshot saved: {out_path} ({n_rows} rows)")
+        return 0
+    if argv and argv[0] == 'query':
+        argv = argv[1:]
+    return query(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
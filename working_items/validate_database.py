@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Validation stage for the joined database.
+
+Rules are declared in RULES and each one is evaluated as a single vectorized
+pandas operation over a whole column, so validation time barely depends on
+the row count. The result is a JSON report with one entry per rule.
+
+Usage:
+    python validate_database.py [database.csv] [--report report.json] [--strict]
+"""
+
+import os
+import sys
+import json
+import datetime
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ATTRIBUTE_DIR = os.path.join(BASE_DIR, '..', 'attribute_functions')
+
+DATABASE_FILE = 'complete_llm_database.csv'
+REPORT_FILE = 'validation_report.json'
+
+# Cells that mean "no data" rather than a malformed value (matched exactly, so
+# spelling variants are listed; a hash lookup is far cheaper than normalising strings)
+MISSING_MARKERS = ['', 'unknown', 'Unknown', 'UNKNOWN', 'N/A', 'n/a', 'NA', 'na', 'nan', 'NaN', 'None', 'none']
+
+# Failing rows listed per rule in the report
+MAX_EXAMPLES = 5
+
+
+def known_vendors():
+    """Vendor names with an entry in vendor_database.VENDOR_INFO"""
+    if ATTRIBUTE_DIR not in sys.path:
+        sys.path.append(ATTRIBUTE_DIR)
+    from vendor_database import VENDOR_INFO
+    return list(VENDOR_INFO)
+
+
+# Each rule: check, column (or prefix for coverage), severity ('error' or 'warning')
+# and check-specific parameters:
+#   not_null    - every row has a value
+#   unique      - no value appears twice
+#   numeric     - values parse as numbers (MISSING_MARKERS allowed)
+#   range       - numeric values lie within [min, max]
+#   allowed     - values come from a fixed set
+#   references  - values exist in a reference table (values: callable returning keys)
+#   coverage    - at least `min` of the rows got data from the source with this prefix
+RULES = [
+    {'check': 'not_null', 'column': 'model_name', 'severity': 'error'},
+    {'check': 'unique', 'column': 'model_name', 'severity': 'error'},
+    {'check': 'not_null', 'column': 'vendor_name', 'severity': 'error'},
+    {'check': 'references', 'column': 'vendor_name', 'values': known_vendors, 'severity': 'error'},
+    {'check': 'numeric', 'column': 'formation_year', 'severity': 'error'},
+    {'check': 'range', 'column': 'formation_year', 'min': 1800, 'max': datetime.date.today().year, 'severity': 'error'},
+    {'check': 'range', 'column': 'age_years', 'min': 0, 'max': 250, 'severity': 'error'},
+    {'check': 'allowed', 'column': 'vendor_maturity', 'values': ['emerging', 'established', 'mature'], 'severity': 'warning'},
+    {'check': 'numeric', 'column': 'contextwindow_Context window tokens', 'severity': 'error'},
+    {'check': 'range', 'column': 'contextwindow_Context window tokens', 'min': 1, 'max': 100_000_000, 'severity': 'error'},
+    {'check': 'allowed', 'column': 'contextwindow_Category', 'values': ['small', 'large', 'unknown'], 'severity': 'warning'},
+    {'check': 'allowed', 'column': 'sourcetype_Source type', 'values': ['open', 'closed', 'unknown'], 'severity': 'warning'},
+    {'check': 'allowed', 'column': 'latency_support_type', 'values': ['batch-supported', 'real-time only'], 'severity': 'warning'},
+    {'check': 'coverage', 'prefix': 'contextwindow_', 'min': 0.5, 'severity': 'error'},
+    {'check': 'coverage', 'prefix': 'modality_', 'min': 0.5, 'severity': 'error'},
+    {'check': 'coverage', 'prefix': 'modelspecificity_', 'min': 0.5, 'severity': 'error'},
+    {'check': 'coverage', 'prefix': 'sourcetype_', 'min': 0.5, 'severity': 'error'},
+    {'check': 'coverage', 'prefix': 'deploymentv2_', 'min': 0.5, 'severity': 'error'},
+    {'check': 'coverage', 'prefix': 'latency_', 'min': 0.5, 'severity': 'error'},
+    # cost.py prices every model with token prices on the Bedrock pricing pages (pricing.py);
+    # models sold only elsewhere, or priced per image, stay uncovered
+    {'check': 'coverage', 'prefix': 'cost_', 'min': 0.5, 'severity': 'warning'},
+]
+
+
+def to_numbers(series):
+    """Column -> float series; NaN where the cell is missing or not a number"""
+    import pandas as pd
+    return pd.to_numeric(series, errors='coerce')
+
+
+def is_missing(series):
+    """Null cells and cells holding a MISSING_MARKERS value"""
+    return series.isna() | series.isin(MISSING_MARKERS)
+
+
+def failing_rows(df, rule, numbers_cache):
+    """
+    Evaluate one row-level rule.
+    numbers_cache holds each column's numeric conversion, which is shared by the
+    numeric and range rules of that column and is the most expensive step.
+    Returns:
+        pandas.Series: Boolean mask of failing rows, or None if the column is absent.
+    """
+    column = rule['column']
+    if column not in df.columns:
+        return None
+    series = df[column]
+    check = rule['check']
+
+    if check == 'not_null':
+        return is_missing(series)
+    if check == 'unique':
+        return series.notna() & series.duplicated(keep=False)
+    if check in ('numeric', 'range') and column not in numbers_cache:
+        numbers_cache[column] = to_numbers(series)
+    if check == 'numeric':
+        return numbers_cache[column].isna() & ~is_missing(series)
+    if check == 'range':
+        numbers = numbers_cache[column]
+        return (numbers < rule['min']) | (numbers > rule['max'])
+    if check == 'allowed':
+        return ~is_missing(series) & ~series.isin(rule['values'])
+    if check == 'references':
+        return ~is_missing(series) & ~series.isin(rule['values']())
+    raise ValueError(f"Unknown check '{check}'")
+
+
+def evaluate_rule(df, rule, numbers_cache=None):
+    """
+    Evaluate one rule against the whole database.
+    Returns:
+        dict: Report entry (rule, passed, failure count, examples, message).
+    """
+    name = f"{rule['check']}:{rule.get('column') or rule.get('prefix')}"
+    entry = {'rule': name, 'check': rule['check'], 'severity': rule['severity']}
+
+    if rule['check'] == 'coverage':
+        columns = [col for col in df.columns if col.startswith(rule['prefix'])]
+        if not columns:
+            return entry | {'passed': False, 'coverage': 0.0,
+                            'message': f"no columns with prefix '{rule['prefix']}' (source output missing or not joined)"}
+        covered = df[columns].notna().any(axis=1)
+        coverage = float(covered.mean()) if len(df) else 0.0
+        entry |= {'passed': coverage >= rule['min'], 'coverage': round(coverage, 4), 'failures': int((~covered).sum())}
+        if not entry['passed']:
+            entry['message'] = f"{coverage:.0%} of rows joined (minimum {rule['min']:.0%})"
+        return entry
+
+    mask = failing_rows(df, rule, {} if numbers_cache is None else numbers_cache)
+    if mask is None:
+        return entry | {'passed': False, 'message': f"column '{rule['column']}' missing"}
+    failures = int(mask.sum())
+    entry |= {'passed': failures == 0, 'failures': failures}
+    if failures:
+        failed = df.loc[mask]
+        label = failed['model_name'] if 'model_name' in df.columns else failed.index.to_series()
+        entry['examples'] = [
+            {'model_name': str(model), 'value': str(value)}
+            for model, value in zip(label.head(MAX_EXAMPLES), failed[rule['column']].head(MAX_EXAMPLES))
+        ]
+        entry['message'] = f"{failures} row(s) failed"
+    return entry
+
+
+def validate(df, rules=RULES):
+    """
+    Run every rule against the joined database.
+    Args:
+        df (pandas.DataFrame): Output of join_all_data().
+        rules (list[dict], optional): Rules to run. Defaults to RULES.
+    Returns:
+        dict: Report with 'rows', 'errors', 'warnings', 'passed' and per-rule 'results'.
+    """
+    numbers_cache = {}
+    results = [evaluate_rule(df, rule, numbers_cache) for rule in rules]
+    failed = [r for r in results if not r['passed']]
+    errors = sum(1 for r in failed if r['severity'] == 'error')
+    return {
+        'rows': len(df),
+        'columns': len(df.columns),
+        'passed': errors == 0,
+        'errors': errors,
+        'warnings': len(failed) - errors,
+        'results': results,
+    }
+
+
+def validate_csv(path, rules=RULES, chunksize=100_000):
+    """
+    Same report as validate(), reading the joined CSV `chunksize` rows at a time
+    (for databases joined out of core). Failures and coverage are summed over the
+    chunks; 'unique' rules keep a count per distinct value of their column and list
+    one example per duplicated value.
+    Args:
+        path (str): Joined database CSV.
+        rules (list[dict], optional): Rules to run. Defaults to RULES.
+    Returns:
+        dict: Report in the format of validate().
+    """
+    import pandas as pd
+
+    # Missing columns are found from the header alone
+    header = pd.read_csv(path, nrows=0)
+    base = [evaluate_rule(header, rule) for rule in rules]
+    absent = {i for i, entry in enumerate(base) if 'failures' not in entry}
+    failures = [0] * len(rules)
+    examples = [[] for _ in rules]
+    # rule index -> {value: [occurrences, model name of the first]}
+    seen = {i: {} for i, rule in enumerate(rules) if rule['check'] == 'unique' and i not in absent}
+    n_rows = 0
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        numbers_cache = {}
+        labels = chunk['model_name'] if 'model_name' in chunk.columns else chunk.index.to_series()
+        for i, rule in enumerate(rules):
+            if i in absent:
+                continue
+            if i in seen:
+                for value, label in zip(chunk[rule['column']], labels):
+                    if value == value:  # NaN is never a duplicate
+                        seen[i].setdefault(value, [0, label])[0] += 1
+                continue
+            entry = evaluate_rule(chunk, rule, numbers_cache)
+            failures[i] += entry['failures']
+            examples[i].extend(entry.get('examples', [])[:MAX_EXAMPLES - len(examples[i])])
+        n_rows += len(chunk)
+
+    results = []
+    for i, rule in enumerate(rules):
+        if i in absent:
+            results.append(base[i])
+            continue
+        if i in seen:
+            duplicates = [(label, value, count) for value, (count, label) in seen[i].items() if count > 1]
+            failures[i] = sum(count for _, _, count in duplicates)
+            examples[i] = [{'model_name': str(label), 'value': str(value)} for label, value, _ in duplicates[:MAX_EXAMPLES]]
+        entry = {key: base[i][key] for key in ('rule', 'check', 'severity')}
+        if rule['check'] == 'coverage':
+            coverage = (n_rows - failures[i]) / n_rows if n_rows else 0.0
+            entry |= {'passed': coverage >= rule['min'], 'coverage': round(coverage, 4), 'failures': failures[i]}
+            if not entry['passed']:
+                entry['message'] = f"{coverage:.0%} of rows joined (minimum {rule['min']:.0%})"
+        else:
+            entry |= {'passed': failures[i] == 0, 'failures': failures[i]}
+            if failures[i]:
+                entry['examples'] = examples[i]
+                entry['message'] = f"{failures[i]} row(s) failed"
+        results.append(entry)
+
+    failed = [r for r in results if not r['passed']]
+    errors = sum(1 for r in failed if r['severity'] == 'error')
+    return {
+        'rows': n_rows,
+        'columns': len(header.columns),
+        'passed': errors == 0,
+        'errors': errors,
+        'warnings': len(failed) - errors,
+        'results': results,
+    }
+
+
+def write_report(report, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+
+def print_report(report):
+    for result in report['results']:
+        if result['passed']:
+            continue
+        mark = '✗' if result['severity'] == 'error' else '!'
+        print(f"  {mark} {result['rule']}: {result['message']}")
+        for example in result.get('examples', [])[:3]:
+            print(f"      {example['model_name']}: {example['value']!r}")
+    status = '✓' if report['passed'] else '✗'
+    print(f"{status} Validation: {report['errors']} error(s), {report['warnings']} warning(s) "
+          f"across {len(report['results'])} rules, {report['rows']} rows")
+
+
+def main(argv=None):
+    import argparse
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Validate the joined LLM database")
+    parser.add_argument('database', nargs='?', default=os.path.join(BASE_DIR, DATABASE_FILE))
+    parser.add_argument('--report', help="Write the JSON report to this path")
+    parser.add_argument('--strict', action='store_true', help="Exit with status 1 on any error")
+    args = parser.parse_args(argv)
+
+    report = validate(pd.read_csv(args.database))
+    print_report(report)
+    if args.report:
+        write_report(report, args.report)
+    return 1 if args.strict and not report['passed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Per-vendor rollups maintained from the change feed.
+
+vendor_rollups.csv holds one row per vendor: number of models, input modality
+coverage, smallest and largest context window, cheapest input rate and the
+share of batch-supported models. The orchestrator writes it into each build.
+
+Instead of a group-by over the whole joined table, each build starts from the
+previous build's rollup state and applies its change feed (change_feed.py):
+an insert adds the model's contribution to its vendor, a delete subtracts it,
+an update subtracts the old contribution and adds the new one. Min/max need to
+survive deletes, so each vendor keeps a count per distinct value
+(context windows, input rates) rather than only the extremes.
+
+The state (vendor_rollups.state.json) stores, per model, just the columns the
+rollups read, so update events - which only carry changed columns - can be
+applied without the previous database. Without a previous state the rollups
+are computed from the joined CSV.
+
+Usage:
+    python vendor_rollups.py                 # print the published rollups
+    python vendor_rollups.py --verify        # compare with a full recompute
+"""
+
+import os
+import sys
+import csv
+import json
+from collections import Counter
+
+import publish
+import change_feed
+from model_router import (parse_number, split_modalities, model_prices, ATTRIBUTE_DIR,
+                          CONTEXT_COLUMN, MODALITY_COLUMN, LATENCY_COLUMN, BATCH_SUPPORT,
+                          INPUT_COST_COLUMN, OUTPUT_COST_COLUMN)
+
+ROLLUP_FILE = 'vendor_rollups.csv'
+STATE_FILE = 'vendor_rollups.state.json'
+STATE_FORMAT = 1
+
+# Columns of the joined table the rollups depend on
+ROLLUP_COLUMNS = ['vendor_name', CONTEXT_COLUMN, MODALITY_COLUMN, LATENCY_COLUMN,
+                  INPUT_COST_COLUMN, OUTPUT_COST_COLUMN]
+
+ROLLUP_HEADER = ['vendor_name', 'category', 'formation_year', 'maturity', 'models',
+                 'input_modalities', 'min_context_window', 'max_context_window',
+                 'cheapest_input_cost', 'batch_supported_share']
+
+
+def contribution(name, values):
+    """What one model adds to its vendor's rollup"""
+    prices = model_prices(dict(values, model_name=name))
+    context = parse_number(values.get(CONTEXT_COLUMN, ''))
+    return {
+        'vendor': values.get('vendor_name', ''),
+        'context': int(context) if context else None,
+        'input_cost': prices[0] if prices else None,
+        'modalities': split_modalities(values.get(MODALITY_COLUMN)),
+        'batch': values.get(LATENCY_COLUMN) == BATCH_SUPPORT,
+    }
+
+
+def new_aggregate():
+    return {'models': 0, 'batch': 0, 'modalities': Counter(), 'context': Counter(), 'input_cost': Counter()}
+
+
+class VendorRollups:
+    """Rollup state: the rollup columns of every model and per-vendor aggregates"""
+
+    def __init__(self):
+        self.models = {}
+        self.vendors = {}
+
+    def _apply(self, name, values, sign):
+        part = contribution(name, values)
+        aggregate = self.vendors.setdefault(part['vendor'], new_aggregate())
+        aggregate['models'] += sign
+        aggregate['batch'] += sign * part['batch']
+        for modality in part['modalities']:
+            aggregate['modalities'][modality] += sign
+        for field in ('context', 'input_cost'):
+            if part[field] is not None:
+                aggregate[field][part[field]] += sign
+                if aggregate[field][part[field]] == 0:
+                    del aggregate[field][part[field]]
+        aggregate['modalities'] = +aggregate['modalities']  # drop zero counts
+        if aggregate['models'] == 0:
+            del self.vendors[part['vendor']]
+
+    def insert(self, name, row):
+        values = {col: row.get(col, '') for col in ROLLUP_COLUMNS}
+        self.models[name] = values
+        self._apply(name, values, 1)
+
+    def delete(self, name):
+        self._apply(name, self.models.pop(name), -1)
+
+    def update(self, name, changes):
+        touched = [col for col in changes if col in ROLLUP_COLUMNS]
+        if not touched:
+            return
+        values = self.models[name]
+        self._apply(name, values, -1)
+        values = dict(values, **{col: changes[col]['new'] for col in touched})
+        self.models[name] = values
+        self._apply(name, values, 1)
+
+    def apply_events(self, events):
+        """Apply change feed events in sequence order"""
+        for event in events:
+            if event['op'] == 'insert':
+                self.insert(event['model_name'], event['row'])
+            elif event['op'] == 'delete':
+                self.delete(event['model_name'])
+            else:
+                self.update(event['model_name'], event['changes'])
+
+    def rows(self):
+        """Rollup table rows, one per vendor, sorted by vendor name"""
+        if ATTRIBUTE_DIR not in sys.path:
+            sys.path.append(ATTRIBUTE_DIR)
+        from vendor_database import VENDOR_INFO
+
+        rows = []
+        for vendor in sorted(self.vendors):
+            aggregate = self.vendors[vendor]
+            info = VENDOR_INFO.get(vendor, {})
+            coverage = sorted(aggregate['modalities'].items(), key=lambda item: (-item[1], item[0]))
+            rows.append({
+                'vendor_name': vendor,
+                'category': info.get('category', ''),
+                'formation_year': info.get('formation_year', ''),
+                'maturity': info.get('maturity', ''),
+                'models': aggregate['models'],
+                'input_modalities': ', '.join(f"{modality} ({count})" for modality, count in coverage),
+                'min_context_window': min(aggregate['context'], default=''),
+                'max_context_window': max(aggregate['context'], default=''),
+                'cheapest_input_cost': f"${min(aggregate['input_cost']):.6f}" if aggregate['input_cost'] else '',
+                'batch_supported_share': round(aggregate['batch'] / aggregate['models'], 3),
+            })
+        return rows
+
+    def to_json(self):
+        return {
+            'format': STATE_FORMAT,
+            'models': self.models,
+            'vendors': {
+                vendor: {
+                    'models': aggregate['models'],
+                    'batch': aggregate['batch'],
+                    'modalities': dict(aggregate['modalities']),
+                    # JSON keys are strings; keep the numbers as [value, count] pairs
+                    'context': sorted(aggregate['context'].items()),
+                    'input_cost': sorted(aggregate['input_cost'].items()),
+                }
+                for vendor, aggregate in self.vendors.items()
+            },
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        if data.get('format') != STATE_FORMAT:
+            raise ValueError(f"Unsupported rollup state format: {data.get('format')}")
+        rollups = cls()
+        rollups.models = data['models']
+        rollups.vendors = {
+            vendor: {
+                'models': aggregate['models'],
+                'batch': aggregate['batch'],
+                'modalities': Counter(aggregate['modalities']),
+                'context': Counter(dict((value, count) for value, count in aggregate['context'])),
+                'input_cost': Counter(dict((value, count) for value, count in aggregate['input_cost'])),
+            }
+            for vendor, aggregate in data['vendors'].items()
+        }
+        return rollups
+
+
+def compute_rollups(database_path):
+    """Rollups from scratch over a joined CSV (duplicate model names count once, as in the change feed)"""
+    rollups = VendorRollups()
+    with open(database_path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            if row['model_name'] not in rollups.models:
+                rollups.insert(row['model_name'], row)
+    return rollups
+
+
+def load_state(build_dir):
+    """Rollup state of a build, or None if it has none"""
+    if not build_dir:
+        return None
+    path = os.path.join(build_dir, STATE_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return VendorRollups.from_json(json.load(f))
+
+
+def write_rollups(rollups, build_dir):
+    with open(os.path.join(build_dir, STATE_FILE), 'w', encoding='utf-8') as f:
+        json.dump(rollups.to_json(), f, separators=(',', ':'))
+    with open(os.path.join(build_dir, ROLLUP_FILE), 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=ROLLUP_HEADER, lineterminator='\n')
+        writer.writeheader()
+        writer.writerows(rollups.rows())
+
+
+def update_rollups(build_dir, previous_dir, database_file):
+    """
+    Bring the rollups up to date for a staged build.
+    Applies the build's changes.jsonl to the previous build's state when there
+    is one, otherwise computes from the build's joined CSV.
+    Returns:
+        tuple: (VendorRollups, 'incremental' or 'full')
+    """
+    rollups = load_state(previous_dir)
+    changes_path = os.path.join(build_dir, change_feed.CHANGES_FILE)
+    if rollups is not None and os.path.exists(changes_path):
+        with open(changes_path, encoding='utf-8') as f:
+            rollups.apply_events(json.loads(line) for line in f)
+        mode = 'incremental'
+    else:
+        rollups = compute_rollups(os.path.join(build_dir, database_file))
+        mode = 'full'
+    write_rollups(rollups, build_dir)
+    return rollups, mode
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Show per-vendor rollups of the published build")
+    parser.add_argument('--verify', action='store_true', help="Compare with a full recompute")
+    args = parser.parse_args(argv)
+
+    build_dir = publish.current_build_dir()
+    rollups = load_state(build_dir)
+    if rollups is None:
+        print("No published rollups; run the orchestrator first", file=sys.stderr)
+        return 2
+    if args.verify:
+        expected = compute_rollups(os.path.join(build_dir, 'complete_llm_database.csv'))
+        if expected.rows() != rollups.rows():
+            print("✗ Rollups differ from a full recompute")
+            return 1
+        print(f"✓ Rollups match a full recompute ({len(rollups.vendors)} vendors)")
+        return 0
+    writer = csv.DictWriter(sys.stdout, fieldnames=ROLLUP_HEADER, delimiter='\t', lineterminator='\n')
+    writer.writeheader()
+    writer.writerows(rollups.rows())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())